@@ -1,5 +1,12 @@
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+from softdesk.orm_cache import CachedQuerySet
 
 
 class EmailModelBackend(ModelBackend):
@@ -12,3 +19,45 @@ class EmailModelBackend(ModelBackend):
                 return user
         except get_user_model().DoesNotExist:
             return
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    def get_users(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+        users = CachedQuerySet(self.user_model)
+        return users.filter(**{api_settings.USER_ID_FIELD: user_id})
+
+    def get_user(self, validated_token):
+        user = self.get_users(validated_token).first()
+        return self.check_user(user, validated_token)
+
+    async def aget_user(self, validated_token):
+        user = await self.get_users(validated_token).afirst()
+        return self.check_user(user, validated_token)
+
+    def check_user(self, user, validated_token):
+        # The checks of JWTAuthentication.get_user(), on a user read elsewhere.
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(
+                _("The user's password has been changed."), code="password_changed"
+            )
+        return user
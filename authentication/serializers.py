@@ -21,15 +21,13 @@ class UserSerializer(serializers.ModelSerializer):
         return value
 
     def create(self, validated_data):
-        user = get_user_model().objects.create(
+        return get_user_model().objects.create_user(
             first_name=validated_data["first_name"],
             last_name=validated_data["last_name"],
             email=validated_data["email"],
             username=validated_data["email"],
+            password=validated_data["password"],
         )
-        user.set_password(validated_data["password"])
-        user.save()
-        return user
 
 
 class LoginSerializer(serializers.Serializer):
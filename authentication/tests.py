@@ -1,6 +1,8 @@
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
+from softdesk.budgets import QueryBudgetTestMixin
+from .views import SignUpView, LoginView
 
 
 class TestSignUp(APITestCase):
@@ -192,3 +194,25 @@ class TestLogin(APITestCase):
         response = self.client.post(self.login_url, data)
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
         self.assertEqual(response.json(), {"detail": "Invalid email/password"})
+
+
+class TestQueryBudgets(QueryBudgetTestMixin, APITestCase):
+    def setUp(self):
+        self.data = {
+            "first_name": "John",
+            "last_name": "Doe",
+            "email": "john-doe@gmail.com",
+            "password": "pas1Mais2!",
+        }
+
+    def test_signup_within_budget(self):
+        with self.assertWithinQueryBudget(SignUpView, "create"):
+            response = self.client.post(reverse("signup"), self.data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_login_within_budget(self):
+        self.client.post(reverse("signup"), self.data)
+        data = {"email": self.data["email"], "password": self.data["password"]}
+        with self.assertWithinQueryBudget(LoginView, "post"):
+            response = self.client.post(reverse("login"), data)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
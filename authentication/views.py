@@ -3,12 +3,14 @@ from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework_simplejwt.views import TokenObtainPairView
+from softdesk.budgets import QueryBudget
 from .serializers import UserSerializer, LoginSerializer
 
 
 class SignUpView(CreateAPIView):
     serializer_class = UserSerializer
     permission_classes = [AllowAny]
+    query_budget = {"create": QueryBudget(3)}
 
     def create(self, request, *args, **kwargs):
         response = super().create(request, *args, **kwargs)
@@ -20,3 +22,4 @@ class SignUpView(CreateAPIView):
 class LoginView(TokenObtainPairView):
     serializer_class = LoginSerializer
     permission_classes = [AllowAny]
+    query_budget = {"post": QueryBudget(1)}
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class IssuesTrackingConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "issues_tracking"
+
+    def ready(self):
+        from . import signals  # noqa: F401
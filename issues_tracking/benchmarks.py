@@ -0,0 +1,1049 @@
+import asyncio
+import contextlib
+import io
+import itertools
+import json
+import random
+import resource
+import tempfile
+import time
+import tracemalloc
+from asgiref.sync import sync_to_async
+from concurrent.futures import ThreadPoolExecutor
+from statistics import median
+from types import SimpleNamespace
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.wsgi import get_wsgi_application
+from django.db import connection
+from django.db.backends.utils import CursorWrapper
+from django.db.models import Q
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.pagination import Cursor, PageNumberPagination
+from rest_framework.permissions import BasePermission, IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import RefreshToken
+from softdesk.async_views import AsyncViewASGIHandler
+from softdesk.orm_cache import CachedQuerySet, orm_cache as orm_cache_instance
+from .context import ProjectContext, get_project_context
+from .events import event_bus
+from .export import iter_project_records, ndjson_lines, csv_lines
+from .importer import IssueImporter, READERS
+from .mixins import build_query_plan, build_read_plan
+from .membership import membership_index
+from .response_cache import response_cache as cache
+from .pagination import KeysetPagination
+from .search import BACKENDS as SEARCH_BACKENDS
+from .stats import compute as compute_stats, get_stats, rebuild as rebuild_stats
+from .models import Project, Contributor, Issue, Comment
+from .serializers import (
+    CommentSerializer,
+    ContributorListSerializer,
+    IssueSerializer,
+    ProjectListSerializer,
+)
+from .views import (
+    ProjectViewset,
+    ContributorsViewset,
+    IssuesViewset,
+    CommentsViewset,
+)
+from .permissions import PolicyPermission
+
+SCENARIOS = {}
+
+
+def scenario(func):
+    SCENARIOS[func.__name__] = func
+    return func
+
+
+def scaled(sizes, scale):
+    return [max(1, int(size * scale)) for size in sizes]
+
+
+def measure(func, repeat=50):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return median(timings) * 1000
+
+
+# The permission classes the viewsets chained before the policy table, kept as
+# the baseline of the authorization scenario.
+class IsProjectAuthor(BasePermission):
+    def has_permission(self, request, view):
+        context = get_project_context(request, view)
+        if not context.project_exists:
+            return True
+        return context.is_author
+
+
+class IsPAuthorContributor(BasePermission):
+    def has_permission(self, request, view):
+        context = get_project_context(request, view)
+        if not context.project_exists:
+            return True
+        return context.is_member
+
+
+class IsObjectAuthor(BasePermission):
+    def has_object_permission(self, request, view, obj):
+        return obj.author_user_id_id == request.user.pk
+
+
+def action_scoped(base, action):
+    class ActionScoped(base):
+        def has_permission(self, request, view):
+            if view.action == action:
+                return super().has_permission(request, view)
+            return True
+
+        def has_object_permission(self, request, view, obj):
+            if view.action == action:
+                return super().has_object_permission(request, view, obj)
+            return True
+
+    return ActionScoped
+
+
+# Permission chains the viewsets used before the policy table.
+LEGACY_CHAINS = {
+    "project": [
+        IsAuthenticated,
+        action_scoped(IsPAuthorContributor, "retrieve"),
+        action_scoped(IsProjectAuthor, "update"),
+        action_scoped(IsProjectAuthor, "destroy"),
+    ],
+    "contributor": [
+        IsAuthenticated,
+        action_scoped(IsProjectAuthor, "create"),
+        action_scoped(IsPAuthorContributor, "list"),
+        action_scoped(IsProjectAuthor, "destroy"),
+    ],
+    "issue": [
+        IsAuthenticated,
+        action_scoped(IsPAuthorContributor, "create"),
+        action_scoped(IsPAuthorContributor, "list"),
+        action_scoped(IsObjectAuthor, "update"),
+        action_scoped(IsObjectAuthor, "destroy"),
+    ],
+    "comment": [
+        IsAuthenticated,
+        action_scoped(IsPAuthorContributor, "create"),
+        action_scoped(IsPAuthorContributor, "list"),
+        action_scoped(IsPAuthorContributor, "retrieve"),
+        action_scoped(IsObjectAuthor, "update"),
+        action_scoped(IsObjectAuthor, "destroy"),
+    ],
+}
+
+
+def authorize(permission_classes, request, view, obj=None):
+    permissions = [permission() for permission in permission_classes]
+    allowed = all(p.has_permission(request, view) for p in permissions)
+    if allowed and obj is not None:
+        allowed = all(p.has_object_permission(request, view, obj) for p in permissions)
+    return allowed
+
+
+def create_users(count, prefix="bench"):
+    model = get_user_model()
+    return model.objects.bulk_create(
+        [
+            model(username=f"{prefix}{i}", email=f"{prefix}{i}@bench.io", password="!")
+            for i in range(count)
+        ],
+        batch_size=1000,
+    )
+
+
+def create_project(author, title="bench"):
+    return Project.objects.create(
+        title=title, description=title, type="BE", author_user_id=author
+    )
+
+
+def create_issues(project, author, count, batch_size=5000):
+    for start in range(0, count, batch_size):
+        Issue.objects.bulk_create(
+            Issue(
+                title=f"issue {i}",
+                description="bench",
+                tag="BUG",
+                priority="LOW",
+                status="TODO",
+                project=project,
+                author_user_id=author,
+                assignee_user_id=author,
+            )
+            for i in range(start, min(start + batch_size, count))
+        )
+
+
+def add_contributors(project, users):
+    Contributor.objects.bulk_create(
+        [
+            Contributor(project=project, user=user, permission="LOW", role="Dev")
+            for user in users
+        ],
+        batch_size=1000,
+    )
+
+
+@scenario
+def membership(out, scale):
+    (author,) = create_users(1, "membership-author")
+    out.write(
+        f"{'contributors':>12} {'cold (ms)':>12} {'warm (ms)':>12} {'legacy (ms)':>12}"
+    )
+    for size in scaled((10, 100, 1_000, 10_000, 100_000), scale):
+        project = create_project(author)
+        users = create_users(size, f"membership-{project.pk}-")
+        add_contributors(project, users)
+        member = users[-1]
+        request = SimpleNamespace(user=member)
+        view = SimpleNamespace(kwargs={"project_id": project.pk})
+
+        def check():
+            return ProjectContext(request, view).is_member
+
+        def cold_check():
+            membership_index.clear()
+            return check()
+
+        cold = measure(cold_check)
+        warm = measure(check)
+        legacy = measure(lambda: member in project.contributors.all(), repeat=5)
+        out.write(f"{size:>12} {cold:>12.3f} {warm:>12.3f} {legacy:>12.3f}")
+
+
+@scenario
+def authorization(out, scale):
+    author, member = create_users(2, "authorization-")
+    project = create_project(author)
+    add_contributors(project, [member])
+    issue = Issue.objects.create(
+        title="bench",
+        description="bench",
+        tag="BUG",
+        priority="LOW",
+        status="TODO",
+        project=project,
+        author_user_id=member,
+    )
+    cases = [
+        ("project", "retrieve", {"pk": project.pk}, None),
+        ("contributor", "list", {"project_id": project.pk}, None),
+        ("issue", "create", {"project_id": project.pk}, None),
+        ("issue", "update", {"project_id": project.pk, "pk": issue.pk}, issue),
+    ]
+    repeat = max(100, int(2000 * scale))
+    out.write(
+        f"{'resource.action':<20} {'chain (us)':>12} {'policy (us)':>12}"
+        f" {'chain, warm':>12} {'policy, warm':>12}"
+    )
+    for resource, action, kwargs, obj in cases:
+        view = SimpleNamespace(kwargs=kwargs, action=action, policy_resource=resource)
+        shared = SimpleNamespace(user=member)
+
+        def run(permission_classes, request=None):
+            def check():
+                return authorize(
+                    permission_classes,
+                    request or SimpleNamespace(user=member),
+                    view,
+                    obj,
+                )
+
+            check()
+            return measure(check, repeat) * 1000
+
+        chain = LEGACY_CHAINS[resource]
+        policy = [IsAuthenticated, PolicyPermission]
+        out.write(
+            f"{resource + '.' + action:<20} {run(chain):>12.2f} {run(policy):>12.2f}"
+            f" {run(chain, shared):>12.2f} {run(policy, shared):>12.2f}"
+        )
+
+
+@scenario
+def pagination(out, scale):
+    (author,) = create_users(1, "pagination-")
+    project = create_project(author)
+    size = scaled((500_000,), scale)[0]
+    create_issues(project, author, size)
+    queryset = Issue.objects.filter(project=project).order_by("id")
+    ids = list(queryset.values_list("id", flat=True))
+    factory = APIRequestFactory()
+    page_size = 10
+    out.write(f"{size} issues, {page_size} per page")
+    out.write(f"{'depth':>10} {'page number (ms)':>18} {'cursor (ms)':>12}")
+    for depth in (0, len(ids) // 10, len(ids) // 2, len(ids) - page_size):
+        page = depth // page_size + 1
+        page_request = Request(factory.get("/", {"page": page}))
+        keyset = KeysetPagination()
+        keyset.base_url = "http://testserver/"
+        keyset.page_size = page_size
+        position = str(ids[depth - 1]) if depth else None
+        cursor_url = keyset.encode_cursor(Cursor(0, False, position))
+        cursor_request = Request(factory.get(cursor_url))
+
+        def page_number():
+            paginator = PageNumberPagination()
+            paginator.page_size = page_size
+            return paginator.paginate_queryset(queryset, page_request)
+
+        def cursor():
+            return KeysetPagination().paginate_queryset(queryset, cursor_request)
+
+        out.write(
+            f"{depth:>10} {measure(page_number, 10):>18.3f}"
+            f" {measure(cursor, 10):>12.3f}"
+        )
+
+
+@scenario
+def project_list(out, scale):
+    users_count, projects_count = scaled((2_000, 5_000), scale)
+    per_user = min(projects_count, 500)
+    users = create_users(users_count, "project-list-")
+    author = users[0]
+    projects = Project.objects.bulk_create(
+        Project(title="bench", description="bench", type="BE", author_user_id=author)
+        for _ in range(projects_count)
+    )
+    for start in range(0, users_count, 100):
+        Contributor.objects.bulk_create(
+            Contributor(
+                project=projects[(index * 7 + k) % projects_count],
+                user=user,
+                permission="LOW",
+                role="Dev",
+            )
+            for index, user in enumerate(users[start : start + 100], start)
+            for k in range(per_user)
+            if user != author
+        )
+    user = users[-1]
+    legacy = Project.objects.filter(
+        Q(author_user_id=user) | Q(contributors=user)
+    ).order_by("id")
+    current = ProjectViewset(
+        action="list", request=SimpleNamespace(user=user)
+    ).get_queryset()
+    out.write(f"{Contributor.objects.count()} contributor rows")
+    for label, queryset in (("legacy OR-join", legacy), ("OR + IN subquery", current)):
+
+        def first_page():
+            queryset.count()
+            return list(queryset[:10])
+
+        out.write(f"{label}: {measure(first_page, 20):.3f} ms")
+        out.write(queryset.explain())
+
+
+@scenario
+def bulk_issues(out, scale):
+    (author,) = create_users(1, "bulk-issues-")
+    project = create_project(author)
+    count = scaled((10_000,), scale)[0]
+    client = APIClient()
+    client.force_authenticate(author)
+    item = {
+        "title": "bench",
+        "description": "bench",
+        "tag": "BUG",
+        "priority": "LOW",
+        "status": "TODO",
+    }
+    list_url = f"/projects/{project.pk}/issues/"
+    bulk_url = f"{list_url}bulk/"
+    batch = IssuesViewset.bulk_max_size
+    with mock.patch.object(IssuesViewset, "throttle_classes", []):
+        start = time.perf_counter()
+        for _ in range(count):
+            client.post(list_url, item, format="json")
+        per_item = time.perf_counter() - start
+        start = time.perf_counter()
+        for offset in range(0, count, batch):
+            client.post(bulk_url, [item] * min(batch, count - offset), format="json")
+        bulk = time.perf_counter() - start
+    out.write(f"{count} issues, bulk batches of {batch}")
+    out.write(f"per-item: {per_item:.2f} s ({count / per_item:.0f} issues/s)")
+    out.write(f"bulk:     {bulk:.2f} s ({count / bulk:.0f} issues/s)")
+
+
+@scenario
+def export(out, scale):
+    (author,) = create_users(1, "export-")
+    out.write(
+        f"{'issues':>10} {'rows':>10} {'format':>7} {'rows/s':>10}"
+        f" {'python peak (MB)':>17} {'peak RSS (MB)':>14}"
+    )
+    for size in scaled((10_000, 100_000), scale):
+        project = create_project(author)
+        create_issues(project, author, size)
+        issue_ids = Issue.objects.filter(project=project).values_list("id", flat=True)
+        Comment.objects.bulk_create(
+            (
+                Comment(description="bench", issue_id=issue_id, author_user_id=author)
+                for issue_id in issue_ids.iterator()
+            ),
+            batch_size=5000,
+        )
+        for name, writer in (("ndjson", ndjson_lines), ("csv", csv_lines)):
+            start = time.perf_counter()
+            rows = sum(1 for _ in writer(iter_project_records(project.pk)))
+            elapsed = time.perf_counter() - start
+            tracemalloc.start()
+            for _ in writer(iter_project_records(project.pk)):
+                pass
+            python_peak = tracemalloc.get_traced_memory()[1] / 2**20
+            tracemalloc.stop()
+            # ru_maxrss is the high-water mark of the whole process, in KiB.
+            rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+            out.write(
+                f"{size:>10} {rows:>10} {name:>7} {rows / elapsed:>10.0f}"
+                f" {python_peak:>17.2f} {rss:>14.1f}"
+            )
+
+
+@scenario
+def import_issues(out, scale):
+    (author,) = create_users(1, "import-")
+    project = create_project(author)
+    count = scaled((1_000_000,), scale)[0]
+    issue = {
+        "record": "issue",
+        "title": "bench",
+        "description": "bench",
+        "tag": "BUG",
+        "priority": "LOW",
+        "status": "TODO",
+    }
+    comment = {"record": "comment", "description": "bench"}
+    with tempfile.NamedTemporaryFile("w+", suffix=".ndjson") as source:
+        for i in range(count):
+            source.write(json.dumps({**issue, "id": i}) + "\n")
+            if i % 10 == 0:
+                source.write(json.dumps({**comment, "issue": i}) + "\n")
+        source.flush()
+        source.seek(0)
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        start = time.perf_counter()
+        importer = IssueImporter(project.pk, author)
+        errors = sum(1 for _ in importer.run(READERS["ndjson"](source)))
+        elapsed = time.perf_counter() - start
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    rows = importer.created["issue"] + importer.created["comment"]
+    out.write(
+        f"{count} issues, {importer.created['comment']} comments, {errors} errors"
+    )
+    out.write(
+        f"{elapsed:.1f} s, {rows / elapsed:.0f} rows/s,"
+        f" peak RSS {rss_before:.1f} -> {rss_after:.1f} MB"
+    )
+
+
+@scenario
+def etag_polling(out, scale):
+    (author,) = create_users(1, "etag-")
+    client = APIClient()
+    client.force_authenticate(author)
+    out.write(
+        f"{'issues':>10} {'page':>6} {'200 (ms)':>10} {'queries':>8}"
+        f" {'304 (ms)':>10} {'queries':>8}"
+    )
+    # The 200 column measures a full render, not a cached response.
+    with mock.patch.object(cache, "enabled", False):
+        for size in scaled((100, 10_000), scale):
+            project = create_project(author)
+            create_issues(project, author, size)
+            url = f"/projects/{project.pk}/issues/"
+            for params in ({}, {"pagination": "cursor", "page_size": 100}):
+                etag = client.get(url, params)["ETag"]
+
+                def poll(headers):
+                    with CaptureQueriesContext(connection) as context:
+                        response = client.get(url, params, headers=headers)
+                    return response.status_code, len(context.captured_queries)
+
+                full_status, full_queries = poll({})
+                cached_status, cached_queries = poll({"If-None-Match": etag})
+                assert (full_status, cached_status) == (200, 304)
+                full = measure(lambda: client.get(url, params), 20)
+                cached = measure(
+                    lambda: client.get(url, params, headers={"If-None-Match": etag}), 20
+                )
+                out.write(
+                    f"{size:>10} {params.get('page_size', 10):>6} {full:>10.3f}"
+                    f" {full_queries:>8} {cached:>10.3f} {cached_queries:>8}"
+                )
+
+
+@scenario
+def response_cache(out, scale):
+    users = create_users(20, "response-cache-")
+    author = users[0]
+    projects = [create_project(author) for _ in range(10)]
+    for project in projects:
+        add_contributors(project, users[1:])
+        create_issues(project, author, scaled((1_000,), scale)[0])
+    clients = []
+    for user in users:
+        client = APIClient()
+        client.force_authenticate(user)
+        clients.append(client)
+    requests_count = max(200, int(2_000 * scale))
+    urls = [f"/projects/{project.pk}/issues/" for project in projects] + [
+        f"/projects/{project.pk}/users/" for project in projects
+    ]
+    out.write(f"{requests_count} list requests, 1 write every 20 requests")
+    out.write(f"{'mode':>10} {'median (ms)':>12} {'hit ratio':>10}")
+    with mock.patch.object(IssuesViewset, "throttle_classes", []), mock.patch.object(
+        ContributorsViewset, "throttle_classes", []
+    ):
+        for enabled in (False, True):
+            cache.clear()
+            cache.cache.clear()
+            cache.reset_stats()
+            timings = []
+            with mock.patch.object(cache, "enabled", enabled):
+                for i in range(requests_count):
+                    client = clients[i % len(clients)]
+                    url = urls[(i * 7) % len(urls)]
+                    if i % 20 == 19:
+                        Issue.objects.filter(project=projects[i % 10]).first().save()
+                    start = time.perf_counter()
+                    client.get(url, {"page": 1 + i % 3})
+                    timings.append(time.perf_counter() - start)
+            ratio = cache.stats()["hit_ratio"]
+            out.write(
+                f"{'cached' if enabled else 'uncached':>10}"
+                f" {median(timings) * 1000:>12.3f} {ratio:>10.2f}"
+            )
+
+
+ORM_CACHE_MODELS = [
+    "issues_tracking.Project",
+    "issues_tracking.Contributor",
+    "auth.User",
+]
+
+
+@scenario
+def orm_cache(out, scale):
+    author, member = create_users(2, "orm-cache-")
+    project = create_project(author)
+    add_contributors(project, [member])
+    user_model = get_user_model()
+    lookups = [
+        (
+            "user by pk",
+            lambda: user_model.objects.filter(pk=member.pk).first(),
+            lambda: CachedQuerySet(user_model).filter(pk=member.pk).first(),
+        ),
+        (
+            "project by pk",
+            lambda: Project._base_manager.filter(pk=project.pk).first(),
+            lambda: Project.objects.filter(pk=project.pk).first(),
+        ),
+        (
+            "contributor exists",
+            lambda: Project._base_manager.filter(contributors=member).exists(),
+            lambda: Contributor.objects.filter(project=project, user=member).exists(),
+        ),
+    ]
+    repeat = max(100, int(2_000 * scale))
+    out.write(f"{'lookup':<20} {'database (us)':>14} {'cached (us)':>12}")
+    labels = orm_cache_instance.labels
+    orm_cache_instance.configure(ORM_CACHE_MODELS)
+    overhead = 0
+    try:
+        for label, uncached, cached in lookups:
+            cached()
+            database = measure(uncached, repeat) * 1000
+            hit = measure(cached, repeat) * 1000
+            overhead = max(overhead, hit - database)
+            out.write(f"{label:<20} {database:>14.1f} {hit:>12.1f}")
+    finally:
+        orm_cache_instance.configure(labels)
+    out.write(
+        f"A hit replaces a database round trip; it pays off once a round trip"
+        f" costs more than {max(overhead, 0):.0f} us over this local SQLite file."
+    )
+
+
+SYLLABLES = ["ka", "lo", "mi", "ne", "ru", "sa", "ti", "vo", "ze", "pu"]
+
+
+def search_corpus(size, words=2_000, seed=0):
+    # Zipf-distributed words, so queries hit both common and rare terms.
+    rng = random.Random(seed)
+    vocabulary = ["".join(p) for p in itertools.product(SYLLABLES, repeat=4)]
+    vocabulary = vocabulary[:words]
+    weights = list(itertools.accumulate(1 / rank for rank in range(1, words + 1)))
+    texts = [
+        " ".join(rng.choices(vocabulary, cum_weights=weights, k=rng.randint(4, 16)))
+        for _ in range(size)
+    ]
+    return vocabulary, texts
+
+
+@scenario
+def search(out, scale):
+    searcher, stranger = create_users(2, "search-")
+    issues_count, comments_count = scaled((1_000_000, 5_000_000), scale)
+    projects = [create_project(searcher if i % 2 else stranger) for i in range(100)]
+    vocabulary, texts = search_corpus(50_000)
+    per_issue = comments_count // issues_count
+    batch = 5_000
+    start = time.perf_counter()
+    for offset in range(0, issues_count, batch):
+        issues = Issue.objects.bulk_create(
+            Issue(
+                title=texts[i % len(texts)][:255],
+                description=texts[(i * 7) % len(texts)],
+                tag="BUG",
+                priority="LOW",
+                status="TODO",
+                project=projects[i % len(projects)],
+                author_user_id=searcher,
+                assignee_user_id=searcher,
+            )
+            for i in range(offset, min(offset + batch, issues_count))
+        )
+        Comment.objects.bulk_create(
+            Comment(
+                description=texts[(issue.pk * 13 + k) % len(texts)][:1000],
+                issue=issue,
+                author_user_id=searcher,
+            )
+            for issue in issues
+            for k in range(per_issue)
+        )
+    elapsed = time.perf_counter() - start
+    rows = issues_count + issues_count * per_issue
+    backend = SEARCH_BACKENDS["fts5"]
+    out.write(
+        f"{issues_count} issues, {rows - issues_count} comments indexed by triggers"
+        f" in {elapsed:.1f} s ({rows / elapsed:.0f} rows/s)"
+    )
+    queries = [
+        ("common word", [vocabulary[1]]),
+        ("rare word", [vocabulary[-1]]),
+        ("two words", [vocabulary[3], vocabulary[40]]),
+        ("absent word", ["absent"]),
+    ]
+
+    def like_scan(terms):
+        visible = Q(project__author_user_id=searcher) | Q(
+            project__contributors=searcher
+        )
+        issues = Issue.objects.filter(visible)
+        comments = Comment.objects.filter(
+            Q(issue__project__author_user_id=searcher)
+            | Q(issue__project__contributors=searcher)
+        )
+        for term in terms:
+            issues = issues.filter(
+                Q(title__icontains=term) | Q(description__icontains=term)
+            )
+            comments = comments.filter(description__icontains=term)
+        return list(issues.order_by("id")[:10]), list(comments.order_by("id")[:10])
+
+    python = SEARCH_BACKENDS["python"]
+    python_limit = 300_000
+    out.write(
+        f"{'query':<12} {'fts5 p1 (ms)':>13} {'fts5 p100 (ms)':>15}"
+        f" {'python p1 (ms)':>15} {'LIKE, unranked (ms)':>20}"
+    )
+    for label, terms in queries:
+        first = measure(lambda: backend.search(searcher, terms, 0, 11), 5)
+        deep = measure(lambda: backend.search(searcher, terms, 990, 11), 5)
+        if rows <= python_limit:
+            python.search(searcher, terms, 0, 11)
+            in_python = (
+                f"{measure(lambda: python.search(searcher, terms, 0, 11), 5):>15.2f}"
+            )
+        else:
+            in_python = f"{'skipped':>15}"
+        scan = measure(lambda: like_scan(terms), 1)
+        out.write(f"{label:<12} {first:>13.2f} {deep:>15.2f} {in_python} {scan:>20.2f}")
+    if rows > python_limit:
+        out.write(
+            f"The python index is skipped above {python_limit} rows: it holds"
+            f" every visible project's postings in memory."
+        )
+    python.clear()
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    out.write(f"peak RSS {rss:.0f} MB")
+
+
+@scenario
+def project_stats(out, scale):
+    (author,) = create_users(1, "project-stats-")
+    out.write(f"{'issues':>10} {'GROUP BY (ms)':>14} {'stats row (ms)':>15}")
+    for size in scaled((10_000, 100_000, 1_000_000), scale):
+        project = create_project(author)
+        create_issues(project, author, size)
+        # bulk_create skips the signals; the bulk views record their deltas.
+        rebuild_stats([project.pk])
+        grouped = measure(lambda: compute_stats([project.pk]), 5)
+        stored = measure(lambda: get_stats(project.pk), 50)
+        out.write(f"{size:>10} {grouped:>14.3f} {stored:>15.3f}")
+
+
+def serve_wsgi(application, requests, workers):
+    # A threaded WSGI server: one request per worker thread at a time.
+    def call(request):
+        path, token = request
+        statuses = []
+        environ = {
+            "REQUEST_METHOD": "GET",
+            "PATH_INFO": path,
+            "QUERY_STRING": "",
+            "SERVER_NAME": "testserver",
+            "SERVER_PORT": "80",
+            "HTTP_AUTHORIZATION": f"Bearer {token}",
+            "wsgi.input": io.BytesIO(),
+            "wsgi.url_scheme": "http",
+        }
+        body = application(environ, lambda status, headers: statuses.append(status))
+        b"".join(body)
+        body.close()
+        return int(statuses[0].split()[0])
+
+    with ThreadPoolExecutor(workers) as pool:
+        return list(pool.map(call, requests))
+
+
+def asgi_scope(path, token):
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"host", b"testserver"),
+            (b"authorization", f"Bearer {token}".encode()),
+        ],
+        "client": ("127.0.0.1", 0),
+        "server": ("testserver", 80),
+    }
+
+
+def serve_asgi(application, requests, connections):
+    # A uvicorn-style server: one event loop, at most `connections` requests
+    # in flight.
+    async def call(request, limit):
+        path, token = request
+        async with limit:
+            sent = []
+            finished = asyncio.Event()
+            messages = iter([{"type": "http.request", "body": b""}])
+
+            async def receive():
+                message = next(messages, None)
+                if message is None:
+                    await finished.wait()
+                    message = {"type": "http.disconnect"}
+                return message
+
+            async def send(message):
+                sent.append(message)
+
+            await application(asgi_scope(path, token), receive, send)
+            finished.set()
+            return sent[0]["status"]
+
+    async def main():
+        limit = asyncio.Semaphore(connections)
+        return await asyncio.gather(*(call(request, limit) for request in requests))
+
+    return asyncio.run(main())
+
+
+def delayed_execute(latency):
+    # Stands in for a database server reached over the network.
+    execute = CursorWrapper.execute
+
+    def delayed(self, *args, **kwargs):
+        time.sleep(latency)
+        return execute(self, *args, **kwargs)
+
+    return mock.patch.object(CursorWrapper, "execute", delayed)
+
+
+@scenario
+def asgi(out, scale):
+    users = create_users(10, "asgi-")
+    author = users[0]
+    projects = [create_project(author) for _ in range(5)]
+    comments = []
+    for project in projects:
+        add_contributors(project, users[1:])
+        create_issues(project, author, 50)
+        issue = Issue.objects.filter(project=project).first()
+        comments.append(
+            Comment.objects.create(
+                description="bench", issue=issue, author_user_id=author
+            )
+        )
+    tokens = [str(RefreshToken.for_user(user).access_token) for user in users]
+    paths = ["/projects/"]
+    for project, comment in zip(projects, comments):
+        paths += [
+            f"/projects/{project.pk}/",
+            f"/projects/{project.pk}/users/",
+            f"/projects/{project.pk}/issues/",
+            f"/projects/{project.pk}/issues/{comment.issue_id}/comments/",
+            f"/projects/{project.pk}/issues/{comment.issue_id}/comments/{comment.pk}/",
+        ]
+    count = max(200, int(2_000 * scale))
+    requests = [
+        (paths[i % len(paths)], tokens[(i * 7) % len(tokens)]) for i in range(count)
+    ]
+    wsgi_application = get_wsgi_application()
+    asgi_application = AsyncViewASGIHandler()
+    out.write(f"{count} read requests over {len(paths)} endpoints, responses uncached")
+    out.write(
+        f"{'db latency':>10} {'connections':>12} {'WSGI (req/s)':>13}"
+        f" {'ASGI (req/s)':>13}"
+    )
+    viewsets = (ProjectViewset, ContributorsViewset, IssuesViewset, CommentsViewset)
+    with contextlib.ExitStack() as stack:
+        for viewset in viewsets:
+            stack.enter_context(mock.patch.object(viewset, "throttle_classes", []))
+        stack.enter_context(mock.patch.object(cache, "enabled", False))
+        for latency in (0, 0.002):
+            with delayed_execute(latency):
+                for connections in (1, 10, 50):
+                    throughput = []
+                    for serve, application in (
+                        (serve_wsgi, wsgi_application),
+                        (serve_asgi, asgi_application),
+                    ):
+                        serve(application, requests[:20], connections)
+                        start = time.perf_counter()
+                        statuses = serve(application, requests, connections)
+                        elapsed = time.perf_counter() - start
+                        assert set(statuses) == {200}, set(statuses)
+                        throughput.append(count / elapsed)
+                    out.write(
+                        f"{latency * 1000:>8.0f}ms {connections:>12}"
+                        f" {throughput[0]:>13.0f} {throughput[1]:>13.0f}"
+                    )
+
+
+class StreamClient:
+    # Holds one event stream open against an ASGI application.
+    def __init__(self, application, path, token):
+        self.chunks = asyncio.Queue()
+        self.disconnected = asyncio.Event()
+        self.messages = iter([{"type": "http.request", "body": b""}])
+        self.task = asyncio.create_task(
+            application(asgi_scope(path, token), self.receive, self.send)
+        )
+
+    async def receive(self):
+        message = next(self.messages, None)
+        if message is None:
+            await self.disconnected.wait()
+            message = {"type": "http.disconnect"}
+        return message
+
+    async def send(self, message):
+        if message["type"] == "http.response.body" and message.get("body"):
+            await self.chunks.put(message["body"])
+
+    async def close(self):
+        self.disconnected.set()
+        await self.task
+
+
+@scenario
+def event_stream(out, scale):
+    (author,) = create_users(1, "event-stream-")
+    project = create_project(author)
+    token = str(RefreshToken.for_user(author).access_token)
+    application = AsyncViewASGIHandler()
+    path = f"/projects/{project.pk}/events/"
+    out.write(
+        f"{'subscribers':>11} {'connect (ms)':>13} {'KiB each':>9}"
+        f" {'fan-out p50 (ms)':>17} {'fan-out max (ms)':>17}"
+    )
+
+    def create_issue():
+        create_issues(project, author, 1)
+        # bulk_create sends no signal: publish as the bulk endpoint does.
+        event_bus.publish(project.pk, {"type": "issue.created", "id": 0})
+
+    async def run(count):
+        tracemalloc.start()
+        start = time.perf_counter()
+        clients = [StreamClient(application, path, token) for _ in range(count)]
+        for client in clients:
+            await client.chunks.get()
+        connect = time.perf_counter() - start
+        memory = tracemalloc.get_traced_memory()[0] / count / 1024
+        tracemalloc.stop()
+        fan_out = []
+        for _ in range(10):
+            start = time.perf_counter()
+            await sync_to_async(create_issue)()
+            for client in clients:
+                await client.chunks.get()
+            fan_out.append(time.perf_counter() - start)
+        for client in clients:
+            await client.close()
+        out.write(
+            f"{count:>11} {connect * 1000:>13.0f} {memory:>9.1f}"
+            f" {median(fan_out) * 1000:>17.2f} {max(fan_out) * 1000:>17.2f}"
+        )
+
+    with mock.patch.object(ProjectViewset, "throttle_classes", []), mock.patch.object(
+        event_bus, "max_subscribers", 1_000_000
+    ):
+        for count in scaled((100, 1_000, 5_000), scale):
+            asyncio.run(run(count))
+
+
+@scenario
+def sparse_fieldsets(out, scale):
+    (author,) = create_users(1, "sparse-")
+    client = APIClient()
+    client.force_authenticate(author)
+    project = create_project(author)
+    size = scaled((10_000,), scale)[0]
+    create_issues(project, author, size)
+    # Descriptions are the bulk of a real issue row.
+    Issue.objects.filter(project=project).update(description="lorem ipsum " * 200)
+    url = f"/projects/{project.pk}/issues/"
+    page = {"pagination": "cursor", "page_size": 100}
+    out.write(f"{size} issues, {page['page_size']} per page")
+    out.write(f"{'representation':<28} {'bytes':>8} {'ms':>8}")
+    with mock.patch.object(cache, "enabled", False):
+        for label, params in (
+            ("full", {}),
+            ("exclude=description", {"exclude": "description"}),
+            ("fields=id,title,status", {"fields": "id,title,status"}),
+        ):
+            params = {**page, **params}
+            response = client.get(url, params)
+            assert response.status_code == 200
+            if response.streaming:
+                body = b"".join(response.streaming_content)
+            else:
+                body = response.content
+            elapsed = measure(lambda: client.get(url, params), 20)
+            out.write(f"{label:<28} {len(body):>8} {elapsed:>8.3f}")
+
+
+@scenario
+def read_serializers(out, scale):
+    users = create_users(2, "read-")
+    author = users[0]
+    size = scaled((5_000,), scale)[0]
+    project = create_project(author)
+    create_issues(project, author, size)
+    issue = Issue.objects.filter(project=project).first()
+    Comment.objects.bulk_create(
+        Comment(description="bench", issue=issue, author_user_id=author)
+        for _ in range(size)
+    )
+    Project.objects.bulk_create(
+        Project(title="bench", description="bench", type="BE", author_user_id=author)
+        for _ in range(size)
+    )
+    contributors = create_users(size, "read-contributor-")
+    add_contributors(project, contributors)
+    cases = (
+        (IssueSerializer, Issue.objects.filter(project=project)),
+        (CommentSerializer, Comment.objects.filter(issue=issue)),
+        (ProjectListSerializer, Project.objects.all()),
+        (ContributorListSerializer, Contributor.objects.filter(project=project)),
+    )
+    out.write("Rows fetched and represented per second, per path:")
+    out.write(f"{'serializer':<26} {'rows':>6} {'DRF':>10} {'plan':>10}")
+    for serializer_class, queryset in cases:
+        queryset = queryset.order_by("id")
+        query_plan = build_query_plan(serializer_class, queryset.model)
+        read_plan = build_read_plan(serializer_class, queryset.model)
+        instances = query_plan.apply(queryset, read=True)
+        rows = read_plan.apply(queryset)
+
+        def drf():
+            return serializer_class(instances.all(), many=True).data
+
+        def plan():
+            return read_plan.represent(rows.all())
+
+        assert drf() == plan()
+        count = len(rows)
+        out.write(
+            f"{serializer_class.__name__:<26} {count:>6}"
+            f" {count / measure(drf, 5) * 1000:>10.0f}"
+            f" {count / measure(plan, 5) * 1000:>10.0f}"
+        )
+
+
+@scenario
+def streaming_json(out, scale):
+    (author,) = create_users(1, "streaming-")
+    client = APIClient()
+    client.force_authenticate(author)
+    sizes = scaled((10, 1_000, 100_000), scale)
+    project = create_project(author)
+    create_issues(project, author, sizes[-1])
+    url = f"/projects/{project.pk}/issues/"
+    out.write("One keyset page of the issue list, response cache off")
+    out.write(
+        f"{'items':>8} {'response':>9} {'first byte (ms)':>16} {'total (ms)':>11}"
+        f" {'python peak (MB)':>17}"
+    )
+
+    def request(params):
+        # Returns when the first byte is available, and when all are.
+        start = time.perf_counter()
+        response = client.get(url, params)
+        assert response.status_code == 200
+        if not response.streaming:
+            first = time.perf_counter() - start
+            return first, first
+        chunks = iter(response.streaming_content)
+        next(chunks)
+        first = time.perf_counter() - start
+        for _ in chunks:
+            pass
+        return first, time.perf_counter() - start
+
+    with (
+        mock.patch.object(cache, "enabled", False),
+        mock.patch.object(KeysetPagination, "max_page_size", sizes[-1]),
+    ):
+        for size in sizes:
+            params = {"pagination": "cursor", "page_size": size}
+            for label, min_items in (("rendered", size + 1), ("streamed", 1)):
+                with override_settings(STREAMING_JSON={"MIN_ITEMS": min_items}):
+                    timings = [request(params) for _ in range(5)]
+                    tracemalloc.start()
+                    request(params)
+                    peak = tracemalloc.get_traced_memory()[1] / 2**20
+                    tracemalloc.stop()
+                first = median(first for first, _ in timings) * 1000
+                total = median(total for _, total in timings) * 1000
+                out.write(
+                    f"{size:>8} {label:>9} {first:>16.3f} {total:>11.3f}"
+                    f" {peak:>17.2f}"
+                )
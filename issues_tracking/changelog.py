@@ -0,0 +1,70 @@
+from django.db import transaction
+from django.db.models import Exists, Max, OuterRef, Subquery
+from .models import Change, ChangeLogCompaction, Issue
+
+
+def record(model, action, project_id, object_ids):
+    Change.objects.bulk_create(
+        Change(model=model, action=action, project_id=project_id, object_id=pk)
+        for pk in object_ids
+    )
+
+
+def record_comment(action, comment):
+    # Resolved by the INSERT itself: the comment's issue may not be loaded.
+    project_id = Subquery(
+        Issue.objects.filter(pk=comment.issue_id).values("project_id")
+    )
+    record("comment", action, project_id, [comment.pk])
+
+
+def horizon():
+    # Cursors below this seq may have missed dropped tombstones.
+    compactions = ChangeLogCompaction.objects.aggregate(
+        through=Max("compacted_through")
+    )
+    return compactions["through"] or 0
+
+
+def changes_since(project_ids, after, limit):
+    # Returns the changes after `after`, at most `limit` of them, and whether
+    # more follow. Only the latest change of each object is kept: synced
+    # objects are read in their current state.
+    rows = list(
+        Change.objects.filter(project_id__in=project_ids, seq__gt=after).order_by(
+            "seq"
+        )[: limit + 1]
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    latest = {(change.model, change.object_id): change for change in rows}
+    changes = sorted(latest.values(), key=lambda change: change.seq)
+    cursor = rows[-1].seq if rows else after
+    return changes, cursor, has_more
+
+
+def compact(before, chunk_size=5000):
+    # Drops every change superseded by a later one of the same object, which
+    # no cursor needs, then the tombstones older than `before`, which only
+    # cursors older than them need: those must resync from scratch.
+    newer = Change.objects.filter(
+        model=OuterRef("model"),
+        object_id=OuterRef("object_id"),
+        seq__gt=OuterRef("seq"),
+    )
+    last = Change.objects.aggregate(last=Max("seq"))["last"] or 0
+    collapsed = 0
+    for start in range(0, last, chunk_size):
+        with transaction.atomic():
+            superseded = Change.objects.filter(
+                Exists(newer), seq__gt=start, seq__lte=start + chunk_size
+            )
+            collapsed += superseded.delete()[0]
+    tombstones = Change.objects.filter(action=Change.DELETED, time__lt=before)
+    through = tombstones.aggregate(through=Max("seq"))["through"]
+    dropped = 0
+    if through is not None:
+        with transaction.atomic():
+            dropped = tombstones.filter(seq__lte=through).delete()[0]
+            ChangeLogCompaction.objects.create(compacted_through=through)
+    return collapsed, dropped
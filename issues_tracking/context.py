@@ -0,0 +1,135 @@
+from functools import cached_property
+from django.http import Http404
+from .membership import membership_index, EMPTY_MEMBERSHIP
+from .models import Project, Issue
+from .policies import ANY, AUTHOR
+
+
+def parse_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class ProjectContext:
+    def __init__(self, request, view):
+        self.user = request.user
+        kwargs = getattr(view, "kwargs", {})
+        self.project_id = parse_id(kwargs.get("project_id") or kwargs.get("pk"))
+        self.issue_id = parse_id(kwargs.get("issue_id"))
+
+    # Each a<property>() loads the property with the async ORM and caches it
+    # where the sync property looks, so later sync reads do no I/O.
+
+    @cached_property
+    def project(self):
+        if self.project_id is None:
+            return None
+        return Project.objects.filter(pk=self.project_id).first()
+
+    async def aproject(self):
+        if "project" not in self.__dict__:
+            if self.project_id is None:
+                return self.project
+            self.project = await Project.objects.filter(pk=self.project_id).afirst()
+        return self.project
+
+    def version_query(self):
+        return Project.objects.filter(pk=self.project_id).values_list(
+            "version", flat=True
+        )
+
+    @cached_property
+    def version(self):
+        if "project" in self.__dict__:
+            return self.project and self.project.version
+        if self.project_id is None:
+            return None
+        return self.version_query().first()
+
+    async def aversion(self):
+        if "version" not in self.__dict__:
+            if "project" in self.__dict__ or self.project_id is None:
+                return self.version
+            self.version = await self.version_query().afirst()
+        return self.version
+
+    @cached_property
+    def issue(self):
+        if self.project_id is None or self.issue_id is None:
+            return None
+        return Issue.objects.filter(
+            pk=self.issue_id, project_id=self.project_id
+        ).first()
+
+    @cached_property
+    def resolved(self):
+        if self.project_id is None or not self.user.is_authenticated:
+            return None, EMPTY_MEMBERSHIP
+        return membership_index.resolve(self.user.pk, self.project_id)
+
+    async def aresolve(self):
+        if "resolved" not in self.__dict__:
+            if self.project_id is None or not self.user.is_authenticated:
+                return self.resolved
+            self.resolved = await membership_index.aresolve(
+                self.user.pk, self.project_id
+            )
+        return self.resolved
+
+    @property
+    def author_id(self):
+        return self.resolved[0]
+
+    @property
+    def membership(self):
+        return self.resolved[1]
+
+    @property
+    def project_exists(self):
+        return self.author_id is not None
+
+    @property
+    def is_author(self):
+        return self.project_exists and self.author_id == self.user.pk
+
+    @property
+    def is_contributor(self):
+        return self.project_exists and self.project_id in self.membership.contributed
+
+    @property
+    def is_member(self):
+        return self.is_author or self.is_contributor
+
+    @cached_property
+    def roles(self):
+        roles = {ANY}
+        if self.is_author:
+            roles.add(AUTHOR)
+        if self.is_contributor:
+            roles.add(self.membership.contributed[self.project_id])
+        return frozenset(roles)
+
+    def get_project_or_404(self):
+        if self.project is None:
+            raise Http404
+        return self.project
+
+    async def aget_project_or_404(self):
+        if await self.aproject() is None:
+            raise Http404
+        return self.project
+
+    def get_issue_or_404(self):
+        if self.issue is None:
+            raise Http404
+        return self.issue
+
+
+def get_project_context(request, view):
+    context = getattr(request, "project_context", None)
+    if context is None:
+        context = ProjectContext(request, view)
+        request.project_context = context
+    return context
@@ -0,0 +1,197 @@
+import asyncio
+import json
+import threading
+from collections import deque
+from django.conf import settings
+from django.db import transaction
+from django.http import StreamingHttpResponse
+
+# Sent, then the stream ends, when a subscriber fell too far behind: the client
+# refetches its lists and reconnects.
+RESYNC = "resync"
+
+
+class Subscription:
+    def __init__(self, bus, project_id, user_id, max_pending, loop):
+        self.bus = bus
+        self.project_id = project_id
+        self.user_id = user_id
+        self.max_pending = max_pending
+        self.loop = loop
+        self.pending = deque()
+        self.closed = None
+        self.ready = asyncio.Event()
+
+    def call_soon(self, callback, *args):
+        # Runs callback on the subscriber's event loop, from any thread.
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            callback(*args)
+            return
+        try:
+            self.loop.call_soon_threadsafe(callback, *args)
+        except RuntimeError:
+            # The loop is closed, and the stream gone with it.
+            self.bus.unsubscribe(self)
+
+    def push(self, event):
+        if self.closed is not None:
+            return
+        if len(self.pending) >= self.max_pending:
+            self.bus.overflows += 1
+            self.close({"type": RESYNC})
+            return
+        self.pending.append(event)
+        self.ready.set()
+
+    def close(self, event=None):
+        if self.closed is None:
+            self.closed = event or {}
+            self.bus.unsubscribe(self)
+            self.ready.set()
+
+    async def get(self, timeout):
+        # Returns the next event, None after `timeout` seconds without one, or
+        # raises StopAsyncIteration once closed and drained.
+        if not self.pending and self.closed is None:
+            try:
+                await asyncio.wait_for(self.ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        if self.pending:
+            event = self.pending.popleft()
+        elif self.closed:
+            event, self.closed = self.closed, {}
+        else:
+            raise StopAsyncIteration
+        if not self.pending and self.closed is None:
+            self.ready.clear()
+        return event
+
+
+class EventBus:
+    def __init__(self, max_pending=100, max_subscribers=10000):
+        self.max_pending = max_pending
+        self.max_subscribers = max_subscribers
+        self._subscriptions = {}
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.published = 0
+        self.delivered = 0
+        self.overflows = 0
+
+    def stats(self):
+        with self._lock:
+            subscribers = sum(len(subs) for subs in self._subscriptions.values())
+            projects = len(self._subscriptions)
+        return {
+            "subscribers": subscribers,
+            "projects": projects,
+            "published": self.published,
+            "delivered": self.delivered,
+            "overflows": self.overflows,
+        }
+
+    def has_subscribers(self, project_id=None):
+        if project_id is None:
+            return bool(self._subscriptions)
+        return project_id in self._subscriptions
+
+    def subscribe(self, project_id, user_id):
+        # Returns None when the bus already holds max_subscribers.
+        subscription = Subscription(
+            self, project_id, user_id, self.max_pending, asyncio.get_running_loop()
+        )
+        with self._lock:
+            count = sum(len(subs) for subs in self._subscriptions.values())
+            if count >= self.max_subscribers:
+                return None
+            self._subscriptions.setdefault(project_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.project_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.project_id]
+
+    def publish(self, project_id, event):
+        # May run in any thread; each subscriber gets the event on its loop.
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(project_id, ()))
+        self.published += 1
+        for subscription in subscriptions:
+            subscription.call_soon(subscription.push, event)
+        self.delivered += len(subscriptions)
+
+    def close(self, project_id, user_id=None, event=None):
+        # Ends the streams of a project, or of one of its users.
+        with self._lock:
+            subscriptions = [
+                subscription
+                for subscription in self._subscriptions.get(project_id, ())
+                if user_id is None or subscription.user_id == user_id
+            ]
+        for subscription in subscriptions:
+            subscription.call_soon(subscription.close, event)
+
+    def publish_on_commit(self, project_id, event):
+        transaction.on_commit(lambda: self.publish(project_id, event))
+
+    def close_on_commit(self, project_id, user_id=None, event=None):
+        transaction.on_commit(lambda: self.close(project_id, user_id, event))
+
+
+def format_event(event):
+    event = dict(event)
+    name = event.pop("type", None)
+    lines = [f"event: {name}"] if name else []
+    lines.append(f"data: {json.dumps(event, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def stream(subscription, heartbeat):
+    try:
+        # Sent at once so clients and proxies see the stream is open.
+        yield ": connected\n\n"
+        while True:
+            try:
+                event = await subscription.get(heartbeat)
+            except StopAsyncIteration:
+                return
+            yield ": keep-alive\n\n" if event is None else format_event(event)
+    finally:
+        subscription.close()
+
+
+class EventStreamResponse(StreamingHttpResponse):
+    def __init__(self, subscription, heartbeat):
+        super().__init__(
+            stream(subscription, heartbeat), content_type="text/event-stream"
+        )
+        self.subscription = subscription
+        self["Cache-Control"] = "no-cache"
+        self["X-Accel-Buffering"] = "no"
+
+    def close(self):
+        # Django closes the response once the client is gone.
+        self.subscription.call_soon(self.subscription.close)
+        super().close()
+
+
+def bus_from_settings():
+    options = getattr(settings, "EVENT_STREAM", {})
+    return EventBus(
+        max_pending=options.get("MAX_PENDING", 100),
+        max_subscribers=options.get("MAX_SUBSCRIBERS", 10000),
+    )
+
+
+event_bus = bus_from_settings()
@@ -0,0 +1,85 @@
+import csv
+from datetime import datetime
+from django.core.serializers.json import DjangoJSONEncoder
+from .models import Project, Contributor, Issue, Comment
+
+# record type -> exported columns, in the order they are written.
+EXPORT_FIELDS = {
+    "project": ("id", "title", "description", "type", "author_user_id"),
+    "contributor": ("id", "project", "user", "permission", "role"),
+    "issue": (
+        "id",
+        "project",
+        "title",
+        "description",
+        "tag",
+        "priority",
+        "status",
+        "author_user_id",
+        "assignee_user_id",
+        "created_time",
+    ),
+    "comment": ("id", "issue", "description", "author_user_id", "created_time"),
+}
+
+CSV_COLUMNS = ["record"] + list(
+    dict.fromkeys(name for fields in EXPORT_FIELDS.values() for name in fields)
+)
+
+
+def iter_project_records(project_id, chunk_size=2000):
+    project = Project.objects.filter(pk=project_id).values(*EXPORT_FIELDS["project"])
+    for row in project:
+        yield "project", row
+    contributors = (
+        Contributor.objects.filter(project_id=project_id)
+        .order_by("id")
+        .values(*EXPORT_FIELDS["contributor"])
+    )
+    for row in contributors.iterator(chunk_size=chunk_size):
+        yield "contributor", row
+    issues = (
+        Issue.objects.filter(project_id=project_id)
+        .order_by("id")
+        .values(*EXPORT_FIELDS["issue"])
+    )
+    comments = (
+        Comment.objects.filter(issue__project_id=project_id)
+        .order_by("issue_id", "id")
+        .values(*EXPORT_FIELDS["comment"])
+        .iterator(chunk_size=chunk_size)
+    )
+    # Both cursors walk in issue order, so each issue is followed by its
+    # comments without holding more than one chunk of either in memory.
+    comment = next(comments, None)
+    for row in issues.iterator(chunk_size=chunk_size):
+        yield "issue", row
+        while comment is not None and comment["issue"] == row["id"]:
+            yield "comment", comment
+            comment = next(comments, None)
+
+
+def ndjson_lines(records):
+    encoder = DjangoJSONEncoder(separators=(",", ":"))
+    for record_type, row in records:
+        yield encoder.encode({"record": record_type, **row}) + "\n"
+
+
+class LineBuffer:
+    def write(self, value):
+        return value
+
+
+def csv_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def csv_lines(records):
+    writer = csv.writer(LineBuffer())
+    yield writer.writerow(CSV_COLUMNS)
+    for record_type, row in records:
+        yield writer.writerow(
+            [record_type] + [csv_value(row.get(name, "")) for name in CSV_COLUMNS[1:]]
+        )
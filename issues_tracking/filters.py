@@ -0,0 +1,60 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
+
+
+class FieldFilterBackend(BaseFilterBackend):
+    # ?status=TODO or ?status=TODO,ONGOING on any field in view.filter_fields.
+    separator = ","
+
+    def clean(self, field, value):
+        if field.is_relation:
+            field = field.target_field
+        return field.clean(value, None)
+
+    def filter_queryset(self, request, queryset, view):
+        filters, errors = {}, {}
+        for name in getattr(view, "filter_fields", ()):
+            if name not in request.query_params:
+                continue
+            field = queryset.model._meta.get_field(name)
+            values = request.query_params[name].split(self.separator)
+            try:
+                cleaned = [self.clean(field, value) for value in values]
+            except DjangoValidationError as error:
+                errors[name] = error.messages
+                continue
+            if len(cleaned) == 1:
+                filters[name] = cleaned[0]
+            else:
+                filters[f"{name}__in"] = cleaned
+        if errors:
+            raise ValidationError(errors)
+        return queryset.filter(**filters)
+
+
+class IndexedOrderingFilter(OrderingFilter):
+    # Only view.ordering_fields, each backed by an index, may be sorted on:
+    # anything else is rejected rather than sorted with a table scan.
+    tiebreaker = "id"
+
+    def remove_invalid_fields(self, queryset, fields, view, request):
+        valid = {name for name, _ in self.get_valid_fields(queryset, view)}
+        invalid = [term for term in fields if term.lstrip("-") not in valid]
+        if invalid:
+            raise ValidationError(
+                {
+                    self.ordering_param: [
+                        f"Unsupported sort key(s): {', '.join(invalid)}. "
+                        f"Use one of: {', '.join(sorted(valid))}."
+                    ]
+                }
+            )
+        return fields
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if ordering and ordering[-1].lstrip("-") != self.tiebreaker:
+            descending = ordering[-1].startswith("-")
+            ordering = [*ordering, f"{'-' if descending else ''}{self.tiebreaker}"]
+        return ordering
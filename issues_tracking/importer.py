@@ -0,0 +1,118 @@
+import csv
+import json
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+from . import changelog
+from .models import Change, Issue, Comment
+from .serializers import IssueSerializer, CommentSerializer
+from .stats import rebuild_comment_counters, record_issue_changes
+
+# Records of an export that describe the target project itself.
+SKIPPED_RECORDS = ("project", "contributor")
+
+
+def read_ndjson(lines):
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as error:
+            yield number, None, f"Invalid JSON: {error}"
+            continue
+        if not isinstance(row, dict):
+            yield number, None, "Expected a JSON object."
+            continue
+        yield number, row, None
+
+
+def read_csv(lines):
+    reader = csv.DictReader(lines)
+    for row in reader:
+        yield reader.line_num, row, None
+
+
+READERS = {"ndjson": read_ndjson, "csv": read_csv}
+
+
+class IssueImporter:
+    def __init__(self, project_id, author, chunk_size=2000):
+        self.project_id = project_id
+        self.author = author
+        self.chunk_size = chunk_size
+        self.created = {"issue": 0, "comment": 0}
+        self.issue_serializer = IssueSerializer()
+        self.comment_serializer = CommentSerializer()
+        self.issues = []
+        self.comments = []
+        self.last_issue = None
+
+    def run(self, rows):
+        for line, row, error in rows:
+            if error is None:
+                error = self.add(row)
+            if error is not None:
+                yield {"line": line, "errors": error}
+            if len(self.issues) + len(self.comments) >= self.chunk_size:
+                self.flush()
+        self.flush()
+
+    def add(self, row):
+        record = row.get("record") or "issue"
+        if record in SKIPPED_RECORDS:
+            return None
+        if record == "issue":
+            return self.add_issue(row)
+        if record == "comment":
+            return self.add_comment(row)
+        return f"Unknown record type: {record}"
+
+    def validate(self, serializer, row):
+        try:
+            return serializer.run_validation(row), None
+        except ValidationError as error:
+            return None, error.detail
+
+    def add_issue(self, row):
+        attrs, errors = self.validate(self.issue_serializer, row)
+        if errors:
+            self.last_issue = None
+            return errors
+        issue = Issue(**attrs, project_id=self.project_id, author_user_id=self.author)
+        issue.set_default_assignee()
+        self.issues.append(issue)
+        self.last_issue = (str(row.get("id", "")), issue)
+        return None
+
+    def add_comment(self, row):
+        source_id, issue = self.last_issue or (None, None)
+        if issue is None or str(row.get("issue", "")) != source_id:
+            return {
+                "issue": ["Comments must directly follow the issue they belong to."]
+            }
+        attrs, errors = self.validate(self.comment_serializer, row)
+        if errors:
+            return errors
+        self.comments.append(Comment(**attrs, issue=issue, author_user_id=self.author))
+        return None
+
+    @transaction.atomic
+    def flush(self):
+        if self.issues:
+            Issue.objects.bulk_create(self.issues)
+        if self.comments:
+            Comment.objects.bulk_create(self.comments)
+            rebuild_comment_counters({comment.issue_id for comment in self.comments})
+        if self.issues or self.comments:
+            # Also bumps the project version.
+            record_issue_changes(
+                ((None, issue.counted_values()) for issue in self.issues),
+                project_ids=[self.project_id],
+            )
+            for model, objs in (("issue", self.issues), ("comment", self.comments)):
+                changelog.record(
+                    model, Change.CREATED, self.project_id, [obj.pk for obj in objs]
+                )
+        self.created["issue"] += len(self.issues)
+        self.created["comment"] += len(self.comments)
+        self.issues, self.comments = [], []
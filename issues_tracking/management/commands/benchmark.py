@@ -0,0 +1,43 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from issues_tracking.benchmarks import SCENARIOS
+from issues_tracking.membership import membership_index
+from issues_tracking.response_cache import response_cache
+
+
+class Command(BaseCommand):
+    help = "Run the performance benchmarks against a throwaway test database."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "scenarios", nargs="*", help=f"Any of: {', '.join(SCENARIOS)}"
+        )
+        parser.add_argument(
+            "--scale",
+            type=float,
+            default=1.0,
+            help="Multiplier applied to the dataset sizes of each scenario.",
+        )
+
+    def handle(self, *args, **options):
+        names = options["scenarios"] or list(SCENARIOS)
+        unknown = [name for name in names if name not in SCENARIOS]
+        if unknown:
+            raise CommandError(f"Unknown scenario(s): {', '.join(unknown)}")
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        # Cached responses are keyed by ids the fresh database will reuse.
+        response_cache.cache.clear()
+        try:
+            with override_settings(DEBUG=False, ALLOWED_HOSTS=["testserver"]):
+                for name in names:
+                    self.stdout.write(self.style.MIGRATE_HEADING(name))
+                    SCENARIOS[name](self.stdout, options["scale"])
+                    call_command("flush", interactive=False, verbosity=0)
+                    membership_index.clear()
+                    response_cache.clear()
+                    response_cache.cache.clear()
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
@@ -0,0 +1,28 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from issues_tracking.changelog import compact
+
+
+class Command(BaseCommand):
+    help = (
+        "Drop the change log rows superseded by a later change of the same "
+        "object, and the tombstones older than the retention period."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--retention-days",
+            type=int,
+            default=getattr(settings, "CHANGE_LOG", {}).get("RETENTION_DAYS", 30),
+            help="Age after which tombstones are dropped.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(days=options["retention_days"])
+        collapsed, dropped = compact(before, options["chunk_size"])
+        self.stdout.write(
+            f"Dropped {collapsed} superseded change(s) and {dropped} tombstone(s)."
+        )
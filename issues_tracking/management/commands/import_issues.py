@@ -0,0 +1,45 @@
+import json
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from issues_tracking.importer import IssueImporter, READERS
+from issues_tracking.models import Project
+
+
+class Command(BaseCommand):
+    help = "Import issues and comments from an NDJSON or CSV file into a project."
+
+    def add_arguments(self, parser):
+        parser.add_argument("project_id", type=int)
+        parser.add_argument("path")
+        parser.add_argument(
+            "--author",
+            required=True,
+            help="Email of the user recorded as author of the imported rows.",
+        )
+        parser.add_argument(
+            "--format",
+            choices=list(READERS),
+            help="File format, guessed from the file extension by default.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if not Project.objects.filter(pk=options["project_id"]).exists():
+            raise CommandError(f"Project {options['project_id']} does not exist.")
+        author = get_user_model().objects.filter(email=options["author"]).first()
+        if author is None:
+            raise CommandError(f"No user with email {options['author']}.")
+        path = options["path"]
+        file_format = options["format"] or (
+            "csv" if path.lower().endswith(".csv") else "ndjson"
+        )
+        importer = IssueImporter(options["project_id"], author, options["chunk_size"])
+        error_count = 0
+        with open(path, encoding="utf-8", newline="") as lines:
+            for error in importer.run(READERS[file_format](lines)):
+                error_count += 1
+                self.stderr.write(json.dumps(error))
+        self.stdout.write(
+            f"Imported {importer.created['issue']} issue(s) and "
+            f"{importer.created['comment']} comment(s), {error_count} error(s)."
+        )
@@ -0,0 +1,91 @@
+import json
+from itertools import islice
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from issues_tracking.models import Issue, Project
+from issues_tracking.stats import (
+    rebuild,
+    rebuild_comment_counters,
+    verify,
+    verify_issues,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount the project statistics and the counter columns of projects "
+        "and issues, and rebuild the drifted ones, or only report them with "
+        "--check."
+    )
+    # name -> (model, project field, verify, rebuild), the last two over chunks
+    # of primary keys.
+    counters = {
+        "project": (Project, "pk", verify, rebuild),
+        "issue": (Issue, "project_id", verify_issues, rebuild_comment_counters),
+    }
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "project_ids", nargs="*", type=int, help="Defaults to every project."
+        )
+        mode = parser.add_mutually_exclusive_group()
+        mode.add_argument(
+            "--check",
+            action="store_true",
+            help="Report drifted counters and fail instead of rebuilding them.",
+        )
+        mode.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Rebuild every counter, drifted or not.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=500)
+
+    def chunks(self, model, project_field, project_ids, size):
+        rows = model.objects.order_by("id")
+        if project_ids:
+            rows = rows.filter(**{f"{project_field}__in": project_ids})
+        ids = iter(list(rows.values_list("id", flat=True)))
+        while chunk := list(islice(ids, size)):
+            yield chunk
+
+    def handle(self, *args, **options):
+        counts = {}
+        for name, (model, project_field, verify, rebuild) in self.counters.items():
+            counts[name] = 0
+            chunks = self.chunks(
+                model, project_field, options["project_ids"], options["chunk_size"]
+            )
+            for chunk in chunks:
+                if options["rebuild"]:
+                    with transaction.atomic():
+                        rebuild(chunk)
+                    counts[name] += len(chunk)
+                    continue
+                with transaction.atomic():
+                    drift = verify(chunk)
+                    if drift and not options["check"]:
+                        rebuild(list(drift))
+                counts[name] += len(drift)
+                for pk, columns in drift.items():
+                    self.stderr.write(
+                        json.dumps(
+                            {
+                                name: pk,
+                                "drift": {
+                                    column: {"stored": stored, "actual": actual}
+                                    for column, (stored, actual) in columns.items()
+                                },
+                            },
+                            default=str,
+                        )
+                    )
+        summary = f"{counts['project']} project(s) and {counts['issue']} issue(s)"
+        if options["check"] and any(counts.values()):
+            raise CommandError(
+                f"{summary} have drifted counters; run without --check to fix them."
+            )
+        if options["check"]:
+            self.stdout.write("All counters are exact.")
+        else:
+            self.stdout.write(f"Rebuilt the counters of {summary}.")
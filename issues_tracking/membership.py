@@ -0,0 +1,228 @@
+import threading
+import uuid
+from asgiref.sync import sync_to_async
+from collections import OrderedDict, namedtuple
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import CharField, Value
+from softdesk.async_views import cache_call
+from .models import Project, Contributor
+
+VERSION_KEY = "issues_tracking:membership-index:version"
+AUTHOR = "AUTHOR"
+
+
+class Membership(namedtuple("Membership", ["authored", "contributed"])):
+    @property
+    def project_ids(self):
+        return self.authored | self.contributed.keys()
+
+
+EMPTY_MEMBERSHIP = Membership(frozenset(), {})
+
+
+class MembershipIndex:
+    def __init__(self, max_users=10000, max_projects=10000, cache="default"):
+        self.max_users = max_users
+        self.max_projects = max_projects
+        self.cache_alias = cache
+        self._users = OrderedDict()
+        self._authors = OrderedDict()
+        self._lock = threading.RLock()
+        self._version = None
+        self.reset_stats()
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.stale_resets = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "stale_resets": self.stale_resets,
+            "users": len(self._users),
+            "projects": len(self._authors),
+            "version": self._version,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+            self._authors.clear()
+            self._version = self.cache.get(VERSION_KEY)
+
+    def get(self, user_id):
+        self._sync()
+        return self._cached(self._users, user_id, self._load_user, self.max_users)
+
+    def author_of(self, project_id):
+        self._sync()
+        return self._cached(
+            self._authors, project_id, self._load_author, self.max_projects
+        )
+
+    def resolve(self, user_id, project_id):
+        self._sync()
+        author_id = self._cached(
+            self._authors, project_id, self._load_author, self.max_projects
+        )
+        membership = self._cached(self._users, user_id, self._load_user, self.max_users)
+        return author_id, membership
+
+    async def aresolve(self, user_id, project_id):
+        await self._async()
+        author_id = await self._acached(
+            self._authors, project_id, self._aload_author, self.max_projects
+        )
+        membership = await self._acached(
+            self._users, user_id, self._aload_user, self.max_users
+        )
+        return author_id, membership
+
+    def version(self):
+        self._sync()
+        if self._version is None:
+            self._bump()
+        return self._version
+
+    async def aversion(self):
+        await self._async()
+        if self._version is None:
+            await sync_to_async(self._bump)()
+        return self._version
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            self._users.pop(user_id, None)
+            self.invalidations += 1
+        self._bump()
+
+    def invalidate_project(self, project_id, author_id=None):
+        with self._lock:
+            self._authors.pop(project_id, None)
+            for user_id in [
+                user_id
+                for user_id, membership in self._users.items()
+                if user_id == author_id or project_id in membership.project_ids
+            ]:
+                del self._users[user_id]
+            self.invalidations += 1
+        self._bump()
+
+    def _lookup(self, entries, key):
+        with self._lock:
+            value = entries.get(key)
+            if value is not None:
+                entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+            return value, self._version
+
+    def _loaded(self, entries, key, value, version, limit):
+        with self._lock:
+            if value is not None and self._version == version:
+                self._store(entries, key, value, limit)
+        return value
+
+    def _cached(self, entries, key, load, limit):
+        value, version = self._lookup(entries, key)
+        if value is not None:
+            return value
+        return self._loaded(entries, key, load(key), version, limit)
+
+    async def _acached(self, entries, key, aload, limit):
+        value, version = self._lookup(entries, key)
+        if value is not None:
+            return value
+        return self._loaded(entries, key, await aload(key), version, limit)
+
+    def _author_query(self, project_id):
+        return Project.objects.filter(pk=project_id).values_list(
+            "author_user_id", flat=True
+        )
+
+    def _load_author(self, project_id):
+        return self._author_query(project_id).first()
+
+    async def _aload_author(self, project_id):
+        return await self._author_query(project_id).afirst()
+
+    def _user_query(self, user_id):
+        authored = Project.objects.filter(author_user_id=user_id).annotate(
+            role=Value(AUTHOR, output_field=CharField())
+        )
+        contributed = Contributor.objects.filter(user_id=user_id)
+        return authored.values_list("id", "role").union(
+            contributed.values_list("project_id", "permission"), all=True
+        )
+
+    def _membership(self, rows):
+        authored_ids = set()
+        contributed_ids = {}
+        for project_id, role in rows:
+            if role == AUTHOR:
+                authored_ids.add(project_id)
+            else:
+                contributed_ids[project_id] = role
+        return Membership(frozenset(authored_ids), contributed_ids)
+
+    def _load_user(self, user_id):
+        return self._membership(self._user_query(user_id))
+
+    async def _aload_user(self, user_id):
+        return self._membership([row async for row in self._user_query(user_id)])
+
+    def _store(self, entries, key, value, limit):
+        entries[key] = value
+        entries.move_to_end(key)
+        while len(entries) > limit:
+            entries.popitem(last=False)
+            self.evictions += 1
+
+    def _sync(self):
+        self._sync_to(self.cache.get(VERSION_KEY))
+
+    async def _async(self):
+        self._sync_to(await cache_call(self.cache, "get", VERSION_KEY))
+
+    def _sync_to(self, version):
+        with self._lock:
+            if version == self._version:
+                return
+            if self._users or self._authors:
+                self.stale_resets += 1
+            self._users.clear()
+            self._authors.clear()
+            self._version = version
+
+    def _bump(self):
+        self._sync()
+        version = uuid.uuid4().hex
+        with self._lock:
+            self.cache.set(VERSION_KEY, version, None)
+            self._version = version
+
+
+def index_from_settings():
+    options = getattr(settings, "MEMBERSHIP_INDEX", {})
+    return MembershipIndex(
+        max_users=options.get("MAX_USERS", 10000),
+        max_projects=options.get("MAX_PROJECTS", 10000),
+        cache=options.get("CACHE", "default"),
+    )
+
+
+membership_index = index_from_settings()
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.1 on 2026-10-18 16:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("issues_tracking", "0003_alter_comment_description"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="contributor",
+            index=models.Index(
+                fields=["user", "project"], name="contributor_user_project_idx"
+            ),
+        ),
+    ]
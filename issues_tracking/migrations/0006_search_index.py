@@ -0,0 +1,139 @@
+from django.db import migrations
+
+# Issues are stored under rowid 2 * id and comments under 2 * id + 1, so the
+# triggers can address the row of any issue or comment directly.
+CREATE_SEARCH_TRIGGERS = [
+    """
+    CREATE TRIGGER issues_tracking_issue_search_insert
+    AFTER INSERT ON issues_tracking_issue BEGIN
+        INSERT INTO issues_tracking_search
+            (rowid, title, body, kind, project_id, issue_id)
+        VALUES
+            (2 * new.id, new.title, new.description, 'issue', new.project_id, new.id);
+    END
+    """,
+    """
+    CREATE TRIGGER issues_tracking_issue_search_update
+    AFTER UPDATE OF title, description, project_id ON issues_tracking_issue BEGIN
+        UPDATE issues_tracking_search
+        SET title = new.title, body = new.description, project_id = new.project_id
+        WHERE rowid = 2 * old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER issues_tracking_issue_search_move
+    AFTER UPDATE OF project_id ON issues_tracking_issue
+    WHEN old.project_id IS NOT new.project_id BEGIN
+        UPDATE issues_tracking_search
+        SET project_id = new.project_id
+        WHERE rowid IN (
+            SELECT 2 * id + 1 FROM issues_tracking_comment WHERE issue_id = new.id
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER issues_tracking_issue_search_delete
+    AFTER DELETE ON issues_tracking_issue BEGIN
+        DELETE FROM issues_tracking_search WHERE rowid = 2 * old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER issues_tracking_comment_search_insert
+    AFTER INSERT ON issues_tracking_comment BEGIN
+        INSERT INTO issues_tracking_search
+            (rowid, title, body, kind, project_id, issue_id)
+        SELECT 2 * new.id + 1, '', new.description, 'comment', project_id, id
+        FROM issues_tracking_issue WHERE id = new.issue_id;
+    END
+    """,
+    """
+    CREATE TRIGGER issues_tracking_comment_search_update
+    AFTER UPDATE OF description, issue_id ON issues_tracking_comment BEGIN
+        UPDATE issues_tracking_search
+        SET body = new.description,
+            issue_id = new.issue_id,
+            project_id = (
+                SELECT project_id FROM issues_tracking_issue WHERE id = new.issue_id
+            )
+        WHERE rowid = 2 * old.id + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER issues_tracking_comment_search_delete
+    AFTER DELETE ON issues_tracking_comment BEGIN
+        DELETE FROM issues_tracking_search WHERE rowid = 2 * old.id + 1;
+    END
+    """,
+]
+
+CREATE_SEARCH_INDEX = [
+    """
+    CREATE VIRTUAL TABLE issues_tracking_search USING fts5(
+        title,
+        body,
+        kind UNINDEXED,
+        project_id UNINDEXED,
+        issue_id UNINDEXED,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    *CREATE_SEARCH_TRIGGERS,
+    """
+    INSERT INTO issues_tracking_search (rowid, title, body, kind, project_id, issue_id)
+    SELECT 2 * id, title, description, 'issue', project_id, id
+    FROM issues_tracking_issue
+    """,
+    """
+    INSERT INTO issues_tracking_search (rowid, title, body, kind, project_id, issue_id)
+    SELECT 2 * comment.id + 1, '', comment.description, 'comment',
+        issue.project_id, issue.id
+    FROM issues_tracking_comment AS comment
+    JOIN issues_tracking_issue AS issue ON issue.id = comment.issue_id
+    """,
+]
+
+# SQLite rebuilds a table to add a NOT NULL column to it, which fails while
+# triggers on other tables refer to it: later migrations altering issues or
+# comments drop these triggers first and create them again afterwards.
+DROP_SEARCH_TRIGGERS = [
+    "DROP TRIGGER IF EXISTS issues_tracking_issue_search_insert",
+    "DROP TRIGGER IF EXISTS issues_tracking_issue_search_update",
+    "DROP TRIGGER IF EXISTS issues_tracking_issue_search_move",
+    "DROP TRIGGER IF EXISTS issues_tracking_issue_search_delete",
+    "DROP TRIGGER IF EXISTS issues_tracking_comment_search_insert",
+    "DROP TRIGGER IF EXISTS issues_tracking_comment_search_update",
+    "DROP TRIGGER IF EXISTS issues_tracking_comment_search_delete",
+]
+
+DROP_SEARCH_INDEX = [
+    *DROP_SEARCH_TRIGGERS,
+    "DROP TABLE IF EXISTS issues_tracking_search",
+]
+
+
+def has_fts5(connection):
+    if connection.vendor != "sqlite":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+def run(statements):
+    # Other databases, or SQLite builds without FTS5, use the Python index.
+    def operation(apps, schema_editor):
+        if has_fts5(schema_editor.connection):
+            for statement in statements:
+                schema_editor.execute(statement)
+
+    return operation
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("issues_tracking", "0005_project_version"),
+    ]
+
+    operations = [
+        migrations.RunPython(run(CREATE_SEARCH_INDEX), run(DROP_SEARCH_INDEX)),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.0.1 on 2026-10-18 17:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("issues_tracking", "0007_issue_list_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProjectStats",
+            fields=[
+                (
+                    "project",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stats",
+                        serialize=False,
+                        to="issues_tracking.project",
+                    ),
+                ),
+                ("issue_count", models.IntegerField(default=0)),
+                ("status_todo", models.IntegerField(default=0)),
+                ("status_ongoing", models.IntegerField(default=0)),
+                ("status_done", models.IntegerField(default=0)),
+                ("priority_low", models.IntegerField(default=0)),
+                ("priority_med", models.IntegerField(default=0)),
+                ("priority_high", models.IntegerField(default=0)),
+                ("tag_bug", models.IntegerField(default=0)),
+                ("tag_imp", models.IntegerField(default=0)),
+                ("tag_tsk", models.IntegerField(default=0)),
+                ("contributor_count", models.IntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.0.1 on 2026-10-18 17:35
+
+import importlib
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+search_index = importlib.import_module("issues_tracking.migrations.0006_search_index")
+
+
+def count(model, aggregate, **filters):
+    rows = model.objects.filter(**filters).order_by().values(*filters)
+    return Subquery(rows.annotate(value=aggregate).values("value"))
+
+
+def fill_counters(apps, schema_editor):
+    Project = apps.get_model("issues_tracking", "Project")
+    Contributor = apps.get_model("issues_tracking", "Contributor")
+    Issue = apps.get_model("issues_tracking", "Issue")
+    Comment = apps.get_model("issues_tracking", "Comment")
+    Project.objects.update(
+        issue_count=Coalesce(count(Issue, Count("id"), project=OuterRef("pk")), 0),
+        open_issue_count=Coalesce(
+            count(Issue, Count("id", filter=~Q(status="DONE")), project=OuterRef("pk")),
+            0,
+        ),
+        contributor_count=Coalesce(
+            count(Contributor, Count("id"), project=OuterRef("pk")), 0
+        ),
+    )
+    Issue.objects.update(
+        comment_count=Coalesce(count(Comment, Count("id"), issue=OuterRef("pk")), 0),
+        last_comment_time=count(Comment, Max("created_time"), issue=OuterRef("pk")),
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("issues_tracking", "0008_project_stats"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            search_index.run(search_index.DROP_SEARCH_TRIGGERS),
+            search_index.run(search_index.CREATE_SEARCH_TRIGGERS),
+        ),
+        migrations.AddField(
+            model_name="issue",
+            name="comment_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="issue",
+            name="last_comment_time",
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="contributor_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="issue_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="open_issue_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(
+            search_index.run(search_index.CREATE_SEARCH_TRIGGERS),
+            search_index.run(search_index.DROP_SEARCH_TRIGGERS),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
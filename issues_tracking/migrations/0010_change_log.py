@@ -0,0 +1,88 @@
+# Generated by Django 5.0.1 on 2026-10-18 18:24
+
+from django.db import migrations, models
+
+
+def seed_change_log(apps, schema_editor):
+    # Existing rows are logged as created, so a first sync returns them.
+    Change = apps.get_model("issues_tracking", "Change")
+    sources = [
+        ("project", apps.get_model("issues_tracking", "Project"), "id"),
+        ("contributor", apps.get_model("issues_tracking", "Contributor"), "project_id"),
+        ("issue", apps.get_model("issues_tracking", "Issue"), "project_id"),
+        ("comment", apps.get_model("issues_tracking", "Comment"), "issue__project_id"),
+    ]
+    for name, model, project in sources:
+        rows = model.objects.order_by("id").values_list("id", project)
+        Change.objects.bulk_create(
+            (
+                Change(model=name, object_id=pk, project_id=project_id, action="C")
+                for pk, project_id in rows.iterator(chunk_size=2000)
+            ),
+            batch_size=2000,
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("issues_tracking", "0009_counter_columns"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ChangeLogCompaction",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("compacted_through", models.BigIntegerField()),
+                ("time", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="Change",
+            fields=[
+                ("seq", models.BigAutoField(primary_key=True, serialize=False)),
+                ("project_id", models.BigIntegerField()),
+                (
+                    "model",
+                    models.CharField(
+                        choices=[
+                            ("project", "Project"),
+                            ("contributor", "Contributor"),
+                            ("issue", "Issue"),
+                            ("comment", "Comment"),
+                        ],
+                        max_length=11,
+                    ),
+                ),
+                ("object_id", models.BigIntegerField()),
+                (
+                    "action",
+                    models.CharField(
+                        choices=[("C", "Created"), ("U", "Updated"), ("D", "Deleted")],
+                        max_length=1,
+                    ),
+                ),
+                ("time", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["project_id", "seq"], name="change_project_seq_idx"
+                    ),
+                    models.Index(
+                        fields=["model", "object_id", "seq"],
+                        name="change_object_seq_idx",
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(seed_change_log, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.1 on 2026-10-18 20:36
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("issues_tracking", "0010_change_log"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="projectstats",
+            name="contributor_count",
+        ),
+        migrations.RemoveField(
+            model_name="projectstats",
+            name="issue_count",
+        ),
+    ]
@@ -0,0 +1,410 @@
+import asyncio
+import hashlib
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.http import StreamingHttpResponse
+from django.utils.http import parse_etags
+from rest_framework import serializers, status
+from rest_framework.fields import Field
+from rest_framework.relations import PrimaryKeyRelatedField, RelatedField
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.response import Response
+from .context import get_project_context
+from .renderers import StreamingJSONRenderer
+from .response_cache import response_cache
+
+READ_ACTIONS = ("list", "retrieve")
+
+
+class QueryPlan:
+    def __init__(self, select_related=(), prefetch_related=(), only=()):
+        self.select_related = sorted(select_related)
+        self.prefetch_related = sorted(prefetch_related)
+        self.only = sorted(only)
+
+    def apply(self, queryset, read=False):
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        if read and self.only:
+            queryset = queryset.only(*self.only)
+        return queryset
+
+
+def build_query_plan(serializer_class, model, fieldset=None):
+    # fieldset, when given, names the only fields whose columns are read.
+    meta = getattr(serializer_class, "Meta", None)
+    select_related = set(getattr(meta, "select_related", ()))
+    prefetch_related = set(getattr(meta, "prefetch_related", ()))
+    only = {model._meta.pk.name}
+    for name, field in serializer_class().fields.items():
+        if field.source == "*" or (fieldset is not None and name not in fieldset):
+            continue
+        path = field.source.split(".")
+        current = model
+        for depth, name in enumerate(path):
+            try:
+                model_field = current._meta.get_field(name)
+            except FieldDoesNotExist:
+                break
+            lookup = "__".join(path[: depth + 1])
+            if model_field.many_to_many or model_field.one_to_many:
+                prefetch_related.add(lookup)
+                break
+            only.add(lookup)
+            if not model_field.is_relation or depth == len(path) - 1:
+                break
+            select_related.add(lookup)
+            current = model_field.related_model
+    for lookup in select_related:
+        parts = lookup.split("__")
+        only.update("__".join(parts[: depth + 1]) for depth in range(len(parts)))
+    return QueryPlan(select_related, prefetch_related, only)
+
+
+class RelatedQuerysetMixin:
+    query_plans = {}
+
+    def get_query_plan(self, model):
+        serializer_class = self.get_serializer_class()
+        fieldset = None
+        if self.action in READ_ACTIONS and hasattr(serializer_class, "get_fieldset"):
+            fieldset = serializer_class.get_fieldset(self.request)
+        key = (serializer_class, model, fieldset)
+        if key not in self.query_plans:
+            self.query_plans[key] = build_query_plan(serializer_class, model, fieldset)
+        return self.query_plans[key]
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        plan = self.get_query_plan(queryset.model)
+        return plan.apply(queryset, read=self.action in READ_ACTIONS)
+
+
+class ReadPlan:
+    # Builds the representations of values_list() rows, as the serializer
+    # would those of the model instances.
+    def __init__(self, names, lookups, converters):
+        self.names = names
+        self.lookups = lookups
+        self.converted = [
+            (name, convert)
+            for name, convert in zip(names, converters)
+            if convert is not None
+        ]
+
+    def apply(self, queryset):
+        # Pagination reads the pk and the ordering columns off the rows, so
+        # they are fetched too, after the serialized ones.
+        ordering = [
+            term.lstrip("-")
+            for term in queryset.query.order_by
+            if isinstance(term, str)
+        ]
+        pk = queryset.model._meta.pk.name
+        columns = dict.fromkeys([*self.lookups, pk, *ordering])
+        return queryset.values_list(*columns, named=True)
+
+    def represent(self, rows):
+        names, converted = self.names, self.converted
+        representations = []
+        for row in rows:
+            representation = dict(zip(names, row))
+            for name, convert in converted:
+                value = representation[name]
+                if value is not None:
+                    representation[name] = convert(value)
+            representations.append(representation)
+        return representations
+
+
+def column_lookup(model, source_attrs):
+    # The values() lookup and model field of a source that is a column of the
+    # model, or of one reached through non-null foreign keys; None otherwise.
+    current, model_field = model, None
+    for depth, name in enumerate(source_attrs):
+        if model_field is not None:
+            if not model_field.is_relation or model_field.null:
+                return None
+            current = model_field.related_model
+        try:
+            model_field = current._meta.get_field(name)
+        except FieldDoesNotExist:
+            return None
+        if not model_field.concrete or model_field.many_to_many:
+            return None
+    if model_field is None:
+        return None
+    return "__".join(source_attrs), model_field
+
+
+def compile_field(field, model_field):
+    # Returns (compiled, convert); convert is None when the column value is
+    # the representation already.
+    if isinstance(field, PrimaryKeyRelatedField):
+        compiled = (
+            type(field).get_attribute is RelatedField.get_attribute
+            and type(field).to_representation
+            is PrimaryKeyRelatedField.to_representation
+            and field.pk_field is None
+        )
+        return compiled, None
+    if model_field.is_relation or type(field).get_attribute is not Field.get_attribute:
+        return False, None
+    if type(field) in (serializers.CharField, serializers.IntegerField):
+        return True, None
+    if type(field) is serializers.ChoiceField and all(
+        isinstance(key, str) for key in field.choices
+    ):
+        return True, None
+    return True, field.to_representation
+
+
+def build_read_plan(serializer_class, model, fieldset=None):
+    # None when a field is not a column as is: a method field, a nested
+    # serializer, a custom to_representation(), or fields that depend on the
+    # request beyond the fieldset.
+    if getattr(getattr(serializer_class, "Meta", None), "optional_fields", ()):
+        return None
+    serializer = serializer_class()
+    representation = type(serializer).to_representation
+    if representation is not serializers.Serializer.to_representation:
+        return None
+    names, lookups, converters = [], [], []
+    for name, field in serializer.fields.items():
+        if field.write_only or (fieldset is not None and name not in fieldset):
+            continue
+        column = column_lookup(model, field.source_attrs)
+        if column is None:
+            return None
+        compiled, convert = compile_field(field, column[1])
+        if not compiled:
+            return None
+        names.append(name)
+        lookups.append(column[0])
+        converters.append(convert)
+    return ReadPlan(names, lookups, converters)
+
+
+class FastReadMixin:
+    # Lists rows read with values_list() through a ReadPlan compiled from the
+    # list serializer, without model or serializer instances. Serializers the
+    # plan cannot express are used as usual.
+    read_plans = {}
+
+    def get_read_plan(self, model):
+        if not getattr(settings, "FAST_READ", {}).get("ENABLED", True):
+            return None
+        serializer_class = self.get_serializer_class()
+        fieldset = None
+        if hasattr(serializer_class, "get_fieldset"):
+            fieldset = serializer_class.get_fieldset(self.request)
+        key = (serializer_class, model, fieldset)
+        if key not in self.read_plans:
+            self.read_plans[key] = build_read_plan(serializer_class, model, fieldset)
+        return self.read_plans[key]
+
+    def get_read_queryset(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        plan = self.get_read_plan(queryset.model)
+        return (queryset if plan is None else plan.apply(queryset)), plan
+
+    def represent(self, plan, rows):
+        if plan is None:
+            return self.get_serializer(rows, many=True).data
+        return plan.represent(rows)
+
+    def list(self, request, *args, **kwargs):
+        queryset, plan = self.get_read_queryset()
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.represent(plan, page))
+        return Response(self.represent(plan, queryset))
+
+    async def alist(self, request, *args, **kwargs):
+        queryset, plan = self.get_read_queryset()
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.represent(plan, page))
+        return Response(self.represent(plan, [row async for row in queryset]))
+
+
+async def aiter_chunks(chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+class StreamingListMixin:
+    # List pages of at least STREAMING_JSON["MIN_ITEMS"] items are rendered as
+    # they are sent, in a chunked response, instead of as one body.
+    renderer_classes = [StreamingJSONRenderer, BrowsableAPIRenderer]
+
+    def should_stream(self, response):
+        if (
+            self.action != "list"
+            or not isinstance(response, Response)
+            or response.status_code != status.HTTP_200_OK
+            or not isinstance(response.accepted_renderer, StreamingJSONRenderer)
+        ):
+            return False
+        results = response.data
+        if isinstance(results, dict):
+            results = results.get("results")
+        min_items = getattr(settings, "STREAMING_JSON", {}).get("MIN_ITEMS", 100)
+        return isinstance(results, list) and len(results) >= min_items
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if not self.should_stream(response):
+            return response
+        chunks = response.accepted_renderer.stream(
+            response.data, response.accepted_media_type, response.renderer_context
+        )
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            # Native async views: Django reads sync iterators whole under ASGI.
+            chunks = aiter_chunks(chunks)
+        streaming = StreamingHttpResponse(
+            chunks,
+            status=response.status_code,
+            content_type=response.accepted_renderer.media_type,
+        )
+        for header, value in response.items():
+            if header.lower() != "content-type":
+                streaming[header] = value
+        return streaming
+
+
+def etag_matches(etag, if_none_match):
+    if not if_none_match:
+        return False
+    candidates = parse_etags(if_none_match)
+    return "*" in candidates or any(
+        candidate.removeprefix("W/") == etag.removeprefix("W/")
+        for candidate in candidates
+    )
+
+
+class ProjectETagMixin:
+    def get_version(self, context):
+        return context.version
+
+    async def aget_version(self, context):
+        return await context.aversion()
+
+    def get_etag(self, request):
+        context = get_project_context(request, self)
+        return self.make_etag(request, context, self.get_version(context))
+
+    async def aget_etag(self, request):
+        context = get_project_context(request, self)
+        return self.make_etag(request, context, await self.aget_version(context))
+
+    def make_etag(self, request, context, version):
+        if version is None:
+            return None
+        representation = f"{request.get_full_path()} {request.accepted_media_type}"
+        digest = hashlib.md5(representation.encode(), usedforsecurity=False)
+        return f'W/"{context.project_id}.{version}.{digest.hexdigest()[:16]}"'
+
+    def conditional(self, handler, request, *args, **kwargs):
+        # The version is read before the data, so a concurrent write can only
+        # make the ETag older than the body, never newer.
+        etag = self.get_etag(request)
+        if self.is_not_modified(request, etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = handler(request, *args, **kwargs)
+        return self.tag(response, etag)
+
+    async def aconditional(self, handler, request, *args, **kwargs):
+        etag = await self.aget_etag(request)
+        if self.is_not_modified(request, etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = await handler(request, *args, **kwargs)
+        return self.tag(response, etag)
+
+    def is_not_modified(self, request, etag):
+        return etag is not None and etag_matches(
+            etag, request.headers.get("If-None-Match")
+        )
+
+    def tag(self, response, etag):
+        if etag is not None and response.status_code in (200, 304):
+            response["ETag"] = etag
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(super().retrieve, request, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        return await self.aconditional(super().alist, request, *args, **kwargs)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return await self.aconditional(super().aretrieve, request, *args, **kwargs)
+
+
+class ResponseCacheMixin:
+    def get_cache_version(self, request):
+        return get_project_context(request, self).version
+
+    async def aget_cache_version(self, request):
+        return await get_project_context(request, self).aversion()
+
+    def get_cache_scope(self, request):
+        # Every member of a project sees the same lists.
+        return f"project:{get_project_context(request, self).project_id}"
+
+    def get_cache_key(self, request):
+        return response_cache.make_key(
+            type(self).__name__,
+            self.get_cache_scope(request),
+            request.build_absolute_uri(),
+            request.accepted_media_type,
+        )
+
+    def list(self, request, *args, **kwargs):
+        version = self.get_cache_version(request) if response_cache.enabled else None
+        if version is None:
+            return super().list(request, *args, **kwargs)
+        key = self.get_cache_key(request)
+        computed = {}
+
+        def compute():
+            response = super(ResponseCacheMixin, self).list(request, *args, **kwargs)
+            computed["response"] = response
+            return response.data, response.status_code == status.HTTP_200_OK
+
+        data = response_cache.get_or_compute(key, version, compute)
+        if "response" in computed:
+            return computed["response"]
+        return Response(data)
+
+    async def alist(self, request, *args, **kwargs):
+        version = None
+        if response_cache.enabled:
+            version = await self.aget_cache_version(request)
+        if version is None:
+            return await super().alist(request, *args, **kwargs)
+        key = self.get_cache_key(request)
+        computed = {}
+
+        async def compute():
+            response = await super(ResponseCacheMixin, self).alist(
+                request, *args, **kwargs
+            )
+            computed["response"] = response
+            return response.data, response.status_code == status.HTTP_200_OK
+
+        data = await response_cache.aget_or_compute(key, version, compute)
+        if "response" in computed:
+            return computed["response"]
+        return Response(data)
@@ -1,8 +1,25 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
+from softdesk.orm_cache import CachedManager
 
 
-class Project(models.Model):
+class CounterFieldsMixin:
+    # Counter columns are only written by F() updates (see stats.py): saving
+    # an instance loaded earlier must not write back its stale counts.
+    COUNTER_FIELDS = ()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            skipped = {*self.COUNTER_FIELDS, *self.get_deferred_fields()}
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in skipped
+            ]
+        super().save(*args, **kwargs)
+
+
+class Project(CounterFieldsMixin, models.Model):
     TYPES = (
         ("BE", "Back-end"),
         ("FE", "Front-end"),
@@ -22,6 +39,25 @@ class Project(models.Model):
         through="Contributor",
         related_name="contributed_projects",
     )
+    version = models.PositiveBigIntegerField(default=0, editable=False)
+    issue_count = models.IntegerField(default=0, editable=False)
+    open_issue_count = models.IntegerField(default=0, editable=False)
+    contributor_count = models.IntegerField(default=0, editable=False)
+
+    objects = CachedManager()
+
+    COUNTER_FIELDS = ("issue_count", "open_issue_count", "contributor_count")
+
+    def save(self, *args, **kwargs):
+        bump = not self._state.adding
+        if bump:
+            self.version = models.F("version") + 1
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "version"}
+        super().save(*args, **kwargs)
+        if bump:
+            # Reloaded from the database on next access.
+            del self.version
 
 
 class Contributor(models.Model):
@@ -31,11 +67,18 @@ class Contributor(models.Model):
     permission = models.CharField(max_length=100, choices=PERMISSIONS)
     role = models.CharField(max_length=100)
 
+    objects = CachedManager()
+
     class Meta:
         unique_together = ("project", "user")
+        indexes = [
+            models.Index(
+                fields=["user", "project"], name="contributor_user_project_idx"
+            )
+        ]
 
 
-class Issue(models.Model):
+class Issue(CounterFieldsMixin, models.Model):
     TAGS = (
         ("BUG", "Bug"),
         ("IMP", "Improvement"),
@@ -73,11 +116,59 @@ class Issue(models.Model):
         null=True,
     )
     created_time = models.DateTimeField(auto_now_add=True)
+    comment_count = models.IntegerField(default=0, editable=False)
+    last_comment_time = models.DateTimeField(null=True, editable=False)
 
-    def save(self, *args, **kwargs):
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["project", "status", "id"], name="issue_project_status_idx"
+            ),
+            models.Index(
+                fields=["project", "priority", "id"], name="issue_project_priority_idx"
+            ),
+            models.Index(fields=["project", "tag", "id"], name="issue_project_tag_idx"),
+            models.Index(
+                fields=["project", "assignee_user_id", "id"],
+                name="issue_project_assignee_idx",
+            ),
+            models.Index(
+                fields=["project", "created_time", "id"],
+                name="issue_project_created_idx",
+            ),
+            models.Index(
+                fields=["assignee_user_id", "status"], name="issue_assignee_status_idx"
+            ),
+        ]
+
+    COUNTER_FIELDS = ("comment_count", "last_comment_time")
+    # Fields counted by ProjectStats, remembered as loaded to compute deltas.
+    COUNTED_FIELDS = ("project_id", "status", "priority", "tag")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_counted_values()
+        return instance
+
+    def remember_counted_values(self):
+        if all(name in self.__dict__ for name in self.COUNTED_FIELDS):
+            self._counted_values = self.counted_values()
+        else:
+            self._counted_values = None
+
+    def counted_values(self):
+        return tuple(getattr(self, name) for name in self.COUNTED_FIELDS)
+
+    def set_default_assignee(self):
         if self.assignee_user_id is None:
             self.assignee_user_id = self.author_user_id
-        super().save(*args, **kwargs)
+
+    def save(self, *args, **kwargs):
+        self.set_default_assignee()
+        # Keeps the post_save statistics update in the same transaction.
+        with transaction.atomic(using=kwargs.get("using"), savepoint=False):
+            super().save(*args, **kwargs)
 
 
 class Comment(models.Model):
@@ -89,3 +180,60 @@ class Comment(models.Model):
     )
     issue = models.ForeignKey(Issue, on_delete=models.CASCADE, related_name="comments")
     created_time = models.DateTimeField(auto_now_add=True)
+
+    def save(self, *args, **kwargs):
+        # Keeps the post_save comment counters update in the same transaction.
+        with transaction.atomic(using=kwargs.get("using"), savepoint=False):
+            super().save(*args, **kwargs)
+
+
+class ProjectStats(models.Model):
+    project = models.OneToOneField(
+        Project, on_delete=models.CASCADE, primary_key=True, related_name="stats"
+    )
+    # The issue and contributor totals are Project counter columns.
+    status_todo = models.IntegerField(default=0)
+    status_ongoing = models.IntegerField(default=0)
+    status_done = models.IntegerField(default=0)
+    priority_low = models.IntegerField(default=0)
+    priority_med = models.IntegerField(default=0)
+    priority_high = models.IntegerField(default=0)
+    tag_bug = models.IntegerField(default=0)
+    tag_imp = models.IntegerField(default=0)
+    tag_tsk = models.IntegerField(default=0)
+
+
+class Change(models.Model):
+    # Append-only log of writes, read by the sync endpoint (see changelog.py).
+    # seq is an AUTOINCREMENT key on SQLite: never reused, even after deletes.
+    CREATED = "C"
+    UPDATED = "U"
+    DELETED = "D"
+    ACTIONS = ((CREATED, "Created"), (UPDATED, "Updated"), (DELETED, "Deleted"))
+    MODELS = (
+        ("project", "Project"),
+        ("contributor", "Contributor"),
+        ("issue", "Issue"),
+        ("comment", "Comment"),
+    )
+    seq = models.BigAutoField(primary_key=True)
+    # Not foreign keys: tombstones outlive the rows they describe.
+    project_id = models.BigIntegerField()
+    model = models.CharField(max_length=11, choices=MODELS)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=1, choices=ACTIONS)
+    time = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["project_id", "seq"], name="change_project_seq_idx"),
+            models.Index(
+                fields=["model", "object_id", "seq"], name="change_object_seq_idx"
+            ),
+        ]
+
+
+class ChangeLogCompaction(models.Model):
+    # Tombstones up to compacted_through were dropped: older cursors are stale.
+    compacted_through = models.BigIntegerField()
+    time = models.DateTimeField(auto_now_add=True)
@@ -0,0 +1,133 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.paginator import InvalidPage
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    BasePagination,
+    CursorPagination,
+    PageNumberPagination,
+)
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+MAX_PAGE_SIZE = getattr(settings, "PAGINATION", {}).get("MAX_PAGE_SIZE", 100)
+
+
+class AsyncPageNumberPagination(PageNumberPagination):
+    async def apaginate_queryset(self, queryset, request, view=None):
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        paginator = self.django_paginator_class(queryset, page_size)
+        # Paginator.count is a cached_property: filling it in keeps page()
+        # from counting synchronously.
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            )
+            raise NotFound(msg)
+        self.page.object_list = [obj async for obj in self.page.object_list]
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        self.request = request
+        return list(self.page)
+
+
+class KeysetPagination(CursorPagination):
+    ordering = "id"
+    page_size_query_param = "page_size"
+    max_page_size = MAX_PAGE_SIZE
+
+
+class OptInKeysetPagination(BasePagination):
+    mode_query_param = "pagination"
+    keyset_class = KeysetPagination
+    default_class = AsyncPageNumberPagination
+
+    def is_keyset(self, request):
+        params = request.query_params
+        return (
+            params.get(self.mode_query_param) == "cursor"
+            or self.keyset_class.cursor_query_param in params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        paginator_class = (
+            self.keyset_class if self.is_keyset(request) else self.default_class
+        )
+        self.paginator = paginator_class()
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        if self.is_keyset(request):
+            self.paginator = self.keyset_class()
+            return await sync_to_async(self.paginator.paginate_queryset)(
+                queryset, request, view
+            )
+        self.paginator = self.default_class()
+        return await self.paginator.apaginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def to_html(self):
+        return self.paginator.to_html()
+
+
+class LookaheadPagination(BasePagination):
+    # Fetches one row past the page instead of counting every match.
+    page_query_param = "page"
+    page_size_query_param = "page_size"
+    page_size = api_settings.PAGE_SIZE
+    max_page_size = MAX_PAGE_SIZE
+
+    def parse_positive(self, params, name, default, maximum=None):
+        if name not in params:
+            return default
+        try:
+            number = int(params[name])
+        except ValueError:
+            number = 0
+        if number < 1:
+            raise NotFound(f"Invalid {name}.")
+        return min(number, maximum) if maximum else number
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        self.request = request
+        self.page_size = self.parse_positive(
+            params, self.page_size_query_param, self.page_size, self.max_page_size
+        )
+        self.page = self.parse_positive(params, self.page_query_param, 1)
+        offset = (self.page - 1) * self.page_size
+        results = list(queryset[offset : offset + self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        return results[: self.page_size]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.page_query_param, self.page + 1)
+
+    def get_previous_link(self):
+        if self.page == 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.page - 1)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
@@ -0,0 +1,75 @@
+ANY = "ANY"
+AUTHOR = "AUTHOR"
+OWNER = "OWNER"
+LOW = "LOW"
+MED = "MED"
+HIGH = "HIGH"
+MEMBERS = (AUTHOR, HIGH, MED, LOW)
+
+# resource -> action -> roles allowed to perform it.
+# AUTHOR is the project author, LOW/MED/HIGH the Contributor.permission of the
+# caller and OWNER the author of the issue or comment being modified.
+POLICY = {
+    "project": {
+        "metadata": (ANY,),
+        "list": (ANY,),
+        "create": (ANY,),
+        "retrieve": MEMBERS,
+        "update": (AUTHOR,),
+        "destroy": (AUTHOR,),
+        "export": MEMBERS,
+        "stats": MEMBERS,
+        "events": MEMBERS,
+    },
+    "contributor": {
+        "metadata": (ANY,),
+        "list": MEMBERS,
+        "retrieve": MEMBERS,
+        "create": (AUTHOR, HIGH),
+        "destroy": (AUTHOR, HIGH),
+    },
+    "issue": {
+        "metadata": (ANY,),
+        "list": MEMBERS,
+        "retrieve": MEMBERS,
+        "create": MEMBERS,
+        "bulk_create": MEMBERS,
+        "bulk_update": MEMBERS,
+        "import_issues": MEMBERS,
+        "update": (OWNER, AUTHOR, HIGH, MED),
+        "destroy": (OWNER, AUTHOR, HIGH),
+    },
+    "comment": {
+        "metadata": (ANY,),
+        "list": MEMBERS,
+        "retrieve": MEMBERS,
+        "create": MEMBERS,
+        "update": (OWNER,),
+        "destroy": (OWNER, AUTHOR, HIGH),
+    },
+}
+
+
+class Policy:
+    def __init__(self, table):
+        self.rules = frozenset(
+            (resource, action, role)
+            for resource, actions in table.items()
+            for action, roles in actions.items()
+            for role in roles
+        )
+        self.object_level = frozenset(
+            (resource, action)
+            for resource, actions in table.items()
+            for action, roles in actions.items()
+            if OWNER in roles
+        )
+
+    def allows(self, resource, action, roles):
+        return any((resource, action, role) in self.rules for role in roles)
+
+    def is_object_level(self, resource, action):
+        return (resource, action) in self.object_level
+
+
+policy = Policy(POLICY)
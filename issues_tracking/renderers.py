@@ -0,0 +1,97 @@
+import csv
+import io
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.compat import LONG_SEPARATORS, SHORT_SEPARATORS
+from .events import format_event
+
+
+class NDJSONRenderer(JSONRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return super().render(data, accepted_media_type, renderer_context) + b"\n"
+
+
+class StreamingJSONRenderer(JSONRenderer):
+    # Renders as JSONRenderer does; stream() yields the same bytes in chunks
+    # of about chunk_size, encoding lists one item at a time, so a large page
+    # is never held as one string.
+    chunk_size = 64 * 1024
+
+    def stream(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            yield self.render(data, accepted_media_type, renderer_context)
+            return
+        separators = SHORT_SEPARATORS if self.compact else LONG_SEPARATORS
+        encoder = self.encoder_class(
+            ensure_ascii=self.ensure_ascii,
+            allow_nan=not self.strict,
+            separators=separators,
+        )
+        pieces, size = [], 0
+        for piece in self.encode(data, encoder, *separators):
+            pieces.append(piece)
+            size += len(piece)
+            if size >= self.chunk_size:
+                yield self.join(pieces)
+                pieces, size = [], 0
+        if pieces:
+            yield self.join(pieces)
+
+    def encode(self, data, encoder, item_separator, key_separator):
+        if isinstance(data, dict) and all(isinstance(key, str) for key in data):
+            yield "{"
+            for index, (key, value) in enumerate(data.items()):
+                yield f"{item_separator if index else ''}{encoder.encode(key)}"
+                yield key_separator
+                yield from self.encode(value, encoder, item_separator, key_separator)
+            yield "}"
+        elif isinstance(data, (list, tuple)):
+            yield "["
+            for index, item in enumerate(data):
+                if index:
+                    yield item_separator
+                yield encoder.encode(item)
+            yield "]"
+        else:
+            yield encoder.encode(data)
+
+    def join(self, pieces):
+        # The same escapes as render(), for a strict javascript subset.
+        chunk = "".join(pieces)
+        return chunk.replace("\u2028", "\\u2028").replace("\u2029", "\\u2029").encode()
+
+
+class CSVRenderer(BaseRenderer):
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return ""
+        rows = data if isinstance(data, list) else [data]
+        columns = list(dict.fromkeys(key for row in rows for key in row))
+        output = io.StringIO()
+        writer = csv.DictWriter(output, columns)
+        writer.writeheader()
+        writer.writerows(rows)
+        return output.getvalue()
+
+
+class EventStreamRenderer(BaseRenderer):
+    # Event streams are StreamingHttpResponses; only errors are rendered here,
+    # as a single "error" event.
+    media_type = "text/event-stream"
+    format = "sse"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return ""
+        return format_event({"type": "error", **data})
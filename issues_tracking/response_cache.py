@@ -0,0 +1,216 @@
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from django.conf import settings
+from django.core.cache import caches
+from softdesk.async_views import cache_call
+
+KEY_PREFIX = "issues_tracking:response-cache"
+
+
+class Entry(namedtuple("Entry", ["version", "created", "data"])):
+    def age(self, now):
+        return now - self.created
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        max_entries=1000,
+        ttl=300,
+        stale_ttl=0,
+        lock_timeout=5,
+        poll_interval=0.05,
+        cache="default",
+        enabled=True,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.lock_timeout = lock_timeout
+        self.poll_interval = poll_interval
+        self.cache_alias = cache
+        self.enabled = enabled
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self.reset_stats()
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def reset_stats(self):
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.stale_hits = 0
+        self.waits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.compute_time = 0.0
+
+    def stats(self):
+        hits = self.local_hits + self.shared_hits + self.stale_hits
+        lookups = hits + self.misses
+        return {
+            "local_hits": self.local_hits,
+            "shared_hits": self.shared_hits,
+            "stale_hits": self.stale_hits,
+            "waits": self.waits,
+            "misses": self.misses,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "avg_compute_ms": (
+                self.compute_time / self.misses * 1000 if self.misses else 0.0
+            ),
+        }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def make_key(self, *parts):
+        digest = hashlib.md5(
+            "\0".join(str(part) for part in parts).encode(), usedforsecurity=False
+        )
+        return f"{KEY_PREFIX}:{digest.hexdigest()}"
+
+    def get_or_compute(self, key, version, compute):
+        now = time.time()
+        entry = self._local_get(key)
+        if self._is_fresh(entry, version, now):
+            self.local_hits += 1
+            return entry.data
+        shared = self.cache.get(key)
+        if self._is_fresh(shared, version, now):
+            self._local_set(key, shared)
+            self.shared_hits += 1
+            return shared.data
+        entry = max(
+            (candidate for candidate in (entry, shared) if candidate is not None),
+            key=lambda candidate: candidate.created,
+            default=None,
+        )
+        lock_key = f"{key}:lock"
+        if self.cache.add(lock_key, True, self.lock_timeout):
+            try:
+                return self._compute(key, version, compute)
+            finally:
+                self.cache.delete(lock_key)
+        if self._is_usable_stale(entry, now):
+            self.stale_hits += 1
+            return entry.data
+        # Someone else is computing this entry: wait for it instead of piling
+        # the same query onto the database.
+        deadline = now + self.lock_timeout
+        while time.time() < deadline:
+            time.sleep(self.poll_interval)
+            shared = self.cache.get(key)
+            if self._is_fresh(shared, version, time.time()):
+                self._local_set(key, shared)
+                self.waits += 1
+                return shared.data
+        return self._compute(key, version, compute)
+
+    async def aget_or_compute(self, key, version, acompute):
+        # get_or_compute() for async views: same steps, with the shared cache
+        # reached through cache_call() and the wait done without blocking.
+        now = time.time()
+        entry = self._local_get(key)
+        if self._is_fresh(entry, version, now):
+            self.local_hits += 1
+            return entry.data
+        shared = await cache_call(self.cache, "get", key)
+        if self._is_fresh(shared, version, now):
+            self._local_set(key, shared)
+            self.shared_hits += 1
+            return shared.data
+        entry = max(
+            (candidate for candidate in (entry, shared) if candidate is not None),
+            key=lambda candidate: candidate.created,
+            default=None,
+        )
+        lock_key = f"{key}:lock"
+        if await cache_call(self.cache, "add", lock_key, True, self.lock_timeout):
+            try:
+                return await self._acompute(key, version, acompute)
+            finally:
+                await cache_call(self.cache, "delete", lock_key)
+        if self._is_usable_stale(entry, now):
+            self.stale_hits += 1
+            return entry.data
+        deadline = now + self.lock_timeout
+        while time.time() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            shared = await cache_call(self.cache, "get", key)
+            if self._is_fresh(shared, version, time.time()):
+                self._local_set(key, shared)
+                self.waits += 1
+                return shared.data
+        return await self._acompute(key, version, acompute)
+
+    def _compute(self, key, version, compute):
+        self.misses += 1
+        start = time.perf_counter()
+        data, cacheable = compute()
+        self.compute_time += time.perf_counter() - start
+        if cacheable:
+            entry = Entry(version, time.time(), data)
+            self.cache.set(key, entry, self.ttl + self.stale_ttl)
+            self._local_set(key, entry)
+        return data
+
+    async def _acompute(self, key, version, acompute):
+        self.misses += 1
+        start = time.perf_counter()
+        data, cacheable = await acompute()
+        self.compute_time += time.perf_counter() - start
+        if cacheable:
+            entry = Entry(version, time.time(), data)
+            await cache_call(self.cache, "set", key, entry, self.ttl + self.stale_ttl)
+            self._local_set(key, entry)
+        return data
+
+    def _is_fresh(self, entry, version, now):
+        return (
+            entry is not None and entry.version == version and entry.age(now) < self.ttl
+        )
+
+    def _is_usable_stale(self, entry, now):
+        return (
+            self.stale_ttl > 0
+            and entry is not None
+            and entry.age(now) < self.ttl + self.stale_ttl
+        )
+
+    def _local_get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _local_set(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+
+def cache_from_settings():
+    options = getattr(settings, "RESPONSE_CACHE", {})
+    return ResponseCache(
+        max_entries=options.get("MAX_ENTRIES", 1000),
+        ttl=options.get("TTL", 300),
+        stale_ttl=options.get("STALE_TTL", 0),
+        lock_timeout=options.get("LOCK_TIMEOUT", 5),
+        cache=options.get("CACHE", "default"),
+        enabled=options.get("ENABLED", True),
+    )
+
+
+response_cache = cache_from_settings()
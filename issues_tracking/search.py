@@ -0,0 +1,295 @@
+import heapq
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter, OrderedDict, namedtuple
+from functools import cache
+from django.conf import settings
+from django.db import connection
+from .membership import membership_index
+from .models import Project, Issue, Comment
+
+SEARCH_TABLE = "issues_tracking_search"
+TITLE_WEIGHT = 2.0
+BODY_WEIGHT = 1.0
+SNIPPET_WORDS = 12
+TOKEN = re.compile(r"[^\W_]+")
+
+Hit = namedtuple("Hit", ["type", "id", "project", "issue", "title", "snippet", "score"])
+
+
+def tokenize(text):
+    # Folds case and diacritics like the FTS5 unicode61 tokenizer does.
+    text = unicodedata.normalize("NFKD", text.lower())
+    return TOKEN.findall("".join(c for c in text if not unicodedata.combining(c)))
+
+
+class FTS5Backend:
+    name = "fts5"
+    # Ranks the newest candidates in one pass over the doclists, walked in
+    # rowid order, then builds snippets for the returned page only.
+    sql = f"""
+        WITH candidates AS (
+            SELECT rowid, -bm25({SEARCH_TABLE}, {TITLE_WEIGHT}, {BODY_WEIGHT}) AS score
+            FROM {SEARCH_TABLE}
+            WHERE {SEARCH_TABLE} MATCH %(query)s AND project_id IN (
+                SELECT id FROM issues_tracking_project
+                WHERE author_user_id_id = %(user)s
+                UNION ALL
+                SELECT project_id FROM issues_tracking_contributor
+                WHERE user_id = %(user)s
+            )
+            ORDER BY rowid DESC
+            LIMIT %(candidates)s
+        ), page AS (
+            SELECT rowid, score FROM candidates
+            ORDER BY score DESC, rowid
+            LIMIT %(limit)s OFFSET %(offset)s
+        )
+        SELECT
+            page.rowid,
+            {SEARCH_TABLE}.kind,
+            {SEARCH_TABLE}.project_id,
+            {SEARCH_TABLE}.issue_id,
+            issue.title,
+            snippet({SEARCH_TABLE}, -1, '[', ']', '…', {SNIPPET_WORDS}),
+            page.score
+        FROM page
+        CROSS JOIN {SEARCH_TABLE} ON {SEARCH_TABLE}.rowid = page.rowid
+        JOIN issues_tracking_issue AS issue ON issue.id = {SEARCH_TABLE}.issue_id
+        WHERE {SEARCH_TABLE} MATCH %(query)s
+        ORDER BY page.score DESC, page.rowid
+    """
+
+    def __init__(self, max_candidates=10000):
+        self.max_candidates = max_candidates
+
+    def search(self, user, terms, offset, limit):
+        params = {
+            # Quoted terms are matched as plain words, never as FTS5 syntax.
+            "query": " ".join(f'"{term}"' for term in terms),
+            "user": user.pk,
+            "candidates": self.max_candidates,
+            "limit": limit,
+            "offset": offset,
+        }
+        with connection.cursor() as cursor:
+            cursor.execute(self.sql, params)
+            rows = cursor.fetchall()
+        return [
+            Hit(kind, rowid // 2, project_id, issue_id, title, snippet, score)
+            for rowid, kind, project_id, issue_id, title, snippet, score in rows
+        ]
+
+
+class Document(namedtuple("Document", ["type", "id", "issue", "title", "body"])):
+    @property
+    def order(self):
+        return 2 * self.id + (self.type == "comment")
+
+
+class ProjectIndex:
+    def __init__(self, project_id, version):
+        self.project_id = project_id
+        self.version = version
+        self.documents = []
+        self.lengths = []
+        self.length = 0
+        self.titles = {}
+        self.postings = {}
+
+    @classmethod
+    def build(cls, project_id, version):
+        index = cls(project_id, version)
+        issues = Issue.objects.filter(project_id=project_id).values_list(
+            "id", "title", "description"
+        )
+        for issue_id, title, description in issues.iterator():
+            index.titles[issue_id] = title
+            index.add(Document("issue", issue_id, issue_id, title, description))
+        comments = Comment.objects.filter(issue__project_id=project_id).values_list(
+            "id", "issue_id", "description"
+        )
+        for comment_id, issue_id, description in comments.iterator():
+            index.add(Document("comment", comment_id, issue_id, "", description))
+        return index
+
+    def add(self, document):
+        position = len(self.documents)
+        title = Counter(tokenize(document.title))
+        body = Counter(tokenize(document.body))
+        self.documents.append(document)
+        self.lengths.append(sum(title.values()) + sum(body.values()))
+        self.length += self.lengths[-1]
+        for term in title.keys() | body.keys():
+            self.postings.setdefault(term, {})[position] = (title[term], body[term])
+
+    def matches(self, terms):
+        postings = sorted((self.postings.get(term, {}) for term in terms), key=len)
+        positions = set(postings[0])
+        for posting in postings[1:]:
+            positions.intersection_update(posting)
+        return positions
+
+
+class PythonBackend:
+    name = "python"
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self, max_projects=1000, max_candidates=10000):
+        self.max_projects = max_projects
+        self.max_candidates = max_candidates
+        self._indexes = OrderedDict()
+        self._lock = threading.RLock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.builds = 0
+        self.evictions = 0
+
+    def clear(self):
+        with self._lock:
+            self._indexes.clear()
+
+    def indexes_for(self, user):
+        project_ids = membership_index.get(user.pk).project_ids
+        # Every change to a project's issues or comments bumps its version.
+        versions = Project.objects.filter(pk__in=project_ids).values_list(
+            "id", "version"
+        )
+        indexes = []
+        for project_id, version in versions:
+            with self._lock:
+                index = self._indexes.get(project_id)
+                if index is not None and index.version == version:
+                    self._indexes.move_to_end(project_id)
+                    self.hits += 1
+                    indexes.append(index)
+                    continue
+            index = ProjectIndex.build(project_id, version)
+            with self._lock:
+                self.builds += 1
+                self._indexes[project_id] = index
+                while len(self._indexes) > self.max_projects:
+                    self._indexes.popitem(last=False)
+                    self.evictions += 1
+            indexes.append(index)
+        return indexes
+
+    def search(self, user, terms, offset, limit):
+        indexes = self.indexes_for(user)
+        count = sum(len(index.documents) for index in indexes)
+        if not count:
+            return []
+        average = sum(index.length for index in indexes) / count or 1
+        idf = {}
+        for term in set(terms):
+            frequency = sum(len(index.postings.get(term, ())) for index in indexes)
+            idf[term] = math.log(1 + (count - frequency + 0.5) / (frequency + 0.5))
+        candidates = heapq.nlargest(
+            self.max_candidates,
+            (
+                (index.documents[position].order, index, position)
+                for index in indexes
+                for position in index.matches(terms)
+            ),
+            key=lambda item: item[0],
+        )
+        scored = (
+            (self.score(index, position, idf, average), index, position)
+            for _, index, position in candidates
+        )
+        best = heapq.nsmallest(
+            offset + limit,
+            scored,
+            key=lambda item: (-item[0], item[1].documents[item[2]].order),
+        )
+        return [
+            self.hit(index, index.documents[position], score, terms)
+            for score, index, position in best[offset:]
+        ]
+
+    def score(self, index, position, idf, average):
+        length = index.lengths[position] / average
+        score = 0.0
+        for term, weight in idf.items():
+            title, body = index.postings[term][position]
+            frequency = TITLE_WEIGHT * title + BODY_WEIGHT * body
+            score += (
+                weight
+                * frequency
+                * (self.k1 + 1)
+                / (frequency + self.k1 * (1 - self.b + self.b * length))
+            )
+        return score
+
+    def hit(self, index, document, score, terms):
+        return Hit(
+            document.type,
+            document.id,
+            index.project_id,
+            document.issue,
+            index.titles.get(document.issue, ""),
+            snippet(document, set(terms)),
+            score,
+        )
+
+
+def snippet(document, terms):
+    text = document.body
+    if terms.intersection(tokenize(document.title)):
+        text = document.title
+    words = text.split()
+    marked = [bool(terms.intersection(tokenize(word))) for word in words]
+    first = marked.index(True) if True in marked else 0
+    start = max(0, min(first - SNIPPET_WORDS // 2, len(words) - SNIPPET_WORDS))
+    stop = start + SNIPPET_WORDS
+    parts = [
+        f"[{word}]" if match else word
+        for word, match in zip(words[start:stop], marked[start:stop])
+    ]
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if stop < len(words) else ""
+    return prefix + " ".join(parts) + suffix
+
+
+class SearchResults:
+    def __init__(self, backend, user, terms):
+        self.backend = backend
+        self.user = user
+        self.terms = terms
+
+    def __getitem__(self, key):
+        start = key.start or 0
+        return self.backend.search(self.user, self.terms, start, key.stop - start)
+
+
+@cache
+def has_search_table(database):
+    return SEARCH_TABLE in connection.introspection.table_names()
+
+
+def get_search_backend():
+    backend = getattr(settings, "SEARCH", {}).get("BACKEND", "auto")
+    if backend == "auto":
+        has_table = has_search_table(connection.settings_dict["NAME"])
+        backend = "fts5" if has_table else "python"
+    return BACKENDS[backend]
+
+
+def backends_from_settings():
+    options = getattr(settings, "SEARCH", {})
+    max_candidates = options.get("MAX_CANDIDATES", 10000)
+    return {
+        "fts5": FTS5Backend(max_candidates=max_candidates),
+        "python": PythonBackend(
+            max_projects=options.get("MAX_PROJECTS", 1000),
+            max_candidates=max_candidates,
+        ),
+    }
+
+
+BACKENDS = backends_from_settings()
@@ -1,19 +1,87 @@
 from rest_framework import serializers
-from django.contrib.auth import get_user_model
-from .models import Project, Contributor, Issue, Comment
-
-
-class ProjectListSerializer(serializers.ModelSerializer):
+from rest_framework.permissions import SAFE_METHODS
+from . import changelog
+from .models import Change, Project, Contributor, Issue, Comment
+from .context import get_project_context
+from .stats import as_dict as stats_as_dict, get_stats, record_issue_changes
+
+
+class SparseFieldsetMixin:
+    # On reads, ?fields= keeps only the named fields and ?exclude= drops some;
+    # RelatedQuerysetMixin leaves the columns of the others unread.
+    fieldset_params = ("fields", "exclude")
+
+    @classmethod
+    def get_fieldset(cls, request):
+        # Returns the names of the fields to serialize, or None for all.
+        if request is None or request.method not in SAFE_METHODS:
+            return None
+        requested = {}
+        for param in cls.fieldset_params:
+            names = request.query_params.get(param, "").split(",")
+            requested[param] = {name for name in names if name}
+            unknown = sorted(requested[param] - set(cls.Meta.fields))
+            if unknown:
+                raise serializers.ValidationError(
+                    {param: [f"Unknown field(s): {', '.join(unknown)}"]}
+                )
+        fields, exclude = requested.values()
+        if not fields and not exclude:
+            return None
+        return tuple(
+            name
+            for name in cls.Meta.fields
+            if (not fields or name in fields) and name not in exclude
+        )
+
+    def get_fields(self):
+        fields = super().get_fields()
+        fieldset = self.get_fieldset(self.context.get("request"))
+        if fieldset is not None:
+            for name in set(fields) - set(fieldset):
+                fields.pop(name)
+        return fields
+
+
+class ProjectListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Project
-        fields = ["id", "title", "description"]
+        fields = [
+            "id",
+            "title",
+            "description",
+            "issue_count",
+            "open_issue_count",
+            "contributor_count",
+        ]
+
+
+class OptionalFieldsMixin:
+    # Meta.optional_fields are only serialized when named in ?include=.
+    include_param = "include"
 
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get("request")
+        include = request.query_params.get(self.include_param, "") if request else ""
+        for name in set(self.Meta.optional_fields) - set(include.split(",")):
+            fields.pop(name)
+        return fields
+
+
+class ProjectSerializer(
+    SparseFieldsetMixin, OptionalFieldsMixin, serializers.ModelSerializer
+):
+    stats = serializers.SerializerMethodField()
 
-class ProjectSerializer(serializers.ModelSerializer):
     class Meta:
         model = Project
-        fields = ["id", "title", "description", "type", "author_user_id"]
+        fields = ["id", "title", "description", "type", "author_user_id", "stats"]
         read_only_fields = ["author_user_id"]
+        optional_fields = ["stats"]
+
+    def get_stats(self, project):
+        return stats_as_dict(get_stats(project.pk))
 
 
 class ContributorSerializer(serializers.ModelSerializer):
@@ -23,35 +91,64 @@ class ContributorSerializer(serializers.ModelSerializer):
         read_only_fields = ["project"]
 
     def validate(self, data):
-        project_id = self.context["view"].kwargs.get("project_id")
-        user_id = data["user"].id
-        if get_user_model().objects.filter(id=user_id).exists() is False:
-            raise serializers.ValidationError("This user does not exist")
-        if Contributor.objects.filter(project_id=project_id, user_id=user_id).exists():
+        context = get_project_context(self.context["request"], self.context["view"])
+        if Contributor.objects.filter(
+            project_id=context.project_id, user=data["user"]
+        ).exists():
             raise serializers.ValidationError(
                 "This contributor already exists in this project"
             )
         return data
 
 
-class ContributorListSerializer(serializers.ModelSerializer):
-    user_first_name = serializers.SerializerMethodField()
-    user_last_name = serializers.SerializerMethodField()
+class ContributorListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    user_first_name = serializers.CharField(source="user.first_name", read_only=True)
+    user_last_name = serializers.CharField(source="user.last_name", read_only=True)
 
     class Meta:
         model = Contributor
         fields = ["user", "user_first_name", "user_last_name", "permission", "role"]
 
-    def get_user_first_name(self, obj):
-        return obj.user.first_name
 
-    def get_user_last_name(self, obj):
-        return obj.user.last_name
+class ContributorSyncSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Contributor
+        fields = ["id", "user", "project", "permission", "role"]
+
+
+class CachedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    def to_internal_value(self, data):
+        instances = self.__dict__.setdefault("_instances", {})
+        if str(data) not in instances:
+            instances[str(data)] = super().to_internal_value(data)
+        return instances[str(data)]
+
+
+class IssueListSerializer(serializers.ListSerializer):
+    def create(self, validated_data):
+        issues = [Issue(**attrs) for attrs in validated_data]
+        for issue in issues:
+            issue.set_default_assignee()
+        issues = Issue.objects.bulk_create(issues)
+        # Also bumps the versions of their projects.
+        record_issue_changes((None, issue.counted_values()) for issue in issues)
+        # bulk_create() sends no post_save: log the changes here.
+        for project_id in {issue.project_id for issue in issues}:
+            changelog.record(
+                "issue",
+                Change.CREATED,
+                project_id,
+                [issue.pk for issue in issues if issue.project_id == project_id],
+            )
+        return issues
+
 
+class IssueSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    serializer_related_field = CachedPrimaryKeyRelatedField
 
-class IssueSerializer(serializers.ModelSerializer):
     class Meta:
         model = Issue
+        list_serializer_class = IssueListSerializer
         fields = [
             "id",
             "title",
@@ -60,11 +157,70 @@ class IssueSerializer(serializers.ModelSerializer):
             "priority",
             "status",
             "assignee_user_id",
+            "comment_count",
+            "last_comment_time",
         ]
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class IssueBulkUpdateSerializer(serializers.Serializer):
+    filter_fields = ("status", "priority", "tag", "assignee_user_id")
+    change_fields = ("status", "priority", "assignee_user_id")
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False
+    )
+    filter = serializers.DictField(required=False, allow_empty=False)
+    changes = serializers.DictField(allow_empty=False)
+
+    def validate_issue_fields(self, value, allowed):
+        unknown = sorted(set(value) - set(allowed))
+        if unknown:
+            raise serializers.ValidationError(
+                f"Unsupported field(s): {', '.join(unknown)}"
+            )
+        serializer = IssueSerializer(data=value, partial=True)
+        if not serializer.is_valid():
+            raise serializers.ValidationError(serializer.errors)
+        return serializer.validated_data
+
+    def validate_ids(self, value):
+        max_size = self.context.get("max_size")
+        if max_size is not None and len(value) > max_size:
+            raise serializers.ValidationError(
+                f"Ensure this field has no more than {max_size} elements."
+            )
+        return value
+
+    def validate_filter(self, value):
+        return self.validate_issue_fields(value, self.filter_fields)
+
+    def validate_changes(self, value):
+        changes = self.validate_issue_fields(value, self.change_fields)
+        # A saved issue without an assignee gets its author; UPDATE cannot.
+        if "assignee_user_id" in changes and changes["assignee_user_id"] is None:
+            raise serializers.ValidationError(
+                {"assignee_user_id": ["This field may not be null."]}
+            )
+        return changes
+
+    def validate(self, data):
+        if ("ids" in data) == ("filter" in data):
+            raise serializers.ValidationError("Provide either ids or filter")
+        return data
+
+
+class CommentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = ["id", "description", "issue"]
         read_only_fields = ["issue"]
+
+
+class SearchHitSerializer(serializers.Serializer):
+    type = serializers.CharField()
+    id = serializers.IntegerField()
+    project = serializers.IntegerField()
+    issue = serializers.IntegerField()
+    title = serializers.CharField()
+    snippet = serializers.CharField()
+    score = serializers.FloatField()
@@ -0,0 +1,222 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from softdesk.orm_cache import orm_cache
+from . import changelog
+from .events import event_bus
+from .membership import membership_index
+from .models import Change, Project, Contributor, Issue, Comment, ProjectStats
+from .serializers import IssueSerializer, CommentSerializer
+from .stats import (
+    rebuild as rebuild_stats,
+    record_comment,
+    record_contributors,
+    record_issue_changes,
+    record_removed_comment,
+)
+from .versions import bump_project_versions
+
+orm_cache.connect_signals()
+
+
+def invalidate_on_commit(func, *args):
+    func(*args)
+    transaction.on_commit(lambda: func(*args))
+
+
+@receiver([post_save, post_delete], sender=Contributor)
+def invalidate_contributor_membership(sender, instance, **kwargs):
+    invalidate_on_commit(membership_index.invalidate_user, instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=Project)
+def invalidate_project_membership(sender, instance, **kwargs):
+    invalidate_on_commit(
+        membership_index.invalidate_project, instance.pk, instance.author_user_id_id
+    )
+
+
+def cascaded_from(origin, *models):
+    # Rows removed by a cascade leave the bump to the object deleted first.
+    return isinstance(origin, models)
+
+
+@receiver([post_save, post_delete], sender=Comment)
+def bump_comment_project_version(sender, instance, origin=None, **kwargs):
+    if not cascaded_from(origin, Project, Issue):
+        bump_project_versions(issues=instance.issue_id)
+
+
+@receiver(post_save, sender=get_user_model())
+def bump_user_project_versions(sender, instance, created, update_fields, **kwargs):
+    # Contributor lists show user names; last_login alone changes nothing shown.
+    if created or update_fields == frozenset(["last_login"]):
+        return
+    contributed = Contributor.objects.filter(user=instance).values("project_id")
+    bump_project_versions(Q(author_user_id=instance) | Q(pk__in=contributed))
+
+
+@receiver(post_save, sender=Project)
+def create_project_stats(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        ProjectStats.objects.create(project=instance)
+
+
+# Issue and contributor counters are updated with the project version, in one
+# statement, so these receivers also bump it.
+@receiver(post_save, sender=Issue)
+def count_saved_issue(sender, instance, created, **kwargs):
+    before = None if created else getattr(instance, "_counted_values", None)
+    if created or before is not None:
+        record_issue_changes([(before, instance.counted_values())])
+    else:
+        # Saved without knowing what it replaced: recount its project.
+        rebuild_stats([instance.project_id])
+        bump_project_versions(pk=instance.project_id)
+    instance.remember_counted_values()
+
+
+@receiver(post_delete, sender=Issue)
+def count_deleted_issue(sender, instance, origin=None, **kwargs):
+    if not cascaded_from(origin, Project):
+        before = getattr(instance, "_counted_values", None)
+        record_issue_changes([(before or instance.counted_values(), None)])
+
+
+@receiver(post_save, sender=Contributor)
+def count_saved_contributor(sender, instance, created, **kwargs):
+    record_contributors(instance.project_id, 1 if created else 0)
+
+
+@receiver(post_delete, sender=Contributor)
+def count_removed_contributor(sender, instance, origin=None, **kwargs):
+    if not cascaded_from(origin, Project):
+        record_contributors(instance.project_id, -1)
+
+
+@receiver(post_save, sender=Comment)
+def count_saved_comment(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        record_comment(instance)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, origin=None, **kwargs):
+    if not cascaded_from(origin, Project, Issue):
+        record_removed_comment(instance)
+
+
+def publish(project_id, kind, instance, serializer_class=None, **fields):
+    event = {"type": kind, "id": instance.pk, **fields}
+    if serializer_class is not None:
+        event["data"] = serializer_class(instance).data
+    event_bus.publish_on_commit(project_id, event)
+
+
+# Events are only built for projects someone is streaming.
+@receiver(post_save, sender=Issue)
+def publish_saved_issue(sender, instance, created, **kwargs):
+    if event_bus.has_subscribers(instance.project_id):
+        kind = "issue.created" if created else "issue.updated"
+        publish(instance.project_id, kind, instance, IssueSerializer)
+
+
+@receiver(post_delete, sender=Issue)
+def publish_deleted_issue(sender, instance, origin=None, **kwargs):
+    if event_bus.has_subscribers(instance.project_id) and not cascaded_from(
+        origin, Project
+    ):
+        publish(instance.project_id, "issue.deleted", instance)
+
+
+@receiver(post_save, sender=Comment)
+def publish_saved_comment(sender, instance, created, **kwargs):
+    if event_bus.has_subscribers():
+        project_id = instance.issue.project_id
+        if event_bus.has_subscribers(project_id):
+            kind = "comment.created" if created else "comment.updated"
+            publish(
+                project_id, kind, instance, CommentSerializer, issue=instance.issue_id
+            )
+
+
+@receiver(post_delete, sender=Comment)
+def publish_deleted_comment(sender, instance, origin=None, **kwargs):
+    if event_bus.has_subscribers() and not cascaded_from(origin, Project, Issue):
+        project_id = instance.issue.project_id
+        if event_bus.has_subscribers(project_id):
+            publish(project_id, "comment.deleted", instance, issue=instance.issue_id)
+
+
+@receiver(post_delete, sender=Project)
+def close_project_streams(sender, instance, **kwargs):
+    event_bus.close_on_commit(instance.pk, event={"type": "project.deleted"})
+
+
+@receiver(post_delete, sender=Contributor)
+def close_contributor_streams(sender, instance, **kwargs):
+    # Streams are authorized once, when opened: end those of removed members.
+    event_bus.close_on_commit(
+        instance.project_id, instance.user_id, {"type": "access.revoked"}
+    )
+
+
+def saved_action(created):
+    return Change.CREATED if created else Change.UPDATED
+
+
+# Change log read by the sync endpoint. Rows removed by a cascade get no
+# tombstone of their own: the one of the project or issue covers them.
+@receiver(post_save, sender=Project)
+def log_saved_project(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        changelog.record("project", saved_action(created), instance.pk, [instance.pk])
+
+
+@receiver(post_delete, sender=Project)
+def log_deleted_project(sender, instance, **kwargs):
+    changelog.record("project", Change.DELETED, instance.pk, [instance.pk])
+
+
+@receiver(post_save, sender=Contributor)
+def log_saved_contributor(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        changelog.record(
+            "contributor", saved_action(created), instance.project_id, [instance.pk]
+        )
+
+
+@receiver(post_delete, sender=Contributor)
+def log_deleted_contributor(sender, instance, origin=None, **kwargs):
+    if not cascaded_from(origin, Project):
+        changelog.record(
+            "contributor", Change.DELETED, instance.project_id, [instance.pk]
+        )
+
+
+@receiver(post_save, sender=Issue)
+def log_saved_issue(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        changelog.record(
+            "issue", saved_action(created), instance.project_id, [instance.pk]
+        )
+
+
+@receiver(post_delete, sender=Issue)
+def log_deleted_issue(sender, instance, origin=None, **kwargs):
+    if not cascaded_from(origin, Project):
+        changelog.record("issue", Change.DELETED, instance.project_id, [instance.pk])
+
+
+@receiver(post_save, sender=Comment)
+def log_saved_comment(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        changelog.record_comment(saved_action(created), instance)
+
+
+@receiver(post_delete, sender=Comment)
+def log_deleted_comment(sender, instance, origin=None, **kwargs):
+    if not cascaded_from(origin, Project, Issue):
+        changelog.record_comment(Change.DELETED, instance)
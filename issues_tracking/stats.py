@@ -0,0 +1,249 @@
+from collections import Counter, defaultdict
+from django.db.models import Count, DateTimeField, F, Max, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from .models import Comment, Contributor, Issue, Project, ProjectStats
+
+# dimension -> issue field choices, each counted in a "<dimension>_<code>" column.
+DIMENSIONS = {
+    "status": Issue.STATUSES,
+    "priority": Issue.PRIORITIES,
+    "tag": Issue.TAGS,
+}
+# Kept on the statistics row.
+COUNTERS = [
+    f"{dimension}_{code.lower()}"
+    for dimension, choices in DIMENSIONS.items()
+    for code, _ in choices
+]
+# Kept on the project row, so project lists need no COUNT or join per row.
+PROJECT_COUNTERS = ["issue_count", "open_issue_count", "contributor_count"]
+OPEN = ~Q(status="DONE")
+
+
+def issue_columns(status, priority, tag):
+    values = {"status": status, "priority": priority, "tag": tag}
+    columns = ["issue_count"] + [
+        f"{dimension}_{value.lower()}" for dimension, value in values.items()
+    ]
+    if status != "DONE":
+        columns.append("open_issue_count")
+    return columns
+
+
+def add_issues(deltas, counted_values, count):
+    project_id, *values = counted_values
+    deltas[project_id].update(dict.fromkeys(issue_columns(*values), count))
+
+
+def issue_deltas(changes):
+    # changes: (before, after) pairs of Issue.counted_values(), None for a
+    # missing side (created or deleted issue).
+    deltas = defaultdict(Counter)
+    for before, after in changes:
+        if before is not None:
+            add_issues(deltas, before, -1)
+        if after is not None:
+            add_issues(deltas, after, 1)
+    return deltas
+
+
+def increments(delta, columns):
+    return {column: F(column) + delta[column] for column in columns if delta[column]}
+
+
+def apply_deltas(deltas):
+    # Every project in deltas has changed, even with a zero delta: its version
+    # is bumped in the same statement as its counters.
+    for project_id, delta in deltas.items():
+        Project.objects.filter(pk=project_id).update(
+            version=F("version") + 1, **increments(delta, PROJECT_COUNTERS)
+        )
+        changes = increments(delta, COUNTERS)
+        if not changes:
+            continue
+        updated = ProjectStats.objects.filter(project_id=project_id).update(**changes)
+        if not updated:
+            # First write for this project: count what is already there.
+            rebuild([project_id])
+
+
+def record_issue_changes(changes, project_ids=()):
+    deltas = issue_deltas(changes)
+    for project_id in project_ids:
+        deltas[project_id]
+    apply_deltas(deltas)
+
+
+def record_issue_updates(groups, changes):
+    # groups: (Issue.counted_values(), number of issues) of the issues about to
+    # be updated with `changes`, as grouped by the database.
+    deltas = defaultdict(Counter)
+    for before, count in groups:
+        after = tuple(
+            changes.get(name, value)
+            for name, value in zip(Issue.COUNTED_FIELDS, before)
+        )
+        add_issues(deltas, before, -count)
+        add_issues(deltas, after, count)
+    apply_deltas(deltas)
+
+
+def record_contributors(project_id, count):
+    apply_deltas({project_id: Counter(contributor_count=count)})
+
+
+def compute(project_ids):
+    columns = dict.fromkeys(COUNTERS + PROJECT_COUNTERS, 0)
+    counts = {project_id: dict(columns) for project_id in project_ids}
+    aggregates = {
+        "issue_count": Count("id"),
+        "open_issue_count": Count("id", filter=OPEN),
+    }
+    for dimension, choices in DIMENSIONS.items():
+        for code, _ in choices:
+            aggregates[f"{dimension}_{code.lower()}"] = Count(
+                "id", filter=Q(**{dimension: code})
+            )
+    issues = (
+        Issue.objects.filter(project_id__in=project_ids)
+        .values("project_id")
+        .annotate(**aggregates)
+        .order_by()
+    )
+    for row in issues:
+        counts[row.pop("project_id")].update(row)
+    contributors = (
+        Contributor.objects.filter(project_id__in=project_ids)
+        .values("project_id")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+    for row in contributors:
+        counts[row["project_id"]]["contributor_count"] = row["count"]
+    return counts
+
+
+def rebuild(project_ids):
+    for project_id, counts in compute(project_ids).items():
+        ProjectStats.objects.update_or_create(
+            project_id=project_id,
+            defaults={column: counts[column] for column in COUNTERS},
+        )
+        Project.objects.filter(pk=project_id).update(
+            **{column: counts[column] for column in PROJECT_COUNTERS}
+        )
+
+
+def drift(stored, actual, columns):
+    # Returns {key: {column: (stored, actual)}} for every drifted row.
+    drifted = {}
+    for key, values in actual.items():
+        current = stored.get(key)
+        if current is None:
+            drifted[key] = {column: (None, values[column]) for column in columns}
+            continue
+        changed = {
+            column: (current[column], values[column])
+            for column in columns
+            if current[column] != values[column]
+        }
+        if changed:
+            drifted[key] = changed
+    return drifted
+
+
+def verify(project_ids):
+    # Covers both the project counters and the statistics rows.
+    actual = compute(project_ids)
+    projects = {
+        row.pop("id"): row
+        for row in Project.objects.filter(pk__in=project_ids).values(
+            "id", *PROJECT_COUNTERS
+        )
+    }
+    drifted = drift(projects, actual, PROJECT_COUNTERS)
+    stored = {
+        row.pop("project_id"): row
+        for row in ProjectStats.objects.filter(project_id__in=project_ids).values(
+            "project_id", *COUNTERS
+        )
+    }
+    for project_id, columns in drift(stored, actual, COUNTERS).items():
+        drifted.setdefault(project_id, {}).update(columns)
+    return drifted
+
+
+def get_stats(project_id):
+    stats = ProjectStats.objects.select_related("project")
+    found = stats.filter(project_id=project_id).first()
+    if found is None:
+        rebuild([project_id])
+        found = stats.get(project_id=project_id)
+    return found
+
+
+def as_dict(stats):
+    return {
+        "issue_count": stats.project.issue_count,
+        "contributor_count": stats.project.contributor_count,
+        **{
+            dimension: {
+                code: getattr(stats, f"{dimension}_{code.lower()}")
+                for code, _ in choices
+            }
+            for dimension, choices in DIMENSIONS.items()
+        },
+    }
+
+
+COMMENT_COUNTERS = ["comment_count", "last_comment_time"]
+
+
+def comment_aggregate(aggregate):
+    comments = Comment.objects.filter(issue=OuterRef("pk")).order_by().values("issue")
+    return Subquery(comments.annotate(value=aggregate).values("value"))
+
+
+def record_comment(comment):
+    created = Value(comment.created_time, output_field=DateTimeField())
+    Issue.objects.filter(pk=comment.issue_id).update(
+        comment_count=F("comment_count") + 1,
+        # GREATEST is NULL on SQLite while the issue has no comment yet.
+        last_comment_time=Coalesce(Greatest("last_comment_time", created), created),
+    )
+
+
+def record_removed_comment(comment):
+    # Runs after the delete, so the latest remaining comment is the new last.
+    Issue.objects.filter(pk=comment.issue_id).update(
+        comment_count=F("comment_count") - 1,
+        last_comment_time=comment_aggregate(Max("created_time")),
+    )
+
+
+def rebuild_comment_counters(issue_ids):
+    Issue.objects.filter(pk__in=issue_ids).update(
+        comment_count=Coalesce(comment_aggregate(Count("id")), 0),
+        last_comment_time=comment_aggregate(Max("created_time")),
+    )
+
+
+def verify_issues(issue_ids):
+    stored = {
+        row.pop("id"): row
+        for row in Issue.objects.filter(pk__in=issue_ids).values(
+            "id", *COMMENT_COUNTERS
+        )
+    }
+    actual = {
+        issue_id: {"comment_count": 0, "last_comment_time": None} for issue_id in stored
+    }
+    comments = (
+        Comment.objects.filter(issue_id__in=issue_ids)
+        .values("issue_id")
+        .annotate(comment_count=Count("id"), last_comment_time=Max("created_time"))
+        .order_by()
+    )
+    for row in comments:
+        actual[row.pop("issue_id")] = row
+    return drift(stored, actual, COMMENT_COUNTERS)
@@ -1,12 +1,64 @@
+import asyncio
+import csv
+import io
+import json
+import tempfile
+import time
+from asgiref.sync import async_to_sync, sync_to_async
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
 from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, transaction
+from django.test import AsyncClient, override_settings
+from django.test.client import AsyncClientHandler
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils.dateparse import parse_datetime
 from rest_framework import status
-from rest_framework.test import APITestCase
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase, APITransactionTestCase
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
 from rest_framework_simplejwt.tokens import RefreshToken
+from authentication.backends import CachedJWTAuthentication
+from softdesk.async_views import AsyncViewResolverMixin
+from softdesk.budgets import QueryBudgetTestMixin
+from softdesk.orm_cache import orm_cache
+from . import search, stats
+from .benchmarks import SCENARIOS
+from .membership import MembershipIndex, membership_index
+from .pagination import MAX_PAGE_SIZE, KeysetPagination, LookaheadPagination
+from .renderers import StreamingJSONRenderer
+from .events import event_bus
+from .response_cache import Entry, ResponseCache, response_cache
+from .views import (
+    ProjectViewset,
+    ContributorsViewset,
+    IssuesViewset,
+    CommentsViewset,
+    SearchViewset,
+    SyncViewset,
+)
+from .models import Change, Project, Contributor, Issue, Comment, ProjectStats
+from .mixins import build_read_plan
+from .serializers import (
+    CommentSerializer,
+    ContributorListSerializer,
+    IssueSerializer,
+    ProjectListSerializer,
+    ProjectSerializer,
+)
 
 
 class IssuesTrackingTestCase(APITestCase):
     def setUp(self):
+        membership_index.clear()
+        response_cache.clear()
+        response_cache.cache.clear()
         self.user1 = get_user_model().objects.create_user(
             email="test@test.com", password="testpassword", username="test"
         )
@@ -741,3 +793,2903 @@ class CommentTest(IssuesTrackingTestCase):
         )
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
     
+
+
+class QueryCountTests(IssuesTrackingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.project = Project.objects.create(
+            title="test", description="test", type="BE", author_user_id=self.user1
+        )
+        Contributor.objects.create(
+            project=self.project, user=self.user2, permission="LOW", role="Dev"
+        )
+        self.issue = Issue.objects.create(
+            title="test",
+            description="test",
+            tag="BUG",
+            priority="LOW",
+            status="TODO",
+            project=self.project,
+            author_user_id=self.user1,
+        )
+        self.comment = Comment.objects.create(
+            description="test", issue=self.issue, author_user_id=self.user1
+        )
+        self.issue_data = {
+            "title": "test",
+            "description": "test",
+            "tag": "BUG",
+            "priority": "LOW",
+            "status": "TODO",
+            "assignee_user_id": 2,
+        }
+        membership_index.author_of(self.project.id)
+        membership_index.get(self.user1.id)
+        membership_index.get(self.user2.id)
+
+    def test_retrieve_project_queries(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                reverse("projects-detail", args=[self.project.id]),
+                headers=self.header1,
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_retrieve_project_from_contributor_queries(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                reverse("projects-detail", args=[self.project.id]),
+                headers=self.header2,
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_update_project_queries(self):
+        with self.assertNumQueries(4):
+            response = self.client.put(
+                reverse("projects-detail", args=[self.project.id]),
+                data=self.data,
+                headers=self.header1,
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_add_contributor_queries(self):
+        user3 = get_user_model().objects.create_user(
+            email="test3@test.com", password="testpassword3", username="test3"
+        )
+        with self.assertNumQueries(7):
+            response = self.client.post(
+                reverse("project-contributors-list", args=[self.project.id]),
+                data={"user": user3.id, "permission": "LOW", "role": "Dev"},
+                headers=self.header1,
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_delete_contributor_queries(self):
+        with self.assertNumQueries(5):
+            response = self.client.delete(
+                reverse(
+                    "project-contributors-detail", args=[self.project.id, self.user2.id]
+                ),
+                headers=self.header1,
+            )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+    def test_list_contributors_queries(self):
+        url = reverse("project-contributors-list", args=[self.project.id])
+        with self.assertNumQueries(4):
+            response = self.client.get(url, headers=self.header1)
+        self.assertEqual(response.json()["results"][0]["user_first_name"], "")
+        for i in range(3, 8):
+            user = get_user_model().objects.create(
+                email=f"test{i}@test.com", username=f"test{i}", first_name=f"n{i}"
+            )
+            Contributor.objects.create(
+                project=self.project, user=user, permission="LOW", role="Dev"
+            )
+        membership_index.author_of(self.project.id)
+        membership_index.get(self.user1.id)
+        with self.assertNumQueries(4):
+            response = self.client.get(url, headers=self.header1)
+        self.assertEqual(response.json()["results"][-1]["user_first_name"], "n7")
+
+    def test_create_issue_queries(self):
+        with self.assertNumQueries(7):
+            response = self.client.post(
+                reverse("project-issues-list", args=[self.project.id]),
+                data=self.issue_data,
+                headers=self.header1,
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_create_issue_from_contributor_queries(self):
+        with self.assertNumQueries(7):
+            response = self.client.post(
+                reverse("project-issues-list", args=[self.project.id]),
+                data=self.issue_data,
+                headers=self.header2,
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_list_issues_queries(self):
+        with self.assertNumQueries(4):
+            response = self.client.get(
+                reverse("project-issues-list", args=[self.project.id]),
+                headers=self.header1,
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_update_issue_queries(self):
+        with self.assertNumQueries(6):
+            response = self.client.put(
+                reverse("project-issues-detail", args=[self.project.id, self.issue.id]),
+                data=self.issue_data,
+                headers=self.header1,
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_create_comment_queries(self):
+        with self.assertNumQueries(6):
+            response = self.client.post(
+                reverse("issues-comments-list", args=[self.project.id, self.issue.id]),
+                data={"description": "test"},
+                headers=self.header1,
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_list_comments_queries(self):
+        with self.assertNumQueries(4):
+            response = self.client.get(
+                reverse("issues-comments-list", args=[self.project.id, self.issue.id]),
+                headers=self.header1,
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_retrieve_comment_queries(self):
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                reverse(
+                    "issues-comments-detail",
+                    args=[self.project.id, self.issue.id, self.comment.id],
+                ),
+                headers=self.header1,
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class MembershipIndexTests(IssuesTrackingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.project = Project.objects.create(
+            title="test", description="test", type="BE", author_user_id=self.user1
+        )
+
+    def test_list_projects_without_duplicates(self):
+        Contributor.objects.create(
+            project=self.project, user=self.user1, permission="HIGH", role="Lead"
+        )
+        response = self.client.get(reverse("projects-list"), headers=self.header1)
+        self.assertEqual(response.json()["count"], 1)
+
+    def test_contributor_added_and_removed(self):
+        url = reverse("project-issues-list", args=[self.project.id])
+        response = self.client.get(url, headers=self.header2)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        contributor = Contributor.objects.create(
+            project=self.project, user=self.user2, permission="LOW", role="Dev"
+        )
+        response = self.client.get(url, headers=self.header2)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        contributor.delete()
+        response = self.client.get(url, headers=self.header2)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_hits_and_misses(self):
+        index = MembershipIndex()
+        index.get(self.user1.id)
+        index.get(self.user1.id)
+        self.assertEqual(index.stats()["misses"], 1)
+        self.assertEqual(index.stats()["hits"], 1)
+        self.assertEqual(index.get(self.user1.id).authored, {self.project.id})
+
+    def test_lru_eviction(self):
+        index = MembershipIndex(max_users=1)
+        index.get(self.user1.id)
+        index.get(self.user2.id)
+        self.assertEqual(index.stats()["evictions"], 1)
+        self.assertEqual(index.stats()["users"], 1)
+
+    def test_stale_version_resets_other_index(self):
+        worker1 = MembershipIndex()
+        worker2 = MembershipIndex()
+        worker1.get(self.user1.id)
+        worker2.invalidate_user(self.user2.id)
+        with self.assertNumQueries(1):
+            worker1.get(self.user1.id)
+        self.assertEqual(worker1.stats()["stale_resets"], 1)
+
+    def test_stats_admin_only(self):
+        url = reverse("membership-index-stats")
+        response = self.client.get(url, headers=self.header1)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.user1.is_staff = True
+        self.user1.save()
+        response = self.client.get(url, headers=self.header1)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("hits", response.json())
+
+
+class PolicyTests(IssuesTrackingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user3 = get_user_model().objects.create_user(
+            email="test3@test.com", password="testpassword3", username="test3"
+        )
+        self.project = Project.objects.create(
+            title="test", description="test", type="BE", author_user_id=self.user1
+        )
+        self.contributor = Contributor.objects.create(
+            project=self.project, user=self.user2, permission="LOW", role="Dev"
+        )
+        self.issue = Issue.objects.create(
+            title="test",
+            description="test",
+            tag="BUG",
+            priority="LOW",
+            status="TODO",
+            project=self.project,
+            author_user_id=self.user1,
+        )
+        self.issue_data = {
+            "title": "test",
+            "description": "test",
+            "tag": "BUG",
+            "priority": "LOW",
+            "status": "DONE",
+        }
+
+    def set_permission(self, permission):
+        self.contributor.permission = permission
+        self.contributor.save()
+
+    def add_contributor(self):
+        return self.client.post(
+            reverse("project-contributors-list", args=[self.project.id]),
+            data={"user": self.user3.id, "permission": "LOW", "role": "Dev"},
+            headers=self.header2,
+        )
+
+    def update_issue(self):
+        return self.client.put(
+            reverse("project-issues-detail", args=[self.project.id, self.issue.id]),
+            data=self.issue_data,
+            headers=self.header2,
+        )
+
+    def test_low_contributor_cannot_add_contributor(self):
+        self.assertEqual(self.add_contributor().status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_high_contributor_can_add_contributor(self):
+        self.set_permission("HIGH")
+        self.assertEqual(self.add_contributor().status_code, status.HTTP_201_CREATED)
+
+    def test_low_contributor_cannot_update_issue_of_others(self):
+        self.assertEqual(self.update_issue().status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_med_contributor_can_update_issue_of_others(self):
+        self.set_permission("MED")
+        self.assertEqual(self.update_issue().status_code, status.HTTP_200_OK)
+
+    def test_project_author_can_delete_comment_of_contributor(self):
+        comment = Comment.objects.create(
+            description="test", issue=self.issue, author_user_id=self.user2
+        )
+        response = self.client.delete(
+            reverse(
+                "issues-comments-detail",
+                args=[self.project.id, self.issue.id, comment.id],
+            ),
+            headers=self.header1,
+        )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+    def test_project_author_cannot_update_comment_of_contributor(self):
+        comment = Comment.objects.create(
+            description="test", issue=self.issue, author_user_id=self.user2
+        )
+        response = self.client.put(
+            reverse(
+                "issues-comments-detail",
+                args=[self.project.id, self.issue.id, comment.id],
+            ),
+            data={"description": "edited"},
+            headers=self.header1,
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_retrieve_is_refused_to_non_members_before_it_is_disallowed(self):
+        refresh = RefreshToken.for_user(self.user3)
+        header3 = {"Authorization": f"Bearer {str(refresh.access_token)}"}
+        urls = [
+            reverse("project-issues-detail", args=[self.project.id, self.issue.id]),
+            reverse(
+                "project-contributors-detail", args=[self.project.id, self.user2.id]
+            ),
+        ]
+        for url in urls:
+            response = self.client.get(url, headers=header3)
+            self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+            response = self.client.get(url, headers=self.header2)
+            self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def test_project_roles_do_not_reach_comments_of_other_projects(self):
+        other = Project.objects.create(
+            title="other", description="other", type="BE", author_user_id=self.user3
+        )
+        issue = Issue.objects.create(
+            title="other",
+            description="other",
+            tag="BUG",
+            priority="LOW",
+            status="TODO",
+            project=other,
+            author_user_id=self.user3,
+        )
+        comment = Comment.objects.create(
+            description="other", issue=issue, author_user_id=self.user3
+        )
+        self.set_permission("HIGH")
+        url = reverse(
+            "issues-comments-detail", args=[self.project.id, issue.id, comment.id]
+        )
+        for headers in (self.header1, self.header2):
+            response = self.client.delete(url, headers=headers)
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+            response = self.client.get(url, headers=headers)
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertTrue(Comment.objects.filter(pk=comment.pk).exists())
+        response = self.client.get(
+            reverse("issues-comments-list", args=[self.project.id, issue.id]),
+            headers=self.header1,
+        )
+        self.assertEqual(response.json()["results"], [])
+
+
+class KeysetPaginationTests(IssuesTrackingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.project = Project.objects.create(
+            title="test", description="test", type="BE", author_user_id=self.user1
+        )
+        Issue.objects.bulk_create(
+            Issue(
+                title=f"issue {i}",
+                description="test",
+                tag="BUG",
+                priority="LOW",
+                status="TODO",
+                project=self.project,
+                author_user_id=self.user1,
+                assignee_user_id=self.user1,
+            )
+            for i in range(25)
+        )
+        self.url = reverse("project-issues-list", args=[self.project.id])
+
+    def test_page_number_is_default(self):
+        response = self.client.get(self.url, headers=self.header1)
+        self.assertEqual(response.json()["count"], 25)
+
+    def test_walk_pages_with_cursor(self):
+        response = self.client.get(
+            self.url, {"pagination": "cursor", "page_size": 10}, headers=self.header1
+        )
+        body = response.json()
+        self.assertNotIn("count", body)
+        self.assertEqual(len(body["results"]), 10)
+        ids = [issue["id"] for issue in body["results"]]
+        while body["next"]:
+            body = self.client.get(body["next"], headers=self.header1).json()
+            ids += [issue["id"] for issue in body["results"]]
+        self.assertEqual(ids, sorted(Issue.objects.values_list("id", flat=True)))
+
+    def test_page_size_is_capped(self):
+        with mock.patch.object(KeysetPagination, "max_page_size", 5):
+            response = self.client.get(
+                self.url,
+                {"pagination": "cursor", "page_size": 50},
+                headers=self.header1,
+            )
+        self.assertEqual(len(response.json()["results"]), 5)
+
+    def test_paginations_share_the_page_size_limit(self):
+        self.assertEqual(KeysetPagination.max_page_size, MAX_PAGE_SIZE)
+        self.assertEqual(LookaheadPagination.max_page_size, MAX_PAGE_SIZE)
+
+    def test_cursor_mode_skips_count_query(self):
+        membership_index.resolve(self.user1.id, self.project.id)
+        with self.assertNumQueries(3):
+            self.client.get(self.url, {"pagination": "cursor"}, headers=self.header1)
+
+
+class ProjectListQueryTests(IssuesTrackingTestCase):
+    def get_queryset(self, user):
+        view = ProjectViewset(action="list", request=SimpleNamespace(user=user))
+        return view.get_queryset()
+
+    def test_list_contains_authored_and_contributed_projects(self):
+        authored = Project.objects.create(
+            title="a", description="a", type="BE", author_user_id=self.user1
+        )
+        contributed = Project.objects.create(
+            title="b", description="b", type="BE", author_user_id=self.user2
+        )
+        Project.objects.create(
+            title="c", description="c", type="BE", author_user_id=self.user2
+        )
+        Contributor.objects.create(
+            project=contributed, user=self.user1, permission="LOW", role="Dev"
+        )
+        Contributor.objects.create(
+            project=authored, user=self.user1, permission="HIGH", role="Lead"
+        )
+        self.assertEqual(list(self.get_queryset(self.user1)), [authored, contributed])
+
+    def test_list_query_plan_uses_indexes(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("EXPLAIN output checked for SQLite only")
+        plan = self.get_queryset(self.user1).explain()
+        self.assertIn("contributor_user_project_idx", plan)
+        self.assertIn("author_user_id", plan)
+        self.assertNotIn("SCAN", plan)
+
+
+class QueryBudgetTests(QueryBudgetTestMixin, IssuesTrackingTestCase):
+    def setUp(self):
+        super().setUp()
+        # Budgets measure the uncached path.
+        patcher = mock.patch.object(response_cache, "enabled", False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.project = Project.objects.create(
+            title="test", description="test", type="BE", author_user_id=self.user1
+        )
+        self.issue = self.create_issue()
+        self.comment = Comment.objects.create(
+            description="test", issue=self.issue, author_user_id=self.user1
+        )
+        self.issue_data = {
+            "title": "test",
+            "description": "test",
+            "tag": "BUG",
+            "priority": "LOW",
+            "status": "TODO",
+        }
+        self.project_url = reverse("projects-detail", args=[self.project.id])
+        self.contributors_url = reverse(
+            "project-contributors-list", args=[self.project.id]
+        )
+        self.issues_url = reverse("project-issues-list", args=[self.project.id])
+        self.issue_url = reverse(
+            "project-issues-detail", args=[self.project.id, self.issue.id]
+        )
+        self.comments_url = reverse(
+            "issues-comments-list", args=[self.project.id, self.issue.id]
+        )
+        self.comment_url = reverse(
+            "issues-comments-detail",
+            args=[self.project.id, self.issue.id, self.comment.id],
+        )
+
+    def create_issue(self):
+        return Issue.objects.create(
+            title="test",
+            description="test",
+            tag="BUG",
+            priority="LOW",
+            status="TODO",
+            project=self.project,
+            author_user_id=self.user1,
+        )
+
+    def add_contributors(self, count):
+        start = get_user_model().objects.count() + 1
+        for i in range(start, start + count):
+            user = get_user_model().objects.create(
+                email=f"test{i}@test.com", username=f"test{i}"
+            )
+            Contributor.objects.create(
+                project=self.project, user=user, permission="LOW", role="Dev"
+            )
+
+    def test_project_budgets(self):
+        with self.assertWithinQueryBudget(ProjectViewset, "create"):
+            self.client.post(reverse("projects-list"), self.data, headers=self.header1)
+        with self.assertWithinQueryBudget(ProjectViewset, "list"):
+            self.client.get(reverse("projects-list"), headers=self.header1)
+        membership_index.clear()
+        with self.assertWithinQueryBudget(ProjectViewset, "retrieve"):
+            self.client.get(self.project_url, headers=self.header1)
+        membership_index.clear()
+        with self.assertWithinQueryBudget(ProjectViewset, "update"):
+            self.client.put(self.project_url, self.data, headers=self.header1)
+        membership_index.clear()
+        with self.assertWithinQueryBudget(ProjectViewset, "destroy"):
+            response = self.client.delete(self.project_url, headers=self.header1)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+    def test_contributor_budgets(self):
+        with self.assertWithinQueryBudget(ContributorsViewset, "create"):
+            response = self.client.post(
+                self.contributors_url,
+                data={"user": self.user2.id, "permission": "LOW", "role": "Dev"},
+                headers=self.header1,
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        membership_index.clear()
+        with self.assertWithinQueryBudget(ContributorsViewset, "list"):
+            self.client.get(self.contributors_url, headers=self.header1)
+        membership_index.clear()
+        with self.assertWithinQueryBudget(ContributorsViewset, "destroy"):
+            response = self.client.delete(
+                reverse(
+                    "project-contributors-detail", args=[self.project.id, self.user2.id]
+                ),
+                headers=self.header1,
+            )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+    def test_issue_budgets(self):
+        with self.assertWithinQueryBudget(IssuesViewset, "create"):
+            response = self.client.post(
+                self.issues_url, self.issue_data, headers=self.header1
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        membership_index.clear()
+        with self.assertWithinQueryBudget(IssuesViewset, "list"):
+            self.client.get(self.issues_url, headers=self.header1)
+        membership_index.clear()
+        with self.assertWithinQueryBudget(IssuesViewset, "update"):
+            response = self.client.put(
+                self.issue_url, self.issue_data, headers=self.header1
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        membership_index.clear()
+        with self.assertWithinQueryBudget(IssuesViewset, "destroy"):
+            response = self.client.delete(self.issue_url, headers=self.header1)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+    def test_comment_budgets(self):
+        with self.assertWithinQueryBudget(CommentsViewset, "create"):
+            response = self.client.post(
+                self.comments_url, {"description": "test"}, headers=self.header1
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        membership_index.clear()
+        with self.assertWithinQueryBudget(CommentsViewset, "list"):
+            self.client.get(self.comments_url, headers=self.header1)
+        membership_index.clear()
+        with self.assertWithinQueryBudget(CommentsViewset, "retrieve"):
+            self.client.get(self.comment_url, headers=self.header1)
+        membership_index.clear()
+        with self.assertWithinQueryBudget(CommentsViewset, "update"):
+            response = self.client.put(
+                self.comment_url, {"description": "test"}, headers=self.header1
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        membership_index.clear()
+        with self.assertWithinQueryBudget(CommentsViewset, "destroy"):
+            response = self.client.delete(self.comment_url, headers=self.header1)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+    def test_contributor_list_does_not_grow_with_contributors(self):
+        self.add_contributors(1)
+        self.assertQueryCountConstant(
+            lambda: self.client.get(self.contributors_url, headers=self.header1),
+            lambda: self.add_contributors(5),
+        )
+
+    def test_issue_list_does_not_grow_with_page_size(self):
+        for _ in range(10):
+            self.create_issue()
+        page_size = {"pagination": "cursor", "page_size": 1}
+        self.assertQueryCountConstant(
+            lambda: self.client.get(self.issues_url, page_size, headers=self.header1),
+            lambda: page_size.update(page_size=10),
+        )
+
+    def test_project_list_does_not_grow_with_projects(self):
+        self.assertQueryCountConstant(
+            lambda: self.client.get(reverse("projects-list"), headers=self.header1),
+            lambda: [
+                Project.objects.create(
+                    title="test",
+                    description="test",
+                    type="BE",
+                    author_user_id=self.user1,
+                )
+                for _ in range(5)
+            ],
+        )
+
+
+class BulkIssueTests(QueryBudgetTestMixin, IssuesTrackingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.project = Project.objects.create(
+            title="test", description="test", type="BE", author_user_id=self.user1
+        )
+        self.url = reverse("project-issues-bulk-create", args=[self.project.id])
+        self.item = {
+            "title": "test",
+            "description": "test",
+            "tag": "BUG",
+            "priority": "LOW",
+            "status": "TODO",
+        }
+
+    def post(self, items, headers=None):
+        return self.client.post(
+            self.url, items, format="json", headers=headers or self.header1
+        )
+
+    def test_bulk_create_issues(self):
+        items = [self.item, {**self.item, "assignee_user_id": self.user2.id}]
+        response = self.post(items)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.json()), 2)
+        self.assertEqual(
+            list(
+                Issue.objects.order_by("id").values_list("assignee_user_id", flat=True)
+            ),
+            [self.user1.id, self.user2.id],
+        )
+
+    def test_bulk_create_not_authorized(self):
+        response = self.post([self.item], headers=self.header2)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_bulk_create_project_does_not_exist(self):
+        response = self.client.post(
+            reverse("project-issues-bulk-create", args=[self.project.id + 1]),
+            [self.item],
+            format="json",
+            headers=self.header1,
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_bulk_create_is_all_or_nothing(self):
+        response = self.post([self.item, {**self.item, "tag": "invalid"}])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.json(), [{}, {"tag": ['"invalid" is not a valid choice.']}]
+        )
+        self.assertFalse(Issue.objects.exists())
+
+    def test_bulk_create_size_is_limited(self):
+        with mock.patch.object(IssuesViewset, "bulk_max_size", 2):
+            response = self.post([self.item] * 3)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_create_queries_do_not_grow_with_batch(self):
+        items = [{**self.item, "assignee_user_id": self.user1.id}]
+        self.assertQueryCountConstant(
+            lambda: self.post(items), lambda: items.extend(items * 10)
+        )
+        with self.assertWithinQueryBudget(IssuesViewset, "bulk_create"):
+            self.post(items)
+
+
+class BulkUpdateIssueTests(QueryBudgetTestMixin, IssuesTrackingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.project = Project.objects.create(
+            title="test", description="test", type="BE", author_user_id=self.user1
+        )
+        Contributor.objects.create(
+            project=self.project, user=self.user2, permission="LOW", role="Dev"
+        )
+        self.issues = [
+            Issue.objects.create(
+                title="test",
+                description="test",
+                tag="BUG",
+                priority="LOW",
+                status="TODO",
+                project=self.project,
+                author_user_id=author,
+            )
+            for author in (self.user1, self.user2, self.user1)
+        ]
+        self.ids = [issue.id for issue in self.issues]
+        self.url = reverse("project-issues-bulk-update", args=[self.project.id])
+
+    def post(self, data, headers=None):
+        return self.client.post(
+            self.url, data, format="json", headers=headers or self.header1
+        )
+
+    def test_bulk_update_by_ids(self):
+        with self.assertWithinQueryBudget(IssuesViewset, "bulk_update") as context:
+            response = self.post({"ids": self.ids, "changes": {"status": "DONE"}})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.json(), {"updated": self.ids, "refused": [], "not_found": []}
+        )
+        updates = [
+            query
+            for query in context.captured_queries
+            if query["sql"].startswith('UPDATE "issues_tracking_issue"')
+        ]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(Issue.objects.filter(status="DONE").count(), 3)
+
+    def test_bulk_update_refuses_issues_of_others(self):
+        response = self.post(
+            {"ids": self.ids, "changes": {"priority": "HIGH"}}, headers=self.header2
+        )
+        self.assertEqual(
+            response.json(),
+            {
+                "updated": [self.ids[1]],
+                "refused": [self.ids[0], self.ids[2]],
+                "not_found": [],
+            },
+        )
+        self.assertEqual(Issue.objects.get(pk=self.ids[0]).priority, "LOW")
+
+    def test_bulk_update_authorizes_in_the_statement(self):
+        with self.assertWithinQueryBudget(IssuesViewset, "bulk_update") as context:
+            self.post(
+                {"filter": {"status": "TODO"}, "changes": {"priority": "HIGH"}},
+                headers=self.header2,
+            )
+        (update,) = [
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].startswith('UPDATE "issues_tracking_issue"')
+        ]
+        self.assertIn('"author_user_id_id" = %s' % self.user2.id, update)
+        self.assertNotIn(" IN (", update)
+        self.assertEqual(
+            list(Issue.objects.filter(priority="HIGH").values_list("id", flat=True)),
+            [self.ids[1]],
+        )
+
+    def test_bulk_update_size_is_limited(self):
+        with mock.patch.object(IssuesViewset, "bulk_max_size", 2):
+            response = self.post({"ids": self.ids, "changes": {"status": "DONE"}})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn("ids", response.json())
+            response = self.post(
+                {"filter": {"status": "TODO"}, "changes": {"status": "DONE"}}
+            )
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(
+                response.json(), {"filter": ["Matches more than 2 issues."]}
+            )
+        self.assertFalse(Issue.objects.filter(status="DONE").exists())
+
+    def test_bulk_update_by_filter(self):
+        Issue.objects.filter(pk=self.ids[0]).update(status="ONGOING")
+        response = self.post(
+            {
+                "filter": {"status": "TODO"},
+                "changes": {"status": "DONE", "assignee_user_id": self.user2.id},
+            }
+        )
+        self.assertEqual(response.json(), {"updated": self.ids[1:], "refused": []})
+        self.assertEqual(
+            Issue.objects.filter(status="DONE", assignee_user_id=self.user2).count(), 2
+        )
+
+    def test_bulk_update_reports_missing_ids(self):
+        response = self.post({"ids": [self.ids[0], 999], "changes": {"status": "DONE"}})
+        self.assertEqual(response.json()["not_found"], [999])
+
+    def test_bulk_update_rejects_unsupported_changes(self):
+        response = self.post({"ids": self.ids, "changes": {"title": "renamed"}})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json(), {"changes": ["Unsupported field(s): title"]})
+
+    def test_bulk_update_requires_ids_or_filter(self):
+        response = self.post(
+            {
+                "ids": self.ids,
+                "filter": {"status": "TODO"},
+                "changes": {"status": "DONE"},
+            }
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_update_rejects_empty_filter(self):
+        response = self.post({"filter": {}, "changes": {"status": "DONE"}})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("filter", response.json())
+        self.assertFalse(Issue.objects.filter(status="DONE").exists())
+
+    def test_bulk_update_rejects_null_assignee(self):
+        # Saved issues without an assignee are assigned to their author.
+        response = self.post({"ids": self.ids, "changes": {"assignee_user_id": None}})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.json(),
+            {"changes": {"assignee_user_id": ["This field may not be null."]}},
+        )
+        self.assertFalse(Issue.objects.filter(assignee_user_id=None).exists())
+
+    def test_bulk_update_not_authorized(self):
+        Contributor.objects.filter(user=self.user2).delete()
+        response = self.post(
+            {"ids": self.ids, "changes": {"status": "DONE"}}, headers=self.header2
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class ExportTests(QueryBudgetTestMixin, IssuesTrackingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.project = Project.objects.create(
+            title="test", description="test", type="BE", author_user_id=self.user1
+        )
+        Contributor.objects.create(
+            project=self.project, user=self.user2, permission="LOW", role="Dev"
+        )
+        self.issues = [
+            Issue.objects.create(
+                title=f"issue {i}",
+                description="test",
+                tag="BUG",
+                priority="LOW",
+                status="TODO",
+                project=self.project,
+                author_user_id=self.user1,
+            )
+            for i in range(3)
+        ]
+        for issue in (self.issues[2], self.issues[0], self.issues[2]):
+            Comment.objects.create(
+                description="test", issue=issue, author_user_id=self.user2
+            )
+        self.url = reverse("projects-export", args=[self.project.id])
+
+    def export(self, headers=None, **params):
+        response = self.client.get(self.url, params, headers=headers or self.header1)
+        content = b"".join(response.streaming_content).decode()
+        return response, content
+
+    def test_export_ndjson_nests_comments_under_issues(self):
+        with self.assertWithinQueryBudget(ProjectViewset, "export"):
+            response, content = self.export()
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        records = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(
+            [(record["record"], record["id"]) for record in records],
+            [
+                ("project", self.project.id),
+                ("contributor", Contributor.objects.get().id),
+                ("issue", self.issues[0].id),
+                ("comment", 2),
+                ("issue", self.issues[1].id),
+                ("issue", self.issues[2].id),
+                ("comment", 1),
+                ("comment", 3),
+            ],
+        )
+        self.assertEqual(records[2]["title"], "issue 0")
+        self.assertEqual(records[3]["issue"], self.issues[0].id)
+
+    def test_export_csv(self):
+        response, content = self.export(format="csv")
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn("attachment", response["Content-Disposition"])
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(len(rows), 8)
+        self.assertEqual(rows[0]["record"], "project")
+        self.assertEqual(rows[0]["type"], "BE")
+        self.assertEqual(rows[2]["tag"], "BUG")
+        self.assertEqual(rows[3]["issue"], str(self.issues[0].id))
+
+    def test_export_does_not_query_per_row(self):
+        with mock.patch.object(ProjectViewset, "export_chunk_size", 1):
+            with CaptureQueriesContext(connection) as context:
+                response, content = self.export()
+        self.assertEqual(len(content.splitlines()), 8)
+        self.assertEqual(len(context.captured_queries), 7)
+
+    def test_export_not_member(self):
+        user = get_user_model().objects.create_user(
+            email="test3@test.com", password="testpassword3", username="test3"
+        )
+        refresh = RefreshToken.for_user(user)
+        headers = {"Authorization": f"Bearer {str(refresh.access_token)}"}
+        response = self.client.get(self.url, headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_export_missing_project(self):
+        response = self.client.get(
+            reverse("projects-export", args=[999]), headers=self.header1
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ImportTests(QueryBudgetTestMixin, IssuesTrackingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.project = Project.objects.create(
+            title="test", description="test", type="BE", author_user_id=self.user1
+        )
+        Contributor.objects.create(
+            project=self.project, user=self.user2, permission="LOW", role="Dev"
+        )
+        self.url = reverse("project-issues-import-issues", args=[self.project.id])
+        self.issue = {
+            "record": "issue",
+            "title": "test",
+            "description": "test",
+            "tag": "BUG",
+            "priority": "LOW",
+            "status": "TODO",
+        }
+
+    def upload(self, name, content, headers=None, **data):
+        upload = SimpleUploadedFile(name, content.encode())
+        return self.client.post(
+            self.url,
+            {"file": upload, **data},
+            format="multipart",
+            headers=headers or self.header2,
+        )
+
+    def ndjson(self, *records):
+        return "".join(json.dumps(record) + "\n" for record in records)
+
+    def test_import_ndjson(self):
+        content = self.ndjson(
+            {"record": "project", "id": 50, "title": "old", "type": "BE"},
+            {**self.issue, "id": 7},
+            {"record": "comment", "id": 1, "issue": 7, "description": "first"},
+            {"record": "comment", "id": 2, "issue": 7, "description": "second"},
+            {**self.issue, "id": 8, "assignee_user_id": self.user1.id},
+        )
+        with self.assertWithinQueryBudget(IssuesViewset, "import_issues"):
+            response = self.upload("issues.ndjson", content)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.json(),
+            {"created": {"issue": 2, "comment": 2}, "error_count": 0, "errors": []},
+        )
+        first, second = Issue.objects.filter(project=self.project).order_by("id")
+        self.assertEqual(first.author_user_id, self.user2)
+        self.assertEqual(first.assignee_user_id, self.user2)
+        self.assertEqual(second.assignee_user_id, self.user1)
+        self.assertEqual(
+            list(first.comments.values_list("description", flat=True)),
+            ["first", "second"],
+        )
+
+    def test_import_reports_row_errors(self):
+        content = (
+            self.ndjson({**self.issue, "tag": "NOPE"}, self.issue)
+            + "not json\n"
+            + self.ndjson(
+                {"record": "comment", "issue": 3, "description": "orphan"},
+                {"record": "widget"},
+            )
+        )
+        response = self.upload("issues.ndjson", content)
+        body = response.json()
+        self.assertEqual(body["created"], {"issue": 1, "comment": 0})
+        self.assertEqual(body["error_count"], 4)
+        self.assertEqual([error["line"] for error in body["errors"]], [1, 3, 4, 5])
+        self.assertIn("tag", body["errors"][0]["errors"])
+        self.assertIn("issue", body["errors"][2]["errors"])
+
+    def test_import_csv_export_round_trip(self):
+        source = Project.objects.create(
+            title="source", description="test", type="BE", author_user_id=self.user2
+        )
+        issue = Issue.objects.create(
+            **{key: value for key, value in self.issue.items() if key != "record"},
+            project=source,
+            author_user_id=self.user2,
+        )
+        Comment.objects.create(
+            description="multi\nline", issue=issue, author_user_id=self.user2
+        )
+        export = self.client.get(
+            reverse("projects-export", args=[source.id]),
+            {"format": "csv"},
+            headers=self.header2,
+        )
+        content = b"".join(export.streaming_content).decode()
+        response = self.upload("project.csv", content)
+        self.assertEqual(response.json()["created"], {"issue": 1, "comment": 1})
+        comment = Comment.objects.get(issue__project=self.project)
+        self.assertEqual(comment.description, "multi\nline")
+
+    def test_import_flushes_in_chunks(self):
+        content = self.ndjson(*[self.issue] * 5)
+        with mock.patch.object(IssuesViewset, "import_chunk_size", 2):
+            with CaptureQueriesContext(connection) as context:
+                response = self.upload("issues.ndjson", content)
+        self.assertEqual(response.json()["created"]["issue"], 5)
+        inserts = [
+            q
+            for q in context.captured_queries
+            if q["sql"].startswith('INSERT INTO "issues_tracking_issue"')
+        ]
+        self.assertEqual(len(inserts), 3)
+
+    def test_import_requires_membership(self):
+        user = get_user_model().objects.create_user(
+            email="test3@test.com", password="testpassword3", username="test3"
+        )
+        refresh = RefreshToken.for_user(user)
+        headers = {"Authorization": f"Bearer {str(refresh.access_token)}"}
+        response = self.upload("issues.ndjson", self.ndjson(self.issue), headers)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(Issue.objects.exists())
+
+    def test_import_requires_file(self):
+        response = self.client.post(self.url, {}, headers=self.header2)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_import_command(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".ndjson") as source:
+            source.write(self.ndjson(self.issue, {**self.issue, "status": "NOPE"}))
+            source.flush()
+            stdout, stderr = io.StringIO(), io.StringIO()
+            call_command(
+                "import_issues",
+                self.project.id,
+                source.name,
+                author=self.user1.email,
+                stdout=stdout,
+                stderr=stderr,
+            )
+        self.assertIn(
+            "Imported 1 issue(s) and 0 comment(s), 1 error(s).", stdout.getvalue()
+        )
+        self.assertEqual(json.loads(stderr.getvalue())["line"], 2)
+
+
+class ETagTests(IssuesTrackingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.project = Project.objects.create(
+            title="test", description="test", type="BE", author_user_id=self.user1
+        )
+        self.issue = Issue.objects.create(
+            title="test",
+            description="test",
+            tag="BUG",
+            priority="LOW",
+            status="TODO",
+            project=self.project,
+            author_user_id=self.user1,
+        )
+        self.issues_url = reverse("project-issues-list", args=[self.project.id])
+        self.comments_url = reverse(
+            "issues-comments-list", args=[self.project.id, self.issue.id]
+        )
+
+    def version(self):
+        return Project.objects.get(pk=self.project.pk).version
+
+    def get(self, url, etag=None, **params):
+        headers = dict(self.header1)
+        if etag is not None:
+            headers["If-None-Match"] = etag
+        return self.client.get(url, params, headers=headers)
+
+    def test_unchanged_project_returns_not_modified(self):
+        etag = self.get(self.issues_url)["ETag"]
+        with CaptureQueriesContext(connection) as context:
+            response = self.get(self.issues_url, etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(response.content, b"")
+        for query in context.captured_queries:
+            self.assertNotIn("issues_tracking_issue", query["sql"])
+
+    def test_etag_depends_on_query_string(self):
+        etag = self.get(self.issues_url)["ETag"]
+        response = self.get(self.issues_url, etag, pagination="cursor")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_writes_change_etag(self):
+        writes = [
+            lambda: self.client.post(
+                self.comments_url, {"description": "test"}, headers=self.header1
+            ),
+            lambda: self.client.post(
+                reverse("project-contributors-list", args=[self.project.id]),
+                {"user": self.user2.id, "permission": "LOW", "role": "Dev"},
+                headers=self.header1,
+            ),
+            lambda: self.client.post(
+                reverse("project-issues-bulk-update", args=[self.project.id]),
+                {"ids": [self.issue.id], "changes": {"status": "DONE"}},
+                format="json",
+                headers=self.header1,
+            ),
+            lambda: self.client.delete(
+                reverse("project-issues-detail", args=[self.project.id, self.issue.id]),
+                headers=self.header1,
+            ),
+        ]
+        for write in writes:
+            etag = self.get(self.issues_url)["ETag"]
+            write()
+            response = self.get(self.issues_url, etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotEqual(response["ETag"], etag)
+
+    def test_bulk_create_bumps_version(self):
+        version = self.version()
+        self.client.post(
+            reverse("project-issues-bulk-create", args=[self.project.id]),
+            [
+                {
+                    "title": "a",
+                    "description": "a",
+                    "tag": "BUG",
+                    "priority": "LOW",
+                    "status": "TODO",
+                }
+            ]
+            * 2,
+            format="json",
+            headers=self.header1,
+        )
+        self.assertEqual(self.version(), version + 1)
+
+    def test_issue_delete_bumps_version_once(self):
+        for _ in range(3):
+            Comment.objects.create(
+                description="test", issue=self.issue, author_user_id=self.user1
+            )
+        version = self.version()
+        self.issue.delete()
+        self.assertEqual(self.version(), version + 1)
+
+    def test_stale_project_save_does_not_rewind_version(self):
+        stale = Project.objects.get(pk=self.project.pk)
+        Issue.objects.create(
+            title="test",
+            description="test",
+            tag="BUG",
+            priority="LOW",
+            status="TODO",
+            project=self.project,
+            author_user_id=self.user1,
+        )
+        version = self.version()
+        stale.title = "renamed"
+        stale.save()
+        self.assertEqual(stale.version, version + 1)
+
+    def test_project_retrieve_etag(self):
+        url = reverse("projects-detail", args=[self.project.id])
+        etag = self.get(url)["ETag"]
+        with self.assertNumQueries(2):
+            response = self.get(url, etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.client.put(url, self.data, headers=self.header1)
+        self.assertEqual(self.get(url, etag).status_code, status.HTTP_200_OK)
+
+    def test_non_member_is_refused_before_etag_check(self):
+        etag = self.get(self.issues_url)["ETag"]
+        response = self.client.get(
+            self.issues_url, headers={**self.header2, "If-None-Match": etag}
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class ResponseCacheTests(IssuesTrackingTestCase):
+    def setUp(self):
+        super().setUp()
+        response_cache.reset_stats()
+        self.project = Project.objects.create(
+            title="test", description="test", type="BE", author_user_id=self.user1
+        )
+        Contributor.objects.create(
+            project=self.project, user=self.user2, permission="LOW", role="Dev"
+        )
+        self.issue = Issue.objects.create(
+            title="test",
+            description="test",
+            tag="BUG",
+            priority="LOW",
+            status="TODO",
+            project=self.project,
+            author_user_id=self.user1,
+        )
+        self.issues_url = reverse("project-issues-list", args=[self.project.id])
+
+    def issue_queries(self, url, headers=None):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, headers=headers or self.header1)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        queries = [
+            query
+            for query in context.captured_queries
+            if "issues_tracking_issue" in query["sql"]
+        ]
+        return response, queries
+
+    def test_list_is_served_from_cache(self):
+        first, queries = self.issue_queries(self.issues_url)
+        self.assertTrue(queries)
+        second, queries = self.issue_queries(self.issues_url, self.header2)
+        self.assertEqual(queries, [])
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(response_cache.stats()["local_hits"], 1)
+
+    def test_shared_tier_serves_other_processes(self):
+        self.issue_queries(self.issues_url)
+        response_cache.clear()
+        response, queries = self.issue_queries(self.issues_url)
+        self.assertEqual(queries, [])
+        self.assertEqual(response_cache.stats()["shared_hits"], 1)
+
+    def test_cached_comments_belong_to_the_url_project(self):
+        # The list is cached and tagged under the URL's project: it must not
+        # hold rows of another project, whose writes do not invalidate it.
+        other = Project.objects.create(
+            title="other", description="other", type="BE", author_user_id=self.user1
+        )
+        issue = Issue.objects.create(
+            title="other",
+            description="other",
+            tag="BUG",
+            priority="LOW",
+            status="TODO",
+            project=other,
+            author_user_id=self.user1,
+        )
+        Comment.objects.create(
+            description="old", issue=issue, author_user_id=self.user1
+        )
+        url = reverse("issues-comments-list", args=[self.project.id, issue.id])
+        first = self.client.get(url, headers=self.header1)
+        self.assertEqual(first.json()["results"], [])
+        self.client.post(
+            reverse("issues-comments-list", args=[other.id, issue.id]),
+            {"description": "new"},
+            headers=self.header1,
+        )
+        second = self.client.get(
+            url, headers={**self.header1, "If-None-Match": first["ETag"]}
+        )
+        self.assertEqual(second.status_code, status.HTTP_304_NOT_MODIFIED)
+        with mock.patch.object(response_cache, "enabled", False):
+            uncached = self.client.get(url, headers=self.header1)
+        cached = self.client.get(url, headers=self.header1)
+        self.assertEqual(cached.json(), uncached.json())
+        self.assertEqual(uncached.json()["results"], [])
+
+    def test_writes_invalidate_cached_list(self):
+        self.issue_queries(self.issues_url)
+        self.client.put(
+            reverse("project-issues-detail", args=[self.project.id, self.issue.id]),
+            {
+                "title": "renamed",
+                "description": "test",
+                "tag": "BUG",
+                "priority": "LOW",
+                "status": "TODO",
+            },
+            headers=self.header1,
+        )
+        response, queries = self.issue_queries(self.issues_url)
+        self.assertTrue(queries)
+        self.assertEqual(response.json()["results"][0]["title"], "renamed")
+
+    def test_bulk_update_invalidates_cached_list(self):
+        self.issue_queries(self.issues_url)
+        self.client.post(
+            reverse("project-issues-bulk-update", args=[self.project.id]),
+            {"ids": [self.issue.id], "changes": {"status": "DONE"}},
+            format="json",
+            headers=self.header1,
+        )
+        response, _ = self.issue_queries(self.issues_url)
+        self.assertEqual(response.json()["results"][0]["status"], "DONE")
+
+    def test_cache_key_includes_query_string(self):
+        self.issue_queries(self.issues_url)
+        _, queries = self.issue_queries(self.issues_url + "?pagination=cursor")
+        self.assertTrue(queries)
+
+    def test_project_list_is_cached_per_user(self):
+        url = reverse("projects-list")
+        first = self.client.get(url, headers=self.header1).json()
+        other = self.client.get(url, headers=self.header2).json()
+        self.assertEqual(response_cache.stats()["misses"], 2)
+        self.assertEqual(self.client.get(url, headers=self.header1).json(), first)
+        self.assertEqual(response_cache.stats()["local_hits"], 1)
+        self.project.title = "renamed"
+        self.project.save()
+        renamed = self.client.get(url, headers=self.header2).json()
+        self.assertEqual(renamed["results"][0]["title"], "renamed")
+        self.assertNotEqual(renamed, other)
+
+    def test_errors_are_not_cached(self):
+        url = self.issues_url + "?page=5"
+        self.client.get(url, headers=self.header1)
+        response = self.client.get(url, headers=self.header1)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response_cache.stats()["misses"], 2)
+
+    def test_stats_admin_only(self):
+        url = reverse("response-cache-stats")
+        response = self.client.get(url, headers=self.header1)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.user1.is_staff = True
+        self.user1.save()
+        response = self.client.get(url, headers=self.header1)
+        self.assertIn("hit_ratio", response.json())
+
+
+class ResponseCacheStampedeTests(IssuesTrackingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache = ResponseCache(
+            ttl=60, stale_ttl=30, lock_timeout=0.2, poll_interval=0.01
+        )
+        self.cache.cache.clear()
+        self.key = self.cache.make_key("test")
+
+    def compute(self, value):
+        def compute():
+            self.computed.append(value)
+            return value, True
+
+        return compute
+
+    def test_recomputes_once_per_version(self):
+        self.computed = []
+        self.assertEqual(self.cache.get_or_compute(self.key, 1, self.compute("a")), "a")
+        self.assertEqual(self.cache.get_or_compute(self.key, 1, self.compute("b")), "a")
+        self.assertEqual(self.cache.get_or_compute(self.key, 2, self.compute("c")), "c")
+        self.assertEqual(self.computed, ["a", "c"])
+
+    def test_serves_stale_while_another_request_recomputes(self):
+        self.computed = []
+        self.cache.get_or_compute(self.key, 1, self.compute("old"))
+        self.cache.cache.add(f"{self.key}:lock", True)
+        value = self.cache.get_or_compute(self.key, 2, self.compute("new"))
+        self.assertEqual(value, "old")
+        self.assertEqual(self.computed, ["old"])
+        self.assertEqual(self.cache.stats()["stale_hits"], 1)
+
+    def test_waits_for_the_lock_holder(self):
+        self.computed = []
+        self.cache.stale_ttl = 0
+        self.cache.cache.add(f"{self.key}:lock", True)
+
+        def finish(seconds):
+            self.cache.cache.set(self.key, Entry(1, time.time(), "shared"))
+
+        with mock.patch("issues_tracking.response_cache.time.sleep", finish):
+            value = self.cache.get_or_compute(self.key, 1, self.compute("mine"))
+        self.assertEqual(value, "shared")
+        self.assertEqual(self.computed, [])
+        self.assertEqual(self.cache.stats()["waits"], 1)
+
+    def test_computes_when_the_lock_holder_never_finishes(self):
+        self.computed = []
+        self.cache.stale_ttl = 0
+        self.cache.cache.add(f"{self.key}:lock", True)
+        value = self.cache.get_or_compute(self.key, 1, self.compute("mine"))
+        self.assertEqual(value, "mine")
+
+
+class OrmCacheTests(APITransactionTestCase):
+    def setUp(self):
+        labels = orm_cache.labels
+        orm_cache.configure(
+            ["issues_tracking.Project", "issues_tracking.Contributor", "auth.User"]
+        )
+        self.addCleanup(orm_cache.configure, labels)
+        orm_cache.cache.clear()
+        orm_cache.reset_stats()
+        membership_index.clear()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com", password="testpassword", username="test"
+        )
+        self.project = Project.objects.create(
+            title="test", description="test", type="BE", author_user_id=self.user
+        )
+
+    def fetch(self):
+        return Project.objects.filter(pk=self.project.pk).first()
+
+    def test_repeated_query_is_served_from_cache(self):
+        self.fetch()
+        with self.assertNumQueries(0):
+            project = self.fetch()
+        self.assertEqual(project.title, "test")
+        self.assertEqual(orm_cache.stats()["hits"], 1)
+
+    def test_writes_invalidate_the_table(self):
+        writes = [
+            lambda: Project.objects.filter(pk=self.project.pk).update(title="update"),
+            lambda: Project.objects.filter(pk=self.project.pk)
+            .first()
+            .save(update_fields=["title"]),
+            lambda: Project.objects.create(
+                title="other", description="test", type="BE", author_user_id=self.user
+            ),
+        ]
+        for write in writes:
+            self.fetch()
+            write()
+            with self.assertNumQueries(1):
+                self.fetch()
+        self.project.delete()
+        self.assertIsNone(self.fetch())
+
+    def test_exists_is_cached_and_invalidated(self):
+        contributors = Contributor.objects.filter(project=self.project, user=self.user)
+        self.assertFalse(contributors.exists())
+        with self.assertNumQueries(0):
+            self.assertFalse(contributors.exists())
+        Contributor.objects.create(
+            project=self.project, user=self.user, permission="LOW", role="Dev"
+        )
+        self.assertTrue(contributors.exists())
+
+    def test_transactions_bypass_the_cache(self):
+        self.fetch()
+        with transaction.atomic():
+            Project.objects.filter(pk=self.project.pk).update(title="pending")
+            with self.assertNumQueries(1):
+                self.assertEqual(self.fetch().title, "pending")
+            with self.assertNumQueries(1):
+                self.fetch()
+        self.assertEqual(self.fetch().title, "pending")
+
+    def test_queries_touching_uncached_tables_are_not_cached(self):
+        list(Project.objects.filter(issues__status="TODO"))
+        with self.assertNumQueries(1):
+            list(Project.objects.filter(issues__status="TODO"))
+
+    def test_models_can_be_disabled(self):
+        orm_cache.configure(["issues_tracking.Contributor"])
+        self.fetch()
+        with self.assertNumQueries(1):
+            self.fetch()
+
+    def test_authenticated_user_is_cached(self):
+        refresh = RefreshToken.for_user(self.user)
+        headers = {"Authorization": f"Bearer {str(refresh.access_token)}"}
+        url = reverse("projects-list")
+        self.client.get(url, headers=headers)
+        response_cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for query in context.captured_queries:
+            self.assertNotIn('FROM "auth_user"', query["sql"])
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(url, headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_queryset_writes_on_uncached_managers_invalidate(self):
+        refresh = RefreshToken.for_user(self.user)
+        headers = {"Authorization": f"Bearer {str(refresh.access_token)}"}
+        url = reverse("projects-list")
+        self.client.get(url, headers=headers)
+        response_cache.clear()
+        # User's manager is not a CachedManager: the write is seen by the
+        # connection.
+        get_user_model().objects.filter(pk=self.user.pk).update(is_active=False)
+        response = self.client.get(url, headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_raw_writes_invalidate_the_table(self):
+        self.fetch()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'UPDATE "issues_tracking_project" SET "title" = %s WHERE "id" = %s',
+                ["raw", self.project.pk],
+            )
+        self.assertEqual(self.fetch().title, "raw")
+
+    def test_cached_user_is_checked_against_revoked_tokens(self):
+        url = reverse("projects-list")
+        # simplejwt modules hold api_settings itself: override_settings would
+        # not reach them.
+        with mock.patch.object(jwt_settings, "CHECK_REVOKE_TOKEN", True):
+            token = RefreshToken.for_user(self.user).access_token
+            headers = {"Authorization": f"Bearer {str(token)}"}
+            response = self.client.get(url, headers=headers)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.user.set_password("Changed-password1")
+            self.user.save()
+            response = self.client.get(url, headers=headers)
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+            self.assertEqual(
+                response.json(), {"detail": "The user's password has been changed."}
+            )
+            authentication = CachedJWTAuthentication()
+            with self.assertRaises(AuthenticationFailed):
+                async_to_sync(authentication.aget_user)(token)
+
+
+class SearchTests(QueryBudgetTestMixin, IssuesTrackingTestCase):
+    def setUp(self):
+        super().setUp()
+        search.BACKENDS["python"].clear()
+        self.project = Project.objects.create(
+            title="test", description="test", type="BE", author_user_id=self.user1
+        )
+        self.other = Project.objects.create(
+            title="other", description="test", type="BE", author_user_id=self.user2
+        )
+        self.shared = Project.objects.create(
+            title="shared", description="test", type="BE", author_user_id=self.user2
+        )
+        Contributor.objects.create(
+            project=self.shared, user=self.user1, permission="LOW", role="Dev"
+        )
+        self.crash = self.create_issue(self.project, "Login crash", "Fails on start")
+        self.slow = self.create_issue(
+            self.project, "Slow page", "The page is slow and may crash"
+        )
+        self.hidden = self.create_issue(self.other, "Crash report", "crash")
+        self.visible = self.create_issue(self.shared, "Shared crash", "Résumé upload")
+        self.comment = Comment.objects.create(
+            description="Stacktrace attached below",
+            issue=self.slow,
+            author_user_id=self.user1,
+        )
+        self.url = reverse("search-list")
+
+    def create_issue(self, project, title, description):
+        return Issue.objects.create(
+            title=title,
+            description=description,
+            tag="BUG",
+            priority="LOW",
+            status="TODO",
+            project=project,
+            author_user_id=project.author_user_id,
+        )
+
+    def search(self, q, **params):
+        return self.client.get(self.url, {"q": q, **params}, headers=self.header1)
+
+    def found(self, q, **params):
+        response = self.search(q, **params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [(hit["type"], hit["id"]) for hit in response.json()["results"]]
+
+    def test_search_requires_authentication(self):
+        response = self.client.get(self.url, {"q": "crash"})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_search_requires_words(self):
+        for q in ("", "  ", "?!"):
+            response = self.search(q)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_search_ranks_title_matches_first(self):
+        found = self.found("crash")
+        self.assertCountEqual(
+            found[:2], [("issue", self.crash.id), ("issue", self.visible.id)]
+        )
+        self.assertEqual(found[2:], [("issue", self.slow.id)])
+
+    def test_search_returns_issue_context(self):
+        response = self.search("stacktrace")
+        (hit,) = response.json()["results"]
+        self.assertEqual(hit["type"], "comment")
+        self.assertEqual(hit["id"], self.comment.id)
+        self.assertEqual(hit["issue"], self.slow.id)
+        self.assertEqual(hit["project"], self.project.id)
+        self.assertEqual(hit["title"], "Slow page")
+        self.assertIn("[Stacktrace]", hit["snippet"])
+
+    def test_search_requires_every_word(self):
+        self.assertEqual(self.found("slow crash"), [("issue", self.slow.id)])
+        self.assertEqual(self.found("slow stacktrace"), [])
+
+    def test_search_folds_case_and_accents(self):
+        self.assertEqual(self.found("RESUME"), [("issue", self.visible.id)])
+
+    def test_search_ignores_query_syntax(self):
+        self.assertEqual(self.found('crash" OR "report'), [])
+        self.assertEqual(self.found("NEAR(crash*"), [])
+
+    def test_search_is_paginated(self):
+        response = self.search("crash", page_size=2)
+        self.assertEqual(len(response.json()["results"]), 2)
+        self.assertIsNone(response.json()["previous"])
+        response = self.client.get(response.json()["next"], headers=self.header1)
+        self.assertEqual(
+            [hit["id"] for hit in response.json()["results"]], [self.slow.id]
+        )
+        self.assertIsNone(response.json()["next"])
+        self.assertIsNotNone(response.json()["previous"])
+        response = self.search("crash", page=0)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_search_follows_writes(self):
+        self.crash.title = "Login error"
+        self.crash.save()
+        Issue.objects.filter(pk=self.slow.pk).update(description="fixed")
+        self.assertEqual(self.found("crash"), [("issue", self.visible.id)])
+        self.comment.delete()
+        self.assertEqual(self.found("stacktrace"), [])
+        response = self.client.post(
+            reverse("project-issues-bulk-create", args=[self.project.id]),
+            [
+                {
+                    "title": "Bulk crash",
+                    "description": "test",
+                    "tag": "BUG",
+                    "priority": "LOW",
+                    "status": "TODO",
+                }
+            ],
+            format="json",
+            headers=self.header1,
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.found("bulk"), [("issue", response.json()[0]["id"])])
+        self.shared.delete()
+        self.assertEqual(self.found("shared"), [])
+
+    def test_search_within_query_budget(self):
+        with self.assertWithinQueryBudget(SearchViewset, "list"):
+            self.search("crash")
+
+    def test_python_backend_matches_fts5(self):
+        queries = ("crash", "slow crash", "stacktrace", "resume", "missing")
+        expected = {q: self.found(q) for q in queries}
+        with override_settings(SEARCH={"BACKEND": "python"}):
+            for q in queries:
+                self.assertEqual(self.found(q), expected[q], q)
+
+    def test_python_backend_rebuilds_changed_projects(self):
+        backend = search.BACKENDS["python"]
+        backend.reset_stats()
+        with override_settings(SEARCH={"BACKEND": "python"}):
+            self.found("crash")
+            self.found("crash")
+            self.assertEqual((backend.builds, backend.hits), (2, 2))
+            Comment.objects.create(
+                description="crash again", issue=self.crash, author_user_id=self.user1
+            )
+            self.assertIn(
+                ("comment", self.crash.comments.get().id), self.found("crash")
+            )
+            self.assertEqual(backend.builds, 3)
+
+    def test_search_ranks_newest_candidates_only(self):
+        for backend in ("fts5", "python"):
+            with override_settings(SEARCH={"BACKEND": backend}), mock.patch.object(
+                search.BACKENDS[backend], "max_candidates", 2
+            ):
+                self.assertCountEqual(
+                    self.found("crash"),
+                    [("issue", self.slow.id), ("issue", self.visible.id)],
+                )
+
+
+class IssueFilterTests(IssuesTrackingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.project = Project.objects.create(
+            title="test", description="test", type="BE", author_user_id=self.user1
+        )
+        Contributor.objects.create(
+            project=self.project, user=self.user2, permission="LOW", role="Dev"
+        )
+        self.issues = [
+            Issue.objects.create(
+                title=f"issue {i}",
+                description="test",
+                tag=("BUG", "IMP", "TSK")[i % 3],
+                priority=("LOW", "HIGH")[i % 2],
+                status=("TODO", "ONGOING", "DONE")[i % 3],
+                project=self.project,
+                author_user_id=self.user1,
+                assignee_user_id=(self.user1, self.user2)[i % 2],
+            )
+            for i in range(6)
+        ]
+        # Creation order and id order differ, so sorting is observable.
+        for issue, minutes in zip(self.issues, (5, 0, 3, 1, 4, 2)):
+            Issue.objects.filter(pk=issue.pk).update(
+                created_time=issue.created_time - timedelta(minutes=minutes)
+            )
+        self.url = reverse("project-issues-list", args=[self.project.id])
+
+    def ids(self, **params):
+        response = self.client.get(self.url, params, headers=self.header1)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.json())
+        return [issue["id"] for issue in response.json()["results"]]
+
+    def test_filter_by_field(self):
+        issues = self.issues
+        self.assertEqual(self.ids(status="TODO"), [issues[0].id, issues[3].id])
+        self.assertEqual(
+            self.ids(priority="HIGH"), [issues[1].id, issues[3].id, issues[5].id]
+        )
+        self.assertEqual(self.ids(tag="IMP"), [issues[1].id, issues[4].id])
+        self.assertEqual(
+            self.ids(assignee_user_id=self.user2.id),
+            [issues[1].id, issues[3].id, issues[5].id],
+        )
+
+    def test_filter_combines_fields_and_values(self):
+        issues = self.issues
+        self.assertEqual(
+            self.ids(status="TODO,DONE", priority="LOW"), [issues[0].id, issues[2].id]
+        )
+
+    def test_invalid_filter_values_are_rejected(self):
+        response = self.client.get(
+            self.url,
+            {"status": "TODO,LATER", "assignee_user_id": "me"},
+            headers=self.header1,
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(set(response.json()), {"status", "assignee_user_id"})
+
+    def test_order_by_created_time(self):
+        by_time = sorted(
+            Issue.objects.filter(project=self.project),
+            key=lambda issue: (issue.created_time, issue.id),
+        )
+        expected = [issue.id for issue in by_time]
+        self.assertEqual(self.ids(ordering="created_time"), expected)
+        self.assertEqual(self.ids(ordering="-created_time"), expected[::-1])
+        self.assertEqual(
+            self.ids(ordering="-id"), [issue.id for issue in self.issues[::-1]]
+        )
+
+    def test_order_with_cursor_pagination(self):
+        expected = self.ids(ordering="-created_time", status="TODO,ONGOING")
+        params = {
+            "ordering": "-created_time",
+            "status": "TODO,ONGOING",
+            "pagination": "cursor",
+            "page_size": 1,
+        }
+        body = self.client.get(self.url, params, headers=self.header1).json()
+        ids = [issue["id"] for issue in body["results"]]
+        while body["next"]:
+            body = self.client.get(body["next"], headers=self.header1).json()
+            ids += [issue["id"] for issue in body["results"]]
+        self.assertEqual(ids, expected)
+
+    def test_unindexed_sort_keys_are_rejected(self):
+        for ordering in ("title", "-description", "id,priority", "project__title"):
+            response = self.client.get(
+                self.url, {"ordering": ordering}, headers=self.header1
+            )
+            self.assertEqual(
+                response.status_code, status.HTTP_400_BAD_REQUEST, ordering
+            )
+            self.assertIn("ordering", response.json())
+
+    def test_filtered_lists_never_scan_the_issue_table(self):
+        cases = [{}, {"ordering": "-created_time"}, {"ordering": "-id"}]
+        cases += [
+            {name: value}
+            for name, value in (
+                ("status", "TODO"),
+                ("priority", "LOW,HIGH"),
+                ("tag", "BUG"),
+                ("assignee_user_id", self.user2.id),
+            )
+        ]
+        cases.append({"status": "DONE", "ordering": "created_time"})
+        for params in cases:
+            with CaptureQueriesContext(connection) as context:
+                self.ids(**params)
+            selects = [
+                query["sql"]
+                for query in context.captured_queries
+                if query["sql"].startswith("SELECT")
+                and 'FROM "issues_tracking_issue"' in query["sql"]
+            ]
+            self.assertTrue(selects, params)
+            for sql in selects:
+                with connection.cursor() as cursor:
+                    cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+                    plan = [row[-1] for row in cursor.fetchall()]
+                scans = [
+                    step
+                    for step in plan
+                    if step.startswith("SCAN issues_tracking_issue")
+                ]
+                self.assertEqual(scans, [], f"{params}: {plan}")
+
+
+class SparseFieldsetTests(IssuesTrackingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.project = Project.objects.create(
+            title="test", description="test", type="BE", author_user_id=self.user1
+        )
+        Contributor.objects.create(
+            project=self.project, user=self.user2, permission="LOW", role="Dev"
+        )
+        self.issue = Issue.objects.create(
+            title="test",
+            description="x" * 1000,
+            tag="BUG",
+            priority="LOW",
+            status="TODO",
+            project=self.project,
+            author_user_id=self.user1,
+        )
+        self.url = reverse("project-issues-list", args=[self.project.id])
+
+    def get(self, url, **params):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params, headers=self.header1)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.json())
+        selects = [
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].startswith("SELECT") and "LIMIT" in query["sql"]
+        ]
+        return response.json()["results"], selects[-1]
+
+    def test_fields(self):
+        results, sql = self.get(self.url, fields="title,status")
+        self.assertEqual(results, [{"title": "test", "status": "TODO"}])
+        self.assertNotIn('"description"', sql)
+        self.assertNotIn('"priority"', sql)
+
+    def test_exclude(self):
+        results, sql = self.get(self.url, exclude="description")
+        self.assertEqual(
+            set(results[0]), set(IssueSerializer.Meta.fields) - {"description"}
+        )
+        self.assertNotIn('"description"', sql)
+        results, sql = self.get(self.url, fields="id,description", exclude="id")
+        self.assertEqual(results, [{"description": "x" * 1000}])
+
+    def test_related_fields(self):
+        url = reverse("project-contributors-list", args=[self.project.id])
+        results, sql = self.get(url, fields="user_first_name")
+        self.assertEqual(results, [{"user_first_name": self.user2.first_name}])
+        self.assertIn('"first_name"', sql)
+        self.assertNotIn('"last_name"', sql)
+        self.assertNotIn('"role"', sql)
+
+    def test_project_list(self):
+        results, sql = self.get(reverse("projects-list"), fields="id,title")
+        self.assertEqual(results, [{"id": self.project.id, "title": "test"}])
+        self.assertNotIn('"description"', sql)
+
+    def test_unknown_field(self):
+        response = self.client.get(
+            self.url, {"fields": "title,secret"}, headers=self.header1
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json(), {"fields": ["Unknown field(s): secret"]})
+
+    def test_writes_ignore_fieldsets(self):
+        response = self.client.post(
+            f"{self.url}?fields=title",
+            {
+                "title": "new",
+                "description": "new",
+                "tag": "BUG",
+                "priority": "LOW",
+                "status": "TODO",
+            },
+            headers=self.header1,
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()["description"], "new")
+
+
+class FastReadTests(IssuesTrackingTestCase):
+    def setUp(self):
+        super().setUp()
+        # Both paths must render, not read each other's cached lists.
+        patcher = mock.patch.object(response_cache, "enabled", False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.project = Project.objects.create(
+            title="tést", description="", type="BE", author_user_id=self.user1
+        )
+        Project.objects.create(
+            title="other", description="other", type="FE", author_user_id=self.user1
+        )
+        Contributor.objects.create(
+            project=self.project, user=self.user2, permission="LOW", role="Dév"
+        )
+        self.issues = [
+            Issue.objects.create(
+                title=f"issue {i}",
+                description="\"quoted\"\n" * i,
+                tag=("BUG", "IMP", "TSK")[i % 3],
+                priority=("LOW", "HIGH")[i % 2],
+                status=("TODO", "ONGOING", "DONE")[i % 3],
+                project=self.project,
+                author_user_id=self.user1,
+                assignee_user_id=(self.user1, self.user2, None)[i % 3],
+            )
+            for i in range(5)
+        ]
+        Issue.objects.filter(pk=self.issues[4].pk).update(assignee_user_id=None)
+        for issue in self.issues[:2]:
+            Comment.objects.create(
+                description="comment", issue=issue, author_user_id=self.user1
+            )
+        issue = self.issues[0].id
+        self.urls = [
+            reverse("projects-list"),
+            reverse("project-contributors-list", args=[self.project.id]),
+            reverse("project-issues-list", args=[self.project.id]),
+            reverse("issues-comments-list", args=[self.project.id, issue]),
+        ]
+
+    def get(self, url, params):
+        response = self.client.get(url, params, headers=self.header1)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.content
+
+    def assertSameContent(self, url, **params):
+        fast = self.get(url, params)
+        with override_settings(FAST_READ={"ENABLED": False}):
+            slow = self.get(url, params)
+        self.assertEqual(fast, slow, (url, params))
+
+    def test_lists(self):
+        for url in self.urls:
+            self.assertSameContent(url)
+            self.assertSameContent(url, page_size=2, pagination="cursor")
+            self.assertSameContent(url, page=1)
+
+    def test_issue_list_variants(self):
+        url = self.urls[2]
+        self.assertSameContent(url, ordering="-created_time", pagination="cursor")
+        self.assertSameContent(url, status="TODO,DONE", page_size=1, page=1)
+        self.assertSameContent(url, fields="last_comment_time,assignee_user_id")
+        self.assertSameContent(url, exclude="description")
+        self.assertSameContent(self.urls[1], fields="user_last_name")
+
+    def test_serializers_are_not_instantiated(self):
+        url = self.urls[2]
+        with mock.patch.object(
+            IssueSerializer, "to_representation", side_effect=AssertionError
+        ):
+            self.get(url, {})
+            with override_settings(FAST_READ={"ENABLED": False}):
+                with self.assertRaises(AssertionError):
+                    self.get(url, {})
+
+    def test_plans(self):
+        cases = [
+            (IssueSerializer, Issue),
+            (CommentSerializer, Comment),
+            (ProjectListSerializer, Project),
+            (ContributorListSerializer, Contributor),
+        ]
+        for serializer_class, model in cases:
+            self.assertIsNotNone(build_read_plan(serializer_class, model))
+        # Serialized through a method field, or only on request.
+        self.assertIsNone(build_read_plan(ProjectSerializer, Project))
+
+    def test_async_list(self):
+        async_client = AsyncClient()
+        async_client.handler = AsyncViewClientHandler(enforce_csrf_checks=False)
+        for url in self.urls:
+            response = async_to_sync(async_client.get)(url, headers=self.header1)
+            self.assertEqual(response.content, self.get(url, {}))
+
+
+class StreamingJSONTests(IssuesTrackingTestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(response_cache, "enabled", False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.project = Project.objects.create(
+            title="test", description="test", type="BE", author_user_id=self.user1
+        )
+        Contributor.objects.create(
+            project=self.project, user=self.user2, permission="LOW", role="Dev"
+        )
+        for i in range(3):
+            issue = Issue.objects.create(
+                title=f"issue {i}",
+                description="line\u2028separator é",
+                tag="BUG",
+                priority="LOW",
+                status="TODO",
+                project=self.project,
+                author_user_id=self.user1,
+            )
+            Comment.objects.create(
+                description="test", issue=issue, author_user_id=self.user1
+            )
+        self.urls = [
+            reverse("projects-list"),
+            reverse("project-contributors-list", args=[self.project.id]),
+            reverse("project-issues-list", args=[self.project.id]),
+            reverse("issues-comments-list", args=[self.project.id, issue.id]),
+        ]
+
+    def test_renderer_matches_json_renderer(self):
+        renderer = StreamingJSONRenderer()
+        renderer.chunk_size = 16
+        cases = [
+            {"count": 2, "next": None, "results": [{"a": 1.5, "b": [1, {}]}, {}]},
+            [{"é": "\u2029", "nested": {"x": None}}] * 10,
+            {"results": [], 1: "non-string key"},
+            {},
+            "text",
+        ]
+        for data in cases:
+            chunks = list(renderer.stream(data))
+            self.assertEqual(b"".join(chunks), JSONRenderer().render(data), data)
+        self.assertGreater(len(chunks), 0)
+        self.assertGreater(len(list(renderer.stream(cases[1]))), 10)
+        self.assertEqual(list(renderer.stream(None)), [])
+        indented = "application/json; indent=4"
+        self.assertEqual(
+            b"".join(renderer.stream(cases[0], indented)),
+            JSONRenderer().render(cases[0], indented),
+        )
+
+    @override_settings(STREAMING_JSON={"MIN_ITEMS": 1})
+    def test_lists_are_streamed(self):
+        for url in self.urls:
+            response = self.client.get(url, headers=self.header1)
+            self.assertTrue(response.streaming, url)
+            self.assertEqual(response["Content-Type"], "application/json")
+            content = b"".join(response.streaming_content)
+            with override_settings(STREAMING_JSON={"MIN_ITEMS": 1000}):
+                rendered = self.client.get(url, headers=self.header1)
+            self.assertFalse(rendered.streaming)
+            self.assertEqual(content, rendered.content)
+            self.assertEqual(response.get("ETag"), rendered.get("ETag"))
+        self.assertIn("ETag", response)
+
+    @override_settings(STREAMING_JSON={"MIN_ITEMS": 1})
+    def test_not_streamed(self):
+        url = self.urls[2]
+        response = self.client.get(url, headers=self.header1)
+        response = self.client.get(
+            url, headers={**self.header1, "If-None-Match": response["ETag"]}
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertFalse(response.streaming)
+        response = self.client.get(url, {"status": "NOPE"}, headers=self.header1)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(response.streaming)
+        response = self.client.get(url, {"status": "DONE"}, headers=self.header1)
+        self.assertEqual(response.json()["results"], [])
+
+    @override_settings(STREAMING_JSON={"MIN_ITEMS": 1})
+    def test_async_lists_are_streamed(self):
+        async_client = AsyncClient()
+        async_client.handler = AsyncViewClientHandler(enforce_csrf_checks=False)
+
+        async def get(url):
+            response = await async_client.get(url, headers=self.header1)
+            self.assertTrue(response.is_async)
+            return b"".join([chunk async for chunk in response.streaming_content])
+
+        for url in self.urls:
+            content = async_to_sync(get)(url)
+            with override_settings(STREAMING_JSON={"MIN_ITEMS": 1000}):
+                rendered = self.client.get(url, headers=self.header1)
+            self.assertEqual(content, rendered.content)
+
+
+class ProjectStatsTests(QueryBudgetTestMixin, IssuesTrackingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.project = Project.objects.create(
+            title="test", description="test", type="BE", author_user_id=self.user1
+        )
+        self.issue = {
+            "title": "test",
+            "description": "test",
+            "tag": "BUG",
+            "priority": "LOW",
+            "status": "TODO",
+        }
+        self.list_url = reverse("project-issues-list", args=[self.project.id])
+        self.stats_url = reverse("projects-stats", args=[self.project.id])
+
+    def stats(self):
+        response = self.client.get(self.stats_url, headers=self.header1)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()
+
+    def assertExact(self):
+        self.assertEqual(stats.verify([self.project.id]), {})
+
+    def test_new_project_has_empty_stats(self):
+        self.assertEqual(
+            self.stats(),
+            {
+                "issue_count": 0,
+                "contributor_count": 0,
+                "status": {"TODO": 0, "ONGOING": 0, "DONE": 0},
+                "priority": {"LOW": 0, "MED": 0, "HIGH": 0},
+                "tag": {"BUG": 0, "IMP": 0, "TSK": 0},
+            },
+        )
+
+    def test_stats_follow_single_writes(self):
+        response = self.client.post(self.list_url, self.issue, headers=self.header1)
+        issue_id = response.json()["id"]
+        self.client.post(
+            self.list_url, {**self.issue, "tag": "IMP"}, headers=self.header1
+        )
+        self.client.put(
+            reverse("project-issues-detail", args=[self.project.id, issue_id]),
+            {**self.issue, "status": "DONE", "priority": "HIGH"},
+            headers=self.header1,
+        )
+        body = self.stats()
+        self.assertEqual(body["issue_count"], 2)
+        self.assertEqual(body["status"], {"TODO": 1, "ONGOING": 0, "DONE": 1})
+        self.assertEqual(body["priority"], {"LOW": 1, "MED": 0, "HIGH": 1})
+        self.assertEqual(body["tag"], {"BUG": 1, "IMP": 1, "TSK": 0})
+        self.client.delete(
+            reverse("project-issues-detail", args=[self.project.id, issue_id]),
+            headers=self.header1,
+        )
+        self.assertEqual(self.stats()["status"], {"TODO": 1, "ONGOING": 0, "DONE": 0})
+        self.assertExact()
+
+    def test_stats_follow_bulk_writes(self):
+        self.client.post(
+            reverse("project-issues-bulk-create", args=[self.project.id]),
+            [self.issue, {**self.issue, "priority": "MED"}, self.issue],
+            format="json",
+            headers=self.header1,
+        )
+        self.client.post(
+            reverse("project-issues-bulk-update", args=[self.project.id]),
+            {"filter": {"priority": "LOW"}, "changes": {"status": "ONGOING"}},
+            format="json",
+            headers=self.header1,
+        )
+        content = json.dumps({**self.issue, "tag": "TSK"}) + "\n"
+        self.client.post(
+            reverse("project-issues-import-issues", args=[self.project.id]),
+            {"file": SimpleUploadedFile("issues.ndjson", content.encode())},
+            format="multipart",
+            headers=self.header1,
+        )
+        body = self.stats()
+        self.assertEqual(body["issue_count"], 4)
+        self.assertEqual(body["status"], {"TODO": 2, "ONGOING": 2, "DONE": 0})
+        self.assertEqual(body["tag"], {"BUG": 3, "IMP": 0, "TSK": 1})
+        self.assertExact()
+
+    def test_stats_count_contributors(self):
+        self.client.post(
+            reverse("project-contributors-list", args=[self.project.id]),
+            {"user": self.user2.id, "permission": "LOW", "role": "Dev"},
+            headers=self.header1,
+        )
+        self.assertEqual(self.stats()["contributor_count"], 1)
+        self.client.delete(
+            reverse(
+                "project-contributors-detail", args=[self.project.id, self.user2.id]
+            ),
+            headers=self.header1,
+        )
+        self.assertEqual(self.stats()["contributor_count"], 0)
+        self.assertExact()
+
+    def test_stats_require_membership(self):
+        response = self.client.get(self.stats_url, headers=self.header2)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.get(
+            reverse("projects-stats", args=[self.project.id + 1]),
+            headers=self.header1,
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_stats_within_query_budget(self):
+        with self.assertWithinQueryBudget(ProjectViewset, "stats"):
+            self.stats()
+
+    def test_missing_stats_are_rebuilt(self):
+        self.client.post(self.list_url, self.issue, headers=self.header1)
+        ProjectStats.objects.all().delete()
+        self.assertEqual(self.stats()["issue_count"], 1)
+        ProjectStats.objects.all().delete()
+        self.client.post(self.list_url, self.issue, headers=self.header1)
+        self.assertEqual(self.stats()["issue_count"], 2)
+
+    def test_stats_are_optional_on_project(self):
+        url = reverse("projects-detail", args=[self.project.id])
+        response = self.client.get(url, headers=self.header1)
+        self.assertNotIn("stats", response.json())
+        response = self.client.get(url, {"include": "stats"}, headers=self.header1)
+        self.assertEqual(response.json()["stats"]["issue_count"], 0)
+
+    def test_command_verifies_and_rebuilds(self):
+        self.client.post(self.list_url, self.issue, headers=self.header1)
+        Project.objects.update(issue_count=5)
+        ProjectStats.objects.update(status_done=-1)
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with self.assertRaises(CommandError):
+            call_command("project_stats", "--check", stdout=stdout, stderr=stderr)
+        (line,) = stderr.getvalue().splitlines()
+        self.assertEqual(
+            json.loads(line),
+            {
+                "project": self.project.id,
+                "drift": {
+                    "issue_count": {"stored": 5, "actual": 1},
+                    "status_done": {"stored": -1, "actual": 0},
+                },
+            },
+        )
+        call_command("project_stats", "--rebuild", stdout=stdout)
+        call_command("project_stats", str(self.project.id), "--check", stdout=stdout)
+        self.assertIn("are exact", stdout.getvalue())
+
+
+class CounterColumnsTests(QueryBudgetTestMixin, IssuesTrackingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.project = Project.objects.create(
+            title="test", description="test", type="BE", author_user_id=self.user1
+        )
+        self.issue = {
+            "title": "test",
+            "description": "test",
+            "tag": "BUG",
+            "priority": "LOW",
+            "status": "TODO",
+        }
+        self.list_url = reverse("project-issues-list", args=[self.project.id])
+
+    def create_issue(self, **fields):
+        response = self.client.post(
+            self.list_url, {**self.issue, **fields}, headers=self.header1
+        )
+        return response.json()["id"]
+
+    def comments_url(self, issue_id):
+        return reverse("issues-comments-list", args=[self.project.id, issue_id])
+
+    def project_row(self):
+        response = self.client.get(reverse("projects-list"), headers=self.header1)
+        (row,) = response.json()["results"]
+        return {name: row[name] for name in stats.PROJECT_COUNTERS}
+
+    def assertExact(self):
+        self.assertEqual(stats.verify([self.project.id]), {})
+        issue_ids = Issue.objects.values_list("id", flat=True)
+        self.assertEqual(stats.verify_issues(list(issue_ids)), {})
+
+    def test_project_list_follows_single_writes(self):
+        self.assertEqual(
+            self.project_row(),
+            {"issue_count": 0, "open_issue_count": 0, "contributor_count": 0},
+        )
+        issue_id = self.create_issue()
+        self.create_issue(status="DONE")
+        self.client.post(
+            reverse("project-contributors-list", args=[self.project.id]),
+            {"user": self.user2.id, "permission": "LOW", "role": "Dev"},
+            headers=self.header1,
+        )
+        self.assertEqual(
+            self.project_row(),
+            {"issue_count": 2, "open_issue_count": 1, "contributor_count": 1},
+        )
+        self.client.put(
+            reverse("project-issues-detail", args=[self.project.id, issue_id]),
+            {**self.issue, "status": "DONE"},
+            headers=self.header1,
+        )
+        self.assertEqual(self.project_row()["open_issue_count"], 0)
+        self.client.delete(
+            reverse("project-issues-detail", args=[self.project.id, issue_id]),
+            headers=self.header1,
+        )
+        self.assertEqual(self.project_row()["issue_count"], 1)
+        self.assertExact()
+
+    def test_project_list_follows_bulk_writes(self):
+        self.client.post(
+            reverse("project-issues-bulk-create", args=[self.project.id]),
+            [self.issue, {**self.issue, "priority": "MED"}, self.issue],
+            format="json",
+            headers=self.header1,
+        )
+        self.client.post(
+            reverse("project-issues-bulk-update", args=[self.project.id]),
+            {"filter": {"priority": "LOW"}, "changes": {"status": "DONE"}},
+            format="json",
+            headers=self.header1,
+        )
+        self.assertEqual(
+            self.project_row(),
+            {"issue_count": 3, "open_issue_count": 1, "contributor_count": 0},
+        )
+        self.assertExact()
+
+    def test_saving_a_stale_instance_keeps_counters(self):
+        project = Project.objects.get(pk=self.project.id)
+        issue_id = self.create_issue()
+        issue = Issue.objects.get(pk=issue_id)
+        self.client.post(
+            self.comments_url(issue_id), {"description": "test"}, headers=self.header1
+        )
+        project.title = "renamed"
+        project.save()
+        issue.title = "renamed"
+        issue.save()
+        project.refresh_from_db()
+        issue.refresh_from_db()
+        self.assertEqual((project.title, project.issue_count), ("renamed", 1))
+        self.assertEqual((issue.title, issue.comment_count), ("renamed", 1))
+
+    def test_issue_comment_counters(self):
+        issue_id = self.create_issue()
+        comment_ids = [
+            self.client.post(
+                self.comments_url(issue_id),
+                {"description": "test"},
+                headers=self.header1,
+            ).json()["id"]
+            for _ in range(3)
+        ]
+        last = Comment.objects.get(pk=comment_ids[-1]).created_time
+        row = self.client.get(self.list_url, headers=self.header1).json()["results"][0]
+        self.assertEqual(row["comment_count"], 3)
+        self.assertEqual(parse_datetime(row["last_comment_time"]), last)
+        for comment_id in reversed(comment_ids):
+            self.client.delete(
+                reverse(
+                    "issues-comments-detail",
+                    args=[self.project.id, issue_id, comment_id],
+                ),
+                headers=self.header1,
+            )
+            self.assertExact()
+        issue = Issue.objects.get(pk=issue_id)
+        self.assertEqual((issue.comment_count, issue.last_comment_time), (0, None))
+
+    def test_import_counts_comments(self):
+        content = "\n".join(
+            json.dumps(row)
+            for row in [
+                {**self.issue, "id": 7},
+                {"record": "comment", "issue": 7, "description": "first"},
+                {"record": "comment", "issue": 7, "description": "second"},
+            ]
+        )
+        self.client.post(
+            reverse("project-issues-import-issues", args=[self.project.id]),
+            {"file": SimpleUploadedFile("issues.ndjson", content.encode())},
+            format="multipart",
+            headers=self.header1,
+        )
+        self.assertEqual(Issue.objects.get().comment_count, 2)
+        self.assertEqual(self.project_row()["issue_count"], 1)
+        self.assertExact()
+
+    def test_lists_serve_counters_without_extra_queries(self):
+        for _ in range(3):
+            issue_id = self.create_issue()
+            self.client.post(
+                self.comments_url(issue_id),
+                {"description": "test"},
+                headers=self.header1,
+            )
+        response_cache.clear()
+        response_cache.cache.clear()
+        with self.assertWithinQueryBudget(ProjectViewset, "list"):
+            self.client.get(reverse("projects-list"), headers=self.header1)
+        with self.assertWithinQueryBudget(IssuesViewset, "list"):
+            self.client.get(self.list_url, headers=self.header1)
+
+    def test_command_rebuilds_drifted_counters(self):
+        issue_id = self.create_issue()
+        self.client.post(
+            self.comments_url(issue_id), {"description": "test"}, headers=self.header1
+        )
+        Project.objects.update(open_issue_count=4)
+        Issue.objects.update(comment_count=0, last_comment_time=None)
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with self.assertRaises(CommandError):
+            call_command("project_stats", "--check", stdout=stdout, stderr=stderr)
+        lines = [json.loads(line) for line in stderr.getvalue().splitlines()]
+        self.assertEqual(
+            lines[0],
+            {
+                "project": self.project.id,
+                "drift": {"open_issue_count": {"stored": 4, "actual": 1}},
+            },
+        )
+        self.assertEqual(lines[1]["issue"], issue_id)
+        self.assertEqual(set(lines[1]["drift"]), {"comment_count", "last_comment_time"})
+        call_command("project_stats", stdout=stdout, stderr=io.StringIO())
+        self.assertIn("1 project(s) and 1 issue(s)", stdout.getvalue())
+        self.assertExact()
+        call_command("project_stats", "--check", stdout=stdout)
+        self.assertIn("All counters are exact.", stdout.getvalue())
+
+
+class AsyncViewClientHandler(AsyncViewResolverMixin, AsyncClientHandler):
+    pass
+
+
+class AsyncViewTests(IssuesTrackingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.project = Project.objects.create(
+            title="test", description="test", type="BE", author_user_id=self.user1
+        )
+        self.issue = Issue.objects.create(
+            title="test",
+            description="test",
+            tag="BUG",
+            priority="LOW",
+            status="TODO",
+            project=self.project,
+            author_user_id=self.user1,
+        )
+        self.comment = Comment.objects.create(
+            description="test", issue=self.issue, author_user_id=self.user1
+        )
+        self.async_client = AsyncClient()
+        self.async_client.handler = AsyncViewClientHandler(enforce_csrf_checks=False)
+
+    def project_url(self, pk=None):
+        return reverse("projects-detail", args=[pk or self.project.id])
+
+    def comment_url(self):
+        return reverse(
+            "issues-comments-detail",
+            args=[self.project.id, self.issue.id, self.comment.id],
+        )
+
+    async def assertSameAsSync(self, url, headers, viewset, action, **params):
+        # The sync action must not run: the async view answers on its own.
+        with mock.patch.object(viewset, action, side_effect=AssertionError):
+            response = await self.async_client.get(url, params, headers=headers)
+        expected = await sync_to_async(self.client.get)(url, params, headers=headers)
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response.json(), expected.json())
+        return response
+
+    async def test_list_projects(self):
+        await self.assertSameAsSync(
+            reverse("projects-list"), self.header1, ProjectViewset, "list"
+        )
+
+    async def test_retrieve_project(self):
+        response = await self.assertSameAsSync(
+            self.project_url(), self.header1, ProjectViewset, "retrieve"
+        )
+        self.assertEqual(response.json()["id"], self.project.id)
+
+    async def test_retrieve_project_from_another_user(self):
+        response = await self.assertSameAsSync(
+            self.project_url(), self.header2, ProjectViewset, "retrieve"
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    async def test_retrieve_project_does_not_exist(self):
+        response = await self.async_client.get(
+            self.project_url(999), headers=self.header1
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_retrieve_project_with_stats(self):
+        response = await self.async_client.get(
+            self.project_url(), {"include": "stats"}, headers=self.header1
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["stats"]["issue_count"], 1)
+
+    async def test_list_contributors(self):
+        url = reverse("project-contributors-list", args=[self.project.id])
+        await self.assertSameAsSync(url, self.header1, ContributorsViewset, "list")
+
+    async def test_list_issues(self):
+        url = reverse("project-issues-list", args=[self.project.id])
+        await self.assertSameAsSync(url, self.header1, IssuesViewset, "list")
+        response = await self.assertSameAsSync(
+            url, self.header1, IssuesViewset, "list", pagination="cursor"
+        )
+        self.assertEqual(response.json()["results"][0]["id"], self.issue.id)
+
+    async def test_list_issues_from_another_user(self):
+        url = reverse("project-issues-list", args=[self.project.id])
+        response = await self.assertSameAsSync(
+            url, self.header2, IssuesViewset, "list"
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    async def test_list_and_retrieve_comments(self):
+        url = reverse("issues-comments-list", args=[self.project.id, self.issue.id])
+        await self.assertSameAsSync(url, self.header1, CommentsViewset, "list")
+        await self.assertSameAsSync(
+            self.comment_url(), self.header1, CommentsViewset, "retrieve"
+        )
+
+    async def test_not_authenticated(self):
+        response = await self.async_client.get(reverse("projects-list"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_etag_not_modified(self):
+        url = reverse("project-issues-list", args=[self.project.id])
+        response = await self.async_client.get(url, headers=self.header1)
+        headers = {**self.header1, "If-None-Match": response["ETag"]}
+        response = await self.async_client.get(url, headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_cached_list_is_served_locally(self):
+        url = reverse("project-issues-list", args=[self.project.id])
+        response_cache.reset_stats()
+        await self.async_client.get(url, headers=self.header1)
+        response = await self.async_client.get(url, headers=self.header1)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response_cache.stats()["local_hits"], 1)
+
+    async def test_writes_use_the_sync_view(self):
+        url = reverse("project-issues-list", args=[self.project.id])
+        response = await self.async_client.post(
+            url,
+            {
+                "title": "new",
+                "description": "new",
+                "tag": "BUG",
+                "priority": "LOW",
+                "status": "TODO",
+            },
+            content_type="application/json",
+            headers=self.header1,
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    async def test_retrieve_contributor_is_not_allowed(self):
+        url = reverse(
+            "project-contributors-detail", args=[self.project.id, self.user1.id]
+        )
+        response = await self.async_client.get(url, headers=self.header1)
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+
+class EventStreamTests(IssuesTrackingTestCase):
+    def setUp(self):
+        super().setUp()
+        event_bus.reset_stats()
+        self.project = Project.objects.create(
+            title="test", description="test", type="BE", author_user_id=self.user1
+        )
+        Contributor.objects.create(
+            project=self.project, user=self.user2, permission="LOW", role="Dev"
+        )
+        self.url = reverse("projects-events", args=[self.project.id])
+        self.async_client = AsyncClient()
+        self.async_client.handler = AsyncViewClientHandler(enforce_csrf_checks=False)
+
+    async def open(self, headers):
+        response = await self.async_client.get(
+            self.url, headers={**headers, "Accept": "text/event-stream"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.addCleanup(response.close)
+        self.stream_response = response
+        chunks = aiter(response.streaming_content)
+        self.assertEqual(await anext(chunks), b": connected\n\n")
+        return chunks
+
+    async def next_event(self, chunks):
+        chunk = (await asyncio.wait_for(anext(chunks), 1)).decode()
+        name, data = chunk.strip().split("\n")
+        return name.removeprefix("event: "), json.loads(data.removeprefix("data: "))
+
+    @sync_to_async
+    def committed(self, func, *args, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return func(*args, **kwargs)
+
+    def create_issue(self):
+        return Issue.objects.create(
+            title="test",
+            description="test",
+            tag="BUG",
+            priority="LOW",
+            status="TODO",
+            project=self.project,
+            author_user_id=self.user1,
+        )
+
+    async def test_issue_and_comment_events(self):
+        chunks = await self.open(self.header2)
+        issue = await self.committed(self.create_issue)
+        name, event = await self.next_event(chunks)
+        self.assertEqual(name, "issue.created")
+        self.assertEqual(event["id"], issue.id)
+        self.assertEqual(event["data"]["title"], "test")
+        comment = await self.committed(
+            Comment.objects.create,
+            description="test",
+            issue=issue,
+            author_user_id=self.user1,
+        )
+        name, event = await self.next_event(chunks)
+        self.assertEqual((name, event["issue"]), ("comment.created", issue.id))
+        comment_id = comment.id
+        await self.committed(comment.delete)
+        name, event = await self.next_event(chunks)
+        self.assertEqual((name, event["id"]), ("comment.deleted", comment_id))
+        issue.status = "DONE"
+        await self.committed(issue.save)
+        name, event = await self.next_event(chunks)
+        self.assertEqual((name, event["data"]["status"]), ("issue.updated", "DONE"))
+        self.stream_response.close()
+        self.assertEqual(event_bus.stats()["subscribers"], 0)
+
+    async def test_bulk_update_events(self):
+        issue = await sync_to_async(self.create_issue)()
+        chunks = await self.open(self.header1)
+        url = reverse("project-issues-bulk-update", args=[self.project.id])
+        response = await self.committed(
+            self.client.post,
+            url,
+            {"ids": [issue.id], "changes": {"status": "DONE"}},
+            format="json",
+            headers=self.header1,
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        name, event = await self.next_event(chunks)
+        self.assertEqual(name, "issue.updated")
+        self.assertEqual(event["data"], {"status": "DONE"})
+
+    async def test_removed_contributor_stream_ends(self):
+        chunks = await self.open(self.header2)
+        await self.committed(Contributor.objects.filter(user=self.user2).delete)
+        name, _ = await self.next_event(chunks)
+        self.assertEqual(name, "access.revoked")
+        with self.assertRaises(StopAsyncIteration):
+            await anext(chunks)
+
+    async def test_slow_subscriber_is_told_to_resync(self):
+        chunks = await self.open(self.header1)
+        subscription = next(iter(event_bus._subscriptions[self.project.id]))
+        subscription.max_pending = 2
+        for i in range(3):
+            event_bus.publish(self.project.id, {"type": "issue.deleted", "id": i})
+        await asyncio.sleep(0)
+        events = [await self.next_event(chunks) for _ in range(3)]
+        self.assertEqual([name for name, _ in events][-1], "resync")
+        self.assertEqual(event_bus.stats()["overflows"], 1)
+        with self.assertRaises(StopAsyncIteration):
+            await anext(chunks)
+
+    async def test_heartbeat(self):
+        with mock.patch.object(ProjectViewset, "event_heartbeat", 0.01):
+            chunks = await self.open(self.header1)
+            self.assertEqual(await anext(chunks), b": keep-alive\n\n")
+
+    async def test_not_a_member(self):
+        refresh = RefreshToken.for_user(
+            await get_user_model().objects.acreate(
+                email="test3@test.com", username="test3"
+            )
+        )
+        response = await self.async_client.get(
+            self.url, headers={"Authorization": f"Bearer {refresh.access_token}"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    async def test_project_does_not_exist(self):
+        response = await self.async_client.get(
+            reverse("projects-events", args=[999]), headers=self.header1
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_no_events_without_subscribers(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_issue()
+        self.assertEqual(event_bus.stats()["published"], 0)
+
+    def test_not_served_by_wsgi(self):
+        response = self.client.get(self.url, headers=self.header1)
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
+class SyncTests(QueryBudgetTestMixin, IssuesTrackingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse("sync-list")
+        response = self.client.post(
+            reverse("projects-list"), data=self.data, headers=self.header1
+        )
+        self.project = Project.objects.get(pk=response.json()["id"])
+        self.issue = self.create_issue()
+        self.comment = Comment.objects.create(
+            description="test", issue=self.issue, author_user_id=self.user1
+        )
+
+    def create_issue(self):
+        return Issue.objects.create(
+            title="test",
+            description="test",
+            tag="BUG",
+            priority="LOW",
+            status="TODO",
+            project=self.project,
+            author_user_id=self.user1,
+        )
+
+    def sync(self, headers=None, **params):
+        response = self.client.get(self.url, params, headers=headers or self.header1)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()
+
+    def summary(self, body):
+        return [
+            (change["model"], change["id"], "deleted" in change)
+            for change in body["changes"]
+        ]
+
+    def test_first_sync_returns_current_state(self):
+        self.issue.title = "renamed"
+        self.issue.save()
+        body = self.sync()
+        self.assertEqual(
+            self.summary(body),
+            [
+                ("project", self.project.id, False),
+                ("comment", self.comment.id, False),
+                ("issue", self.issue.id, False),
+            ],
+        )
+        self.assertEqual(body["changes"][2]["data"]["title"], "renamed")
+        self.assertEqual(body["changes"][2]["project"], self.project.id)
+        self.assertEqual(body["projects"], [self.project.id])
+        self.assertFalse(body["has_more"])
+
+    def test_delta_after_cursor(self):
+        cursor = self.sync()["cursor"]
+        self.assertEqual(self.sync(after=cursor)["changes"], [])
+        comment_id = self.comment.id
+        self.comment.delete()
+        self.issue.status = "DONE"
+        self.issue.save()
+        body = self.sync(after=cursor)
+        self.assertEqual(
+            self.summary(body),
+            [("comment", comment_id, True), ("issue", self.issue.id, False)],
+        )
+        self.assertEqual(body["changes"][1]["data"]["status"], "DONE")
+        self.assertGreater(body["cursor"], cursor)
+
+    def test_deleted_issue_covers_its_comments(self):
+        cursor = self.sync()["cursor"]
+        issue_id = self.issue.id
+        self.issue.delete()
+        body = self.sync(after=cursor)
+        self.assertEqual(self.summary(body), [("issue", issue_id, True)])
+
+    def test_batches(self):
+        for _ in range(3):
+            self.create_issue()
+        seen, cursor = [], 0
+        while True:
+            body = self.sync(after=cursor, limit=2)
+            seen += self.summary(body)
+            cursor = body["cursor"]
+            if not body["has_more"]:
+                break
+        self.assertEqual(len(seen), 6)
+        self.assertEqual(len(set(seen)), 6)
+
+    def test_bulk_endpoints_are_logged(self):
+        cursor = self.sync()["cursor"]
+        url = reverse("project-issues-bulk-create", args=[self.project.id])
+        issue = {
+            "title": "bulk",
+            "description": "bulk",
+            "tag": "BUG",
+            "priority": "LOW",
+            "status": "TODO",
+        }
+        created = self.client.post(
+            url, [issue, issue], format="json", headers=self.header1
+        ).json()
+        url = reverse("project-issues-bulk-update", args=[self.project.id])
+        self.client.post(
+            url,
+            {"ids": [self.issue.id], "changes": {"status": "DONE"}},
+            format="json",
+            headers=self.header1,
+        )
+        body = self.sync(after=cursor)
+        self.assertEqual(
+            [change["id"] for change in body["changes"]],
+            [created[0]["id"], created[1]["id"], self.issue.id],
+        )
+
+    def test_other_projects_are_hidden(self):
+        body = self.sync(self.header2)
+        self.assertEqual((body["changes"], body["projects"]), ([], []))
+
+    def test_joined_project_is_resynced(self):
+        cursor = self.sync(self.header2)["cursor"]
+        Contributor.objects.create(
+            project=self.project, user=self.user2, permission="LOW", role="Dev"
+        )
+        body = self.sync(self.header2, after=cursor)
+        self.assertEqual(body["resync"], [self.project.id])
+        self.assertEqual(body["projects"], [self.project.id])
+
+    def test_compaction(self):
+        cursor = self.sync()["cursor"]
+        for status_value in ("ONGOING", "DONE"):
+            self.issue.status = status_value
+            self.issue.save()
+        self.comment.delete()
+        out = io.StringIO()
+        call_command("compact_changes", retention_days=0, stdout=out)
+        self.assertIn("and 1 tombstone(s)", out.getvalue())
+        rows = Change.objects.order_by("seq").values_list("model", "object_id")
+        self.assertEqual(
+            list(rows), [("project", self.project.id), ("issue", self.issue.id)]
+        )
+        response = self.client.get(self.url, {"after": cursor}, headers=self.header1)
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+        self.assertEqual(
+            self.summary(self.sync()),
+            [("project", self.project.id, False), ("issue", self.issue.id, False)],
+        )
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {"after": "x"}, headers=self.header1)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_sync_within_query_budget(self):
+        Contributor.objects.create(
+            project=self.project, user=self.user2, permission="LOW", role="Dev"
+        )
+        with self.assertWithinQueryBudget(SyncViewset, "list"):
+            body = self.sync()
+        self.assertEqual(len(body["changes"]), 4)
+
+
+class BenchmarkTests(APITransactionTestCase):
+    def setUp(self):
+        membership_index.clear()
+        response_cache.clear()
+        response_cache.cache.clear()
+
+    # Lists stream from the first item, so tiny datasets take the same paths
+    # as full-size ones.
+    @override_settings(
+        DEBUG=False, ALLOWED_HOSTS=["testserver"], STREAMING_JSON={"MIN_ITEMS": 1}
+    )
+    def test_scenarios_run(self):
+        for name, run in SCENARIOS.items():
+            with self.subTest(name):
+                run(io.StringIO(), 0.0001)
+            call_command("flush", interactive=False, verbosity=0)
+            membership_index.clear()
+            response_cache.clear()
+            response_cache.cache.clear()
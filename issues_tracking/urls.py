@@ -1,9 +1,15 @@
+from django.urls import path
 from rest_framework.routers import SimpleRouter
 from .views import (
     ProjectViewset,
     ContributorsViewset,
     IssuesViewset,
     CommentsViewset,
+    SearchViewset,
+    SyncViewset,
+    MembershipIndexStatsView,
+    ResponseCacheStatsView,
+    EventBusStatsView,
 )
 
 router = SimpleRouter()
@@ -21,5 +27,23 @@ router.register(
     CommentsViewset,
     basename="issues-comments",
 )
+router.register("search", SearchViewset, basename="search")
+router.register("sync", SyncViewset, basename="sync")
 
-urlpatterns = router.urls
+urlpatterns = router.urls + [
+    path(
+        "metrics/membership-index/",
+        MembershipIndexStatsView.as_view(),
+        name="membership-index-stats",
+    ),
+    path(
+        "metrics/response-cache/",
+        ResponseCacheStatsView.as_view(),
+        name="response-cache-stats",
+    ),
+    path(
+        "metrics/event-bus/",
+        EventBusStatsView.as_view(),
+        name="event-bus-stats",
+    ),
+]
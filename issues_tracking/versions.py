@@ -0,0 +1,6 @@
+from django.db.models import F
+from .models import Project
+
+
+def bump_project_versions(*args, **kwargs):
+    Project.objects.filter(*args, **kwargs).update(version=F("version") + 1)
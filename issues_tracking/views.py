@@ -1,45 +1,106 @@
-from django.db.models import Q
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import Count, Q, Sum
 from django.shortcuts import get_object_or_404
-from rest_framework.viewsets import ModelViewSet
-from rest_framework.permissions import IsAuthenticated
-from rest_framework.exceptions import MethodNotAllowed
-from .permissions import (
-    ProjectAuthorCreate,
-    ProjectAuthorUpdate,
-    ProjectAuthorDelete,
-    PAuthorContributorRetrieve,
-    PAuthorContributorCreate,
-    PAuthorContributorList,
-    ObjectAuthorUpdate,
-    ObjectAuthorDelete,
+from django.http import Http404, StreamingHttpResponse
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.viewsets import ModelViewSet, ViewSet
+from rest_framework.views import APIView
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.exceptions import APIException, MethodNotAllowed, ValidationError
+from rest_framework.parsers import MultiPartParser
+from softdesk.async_views import AsyncViewSetMixin
+from softdesk.budgets import QueryBudget
+from . import changelog
+from .events import EventStreamResponse, event_bus
+from .export import iter_project_records, ndjson_lines, csv_lines
+from .filters import FieldFilterBackend, IndexedOrderingFilter
+from .importer import IssueImporter, READERS
+from .mixins import (
+    FastReadMixin,
+    ProjectETagMixin,
+    RelatedQuerysetMixin,
+    ResponseCacheMixin,
+    StreamingListMixin,
 )
+from .pagination import (
+    AsyncPageNumberPagination,
+    OptInKeysetPagination,
+    LookaheadPagination,
+)
+from .permissions import PolicyPermission
+from .policies import policy
+from .renderers import NDJSONRenderer, CSVRenderer, EventStreamRenderer
+from .search import SearchResults, get_search_backend, tokenize
+from .stats import as_dict as stats_as_dict, get_stats, record_issue_updates
 from .serializers import (
     ProjectSerializer,
     ProjectListSerializer,
     ContributorSerializer,
     ContributorListSerializer,
     IssueSerializer,
+    IssueBulkUpdateSerializer,
     CommentSerializer,
+    ContributorSyncSerializer,
+    SearchHitSerializer,
 )
-from .models import Project, Contributor, Comment, Issue
+from .models import Change, Project, Contributor, Comment, Issue
+from .context import get_project_context
+from .membership import membership_index
+from .response_cache import response_cache
+
+
+class SyncCursorExpired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = "This cursor is too old, sync again from the start."
+    default_code = "cursor_expired"
+
 
+class EventStreamUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Event streams are not available, try again later."
+    default_code = "event_stream_unavailable"
 
-class ProjectViewset(ModelViewSet):
+
+class ProjectViewset(
+    StreamingListMixin,
+    ProjectETagMixin,
+    ResponseCacheMixin,
+    RelatedQuerysetMixin,
+    FastReadMixin,
+    AsyncViewSetMixin,
+    ModelViewSet,
+):
+    policy_resource = "project"
     serializer_class = ProjectSerializer
     list_serializer_class = ProjectListSerializer
-    permission_classes = [
-        IsAuthenticated,
-        PAuthorContributorRetrieve,
-        ProjectAuthorUpdate,
-        ProjectAuthorDelete,
-    ]
+    pagination_class = AsyncPageNumberPagination
+    permission_classes = [IsAuthenticated, PolicyPermission]
     http_method_names = ["get", "post", "put", "delete"]
+    query_budget = {
+        "list": QueryBudget(4),
+        "create": QueryBudget(4),
+        "retrieve": QueryBudget(4),
+        "update": QueryBudget(6),
+        "destroy": QueryBudget(12),
+        "export": QueryBudget(7),
+        "stats": QueryBudget(4),
+        "events": QueryBudget(3),
+    }
+    async_actions = ("list", "retrieve", "events")
+    event_heartbeat = 15
+    export_chunk_size = 2000
+    export_writers = {"ndjson": ndjson_lines, "csv": csv_lines}
 
     def get_queryset(self):
         if self.action == "list":
             user = self.request.user
+            contributed = Contributor.objects.filter(user=user).values("project_id")
             return Project.objects.filter(
-                Q(author_user_id=user) | Q(contributors=user)
+                Q(author_user_id=user) | Q(pk__in=contributed)
             ).order_by("id")
         return Project.objects.all().order_by("id")
 
@@ -48,21 +109,114 @@ class ProjectViewset(ModelViewSet):
             return self.list_serializer_class
         return super().get_serializer_class()
 
+    def get_version(self, context):
+        # Retrieve loads the project anyway; read the version from that row.
+        return context.project and context.project.version
+
+    async def aget_version(self, context):
+        project = await context.aproject()
+        return project and project.version
+
+    def get_cache_version(self, request):
+        # The list shows the caller's projects, which change with memberships,
+        # and their counters, which change with each project's version.
+        memberships = membership_index.version()
+        versions = self.get_queryset().aggregate(total=Sum("version"))
+        return f"{memberships}.{versions['total'] or 0}"
+
+    async def aget_cache_version(self, request):
+        memberships = await membership_index.aversion()
+        versions = await self.get_queryset().aaggregate(total=Sum("version"))
+        return f"{memberships}.{versions['total'] or 0}"
+
+    def get_cache_scope(self, request):
+        return f"user:{request.user.pk}"
+
+    def get_object(self):
+        project = get_project_context(self.request, self).get_project_or_404()
+        self.check_object_permissions(self.request, project)
+        return project
+
+    async def aget_object(self):
+        context = get_project_context(self.request, self)
+        project = await context.aget_project_or_404()
+        await self.acheck_object_permissions(self.request, project)
+        return project
+
+    async def aretrieve(self, request, *args, **kwargs):
+        include = request.query_params.get("include", "").split(",")
+        if "stats" in include:
+            # The stats field is read from the database while serializing.
+            return await sync_to_async(self.retrieve)(request, *args, **kwargs)
+        return await super().aretrieve(request, *args, **kwargs)
+
     def perform_create(self, serializer):
         serializer.save(author_user_id=self.request.user)
 
+    @action(detail=True)
+    def stats(self, request, *args, **kwargs):
+        context = get_project_context(request, self)
+        if not context.project_exists:
+            raise Http404
+        return Response(stats_as_dict(get_stats(context.project_id)))
+
+    @action(detail=True, renderer_classes=[NDJSONRenderer, CSVRenderer])
+    def export(self, request, *args, **kwargs):
+        context = get_project_context(request, self)
+        if not context.project_exists:
+            raise Http404
+        renderer = request.accepted_renderer
+        records = iter_project_records(context.project_id, self.export_chunk_size)
+        response = StreamingHttpResponse(
+            self.export_writers[renderer.format](records),
+            content_type=renderer.media_type,
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="project-{context.project_id}.{renderer.format}"'
+        )
+        return response
+
+    @action(detail=True, renderer_classes=[EventStreamRenderer, JSONRenderer])
+    def events(self, request, *args, **kwargs):
+        # A stream holds its connection open: only the ASGI application, which
+        # runs aevents(), serves them.
+        raise EventStreamUnavailable(
+            "Event streams are only served by the ASGI application."
+        )
+
+    async def aevents(self, request, *args, **kwargs):
+        # Authorized once, by PolicyPermission; removing the member ends it.
+        context = get_project_context(request, self)
+        if not context.project_exists:
+            raise Http404
+        subscription = event_bus.subscribe(context.project_id, request.user.pk)
+        if subscription is None:
+            raise EventStreamUnavailable
+        return EventStreamResponse(subscription, self.event_heartbeat)
+
 
-class ContributorsViewset(ModelViewSet):
+class ContributorsViewset(
+    StreamingListMixin,
+    ProjectETagMixin,
+    ResponseCacheMixin,
+    RelatedQuerysetMixin,
+    FastReadMixin,
+    AsyncViewSetMixin,
+    ModelViewSet,
+):
+    policy_resource = "contributor"
     list_serializer_class = ContributorListSerializer
     serializer_class = ContributorSerializer
     queryset = Contributor.objects.all()
+    pagination_class = AsyncPageNumberPagination
+    async_actions = ("list",)
     http_method_names = ["get", "post", "delete"]
-    permission_classes = [
-        IsAuthenticated,
-        ProjectAuthorCreate,
-        PAuthorContributorList,
-        ProjectAuthorDelete,
-    ]
+    query_budget = {
+        "list": QueryBudget(6),
+        "create": QueryBudget(10),
+        "destroy": QueryBudget(8),
+    }
+    permission_classes = [IsAuthenticated, PolicyPermission]
 
     def retrieve(self, request, *args, **kwargs):
         raise MethodNotAllowed("GET", detail="Retrieve operation is not allowed")
@@ -86,20 +240,42 @@ class ContributorsViewset(ModelViewSet):
         return super().get_object()
 
     def perform_create(self, serializer):
-        project = get_object_or_404(Project, id=self.kwargs.get("project_id"))
+        project = get_project_context(self.request, self).get_project_or_404()
         serializer.save(project=project)
 
 
-class IssuesViewset(ModelViewSet):
+class IssuesViewset(
+    StreamingListMixin,
+    ProjectETagMixin,
+    ResponseCacheMixin,
+    RelatedQuerysetMixin,
+    FastReadMixin,
+    AsyncViewSetMixin,
+    ModelViewSet,
+):
+    policy_resource = "issue"
     serializer_class = IssueSerializer
-    permission_classes = [
-        IsAuthenticated,
-        PAuthorContributorCreate,
-        PAuthorContributorList,
-        ObjectAuthorUpdate,
-        ObjectAuthorDelete,
-    ]
+    pagination_class = OptInKeysetPagination
+    async_actions = ("list",)
+    filter_backends = [FieldFilterBackend, IndexedOrderingFilter]
+    # Each field has a (project, field, id) index; see Issue.Meta.indexes.
+    filter_fields = ("status", "priority", "tag", "assignee_user_id")
+    ordering_fields = ("id", "created_time")
+    ordering = ("id",)
+    permission_classes = [IsAuthenticated, PolicyPermission]
     http_method_names = ["get", "post", "put", "delete"]
+    query_budget = {
+        "list": QueryBudget(6),
+        "create": QueryBudget(8),
+        "update": QueryBudget(6),
+        "destroy": QueryBudget(8),
+        "bulk_create": QueryBudget(9),
+        "bulk_update": QueryBudget(13),
+        "import_issues": QueryBudget(13),
+    }
+    bulk_max_size = 1000
+    import_chunk_size = 2000
+    import_max_errors = 1000
 
     def retrieve(self, request, *args, **kwargs):
         raise MethodNotAllowed("GET", detail="Retrieve operation is not allowed")
@@ -110,28 +286,263 @@ class IssuesViewset(ModelViewSet):
         )
 
     def perform_create(self, serializer):
-        project = get_object_or_404(Project, id=self.kwargs.get("project_id"))
+        project = get_project_context(self.request, self).get_project_or_404()
         serializer.save(author_user_id=self.request.user, project=project)
 
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk_create(self, request, *args, **kwargs):
+        project = get_project_context(request, self).get_project_or_404()
+        serializer = self.get_serializer(
+            data=request.data, many=True, max_length=self.bulk_max_size
+        )
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            serializer.save(author_user_id=request.user, project=project)
+        # bulk_create() sends no post_save: publish the events here.
+        if event_bus.has_subscribers(project.pk):
+            for issue in serializer.data:
+                event_bus.publish_on_commit(
+                    project.pk,
+                    {"type": "issue.created", "id": issue["id"], "data": issue},
+                )
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=["post"], url_path="bulk-update")
+    def bulk_update(self, request, *args, **kwargs):
+        context = get_project_context(request, self)
+        if not context.project_exists:
+            raise Http404
+        serializer = IssueBulkUpdateSerializer(
+            data=request.data, context={"max_size": self.bulk_max_size}
+        )
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        issues = Issue.objects.filter(project_id=context.project_id).order_by()
+        if "ids" in data:
+            issues = issues.filter(pk__in=data["ids"])
+        else:
+            issues = issues.filter(**data["filter"])
+        # Authorization is part of the statement: only the rows the caller may
+        # update are matched by the UPDATE.
+        update_any = policy.allows(self.policy_resource, "update", context.roles)
+        allowed = issues if update_any else issues.filter(author_user_id=request.user)
+        changes = data["changes"]
+        if "filter" in data:
+            matched = issues[: self.bulk_max_size + 1].count()
+            if matched > self.bulk_max_size:
+                message = f"Matches more than {self.bulk_max_size} issues."
+                raise ValidationError({"filter": [message]})
+        with transaction.atomic():
+            # Read before the UPDATE, which may change what the filter matches.
+            groups = allowed.values_list(*Issue.COUNTED_FIELDS).annotate(
+                count=Count("id")
+            )
+            groups = [(tuple(values), count) for *values, count in groups]
+            updated = list(allowed.order_by("id").values_list("id", flat=True))
+            refused = []
+            if not update_any:
+                refused = list(
+                    issues.exclude(author_user_id=request.user)
+                    .order_by("id")
+                    .values_list("id", flat=True)
+                )
+            if updated:
+                allowed.update(**changes)
+                # Also bumps the project version.
+                record_issue_updates(groups, changes)
+                changelog.record("issue", Change.UPDATED, context.project_id, updated)
+        if updated and event_bus.has_subscribers(context.project_id):
+            # The data of these events only holds the changed fields.
+            fields = {
+                name: getattr(value, "pk", value) for name, value in changes.items()
+            }
+            for issue_id in updated:
+                event_bus.publish_on_commit(
+                    context.project_id,
+                    {"type": "issue.updated", "id": issue_id, "data": fields},
+                )
+        result = {"updated": updated, "refused": refused}
+        if "ids" in data:
+            found = set(updated) | set(refused)
+            result["not_found"] = [i for i in data["ids"] if i not in found]
+        return Response(result)
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        parser_classes=[MultiPartParser],
+    )
+    def import_issues(self, request, *args, **kwargs):
+        context = get_project_context(request, self)
+        if not context.project_exists:
+            raise Http404
+        upload = request.FILES.get("file")
+        if upload is None:
+            raise ValidationError({"file": ["No file was submitted."]})
+        file_format = request.data.get("format") or (
+            "csv" if upload.name.lower().endswith(".csv") else "ndjson"
+        )
+        if file_format not in READERS:
+            raise ValidationError({"format": [f"Unsupported format: {file_format}"]})
+        lines = (line.decode("utf-8", errors="replace") for line in upload)
+        importer = IssueImporter(
+            context.project_id, request.user, self.import_chunk_size
+        )
+        errors, error_count = [], 0
+        for error in importer.run(READERS[file_format](lines)):
+            error_count += 1
+            if len(errors) < self.import_max_errors:
+                errors.append(error)
+        # One event for the whole file: clients refetch instead.
+        created = any(importer.created.values())
+        if created and event_bus.has_subscribers(context.project_id):
+            event_bus.publish_on_commit(
+                context.project_id,
+                {"type": "issues.imported", "created": importer.created},
+            )
+        return Response(
+            {"created": importer.created, "error_count": error_count, "errors": errors}
+        )
+
 
-class CommentsViewset(ModelViewSet):
+class CommentsViewset(
+    StreamingListMixin,
+    ProjectETagMixin,
+    ResponseCacheMixin,
+    RelatedQuerysetMixin,
+    FastReadMixin,
+    AsyncViewSetMixin,
+    ModelViewSet,
+):
+    policy_resource = "comment"
     serializer_class = CommentSerializer
-    permission_classes = [
-        IsAuthenticated,
-        PAuthorContributorCreate,
-        PAuthorContributorList,
-        PAuthorContributorRetrieve,
-        ObjectAuthorUpdate,
-        ObjectAuthorDelete,
-    ]
+    pagination_class = OptInKeysetPagination
+    permission_classes = [IsAuthenticated, PolicyPermission]
     http_method_names = ["get", "post", "put", "delete"]
+    query_budget = {
+        "list": QueryBudget(6),
+        "create": QueryBudget(8),
+        "retrieve": QueryBudget(5),
+        "update": QueryBudget(5),
+        "destroy": QueryBudget(6),
+    }
 
     def get_queryset(self):
-        return Comment.objects.filter(issue=self.kwargs.get("issue_id")).order_by("id")
+        # Project roles are granted on the project in the URL: the comments
+        # must belong to it too.
+        return Comment.objects.filter(
+            issue=self.kwargs.get("issue_id"),
+            issue__project_id=self.kwargs.get("project_id"),
+        ).order_by("id")
 
     def perform_create(self, serializer):
-        project = get_object_or_404(Project, id=self.kwargs.get("project_id"))
-        issue = get_object_or_404(
-            Issue, id=self.kwargs.get("issue_id"), project=project
-        )
+        issue = get_project_context(self.request, self).get_issue_or_404()
         serializer.save(author_user_id=self.request.user, issue=issue)
+
+
+class SearchViewset(ViewSet):
+    permission_classes = [IsAuthenticated]
+    pagination_class = LookaheadPagination
+    query_budget = {"list": QueryBudget(2)}
+
+    def list(self, request):
+        terms = tokenize(request.query_params.get("q", ""))
+        if not terms:
+            raise ValidationError({"q": ["Enter at least one word to search for."]})
+        # Only projects the user authors or contributes to are searched.
+        results = SearchResults(get_search_backend(), request.user, terms)
+        paginator = self.pagination_class()
+        hits = paginator.paginate_queryset(results, request, self)
+        serializer = SearchHitSerializer(hits, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+
+class SyncViewset(ViewSet):
+    # Changes after the `after` cursor, in projects the user can see now. The
+    # client drops projects missing from "projects" and refetches those in
+    # "resync", which it joined since its cursor.
+    permission_classes = [IsAuthenticated]
+    query_budget = {"list": QueryBudget(8)}
+    batch_size = 500
+    max_batch_size = 1000
+    sources = {
+        "project": (Project, ProjectSerializer),
+        "contributor": (Contributor, ContributorSyncSerializer),
+        "issue": (Issue, IssueSerializer),
+        "comment": (Comment, CommentSerializer),
+    }
+
+    def parse_int(self, name, default, minimum):
+        try:
+            value = int(self.request.query_params.get(name, default))
+        except ValueError:
+            value = minimum - 1
+        if value < minimum:
+            raise ValidationError({name: [f"Enter an integer of at least {minimum}."]})
+        return value
+
+    def list(self, request):
+        after = self.parse_int("after", 0, 0)
+        limit = min(self.parse_int("limit", self.batch_size, 1), self.max_batch_size)
+        if after and after < changelog.horizon():
+            raise SyncCursorExpired
+        project_ids = membership_index.get(request.user.pk).project_ids
+        changes, cursor, has_more = changelog.changes_since(project_ids, after, limit)
+        objects = {}
+        for model, (model_class, _) in self.sources.items():
+            ids = [
+                change.object_id
+                for change in changes
+                if change.model == model and change.action != Change.DELETED
+            ]
+            objects[model] = model_class.objects.in_bulk(ids) if ids else {}
+        results, resync = [], set()
+        for change in changes:
+            result = {
+                "seq": change.seq,
+                "model": change.model,
+                "id": change.object_id,
+                "project": change.project_id,
+            }
+            if change.action == Change.DELETED:
+                result["deleted"] = True
+            else:
+                obj = objects[change.model].get(change.object_id)
+                if obj is None:
+                    # Deleted since: its tombstone comes after this cursor.
+                    continue
+                result["data"] = self.sources[change.model][1](obj).data
+                if change.model == "contributor" and obj.user_id == request.user.pk:
+                    resync.add(change.project_id)
+            results.append(result)
+        return Response(
+            {
+                "changes": results,
+                "cursor": cursor,
+                "has_more": has_more,
+                "projects": sorted(project_ids),
+                "resync": sorted(resync),
+            }
+        )
+
+
+class MembershipIndexStatsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(membership_index.stats())
+
+
+class ResponseCacheStatsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(response_cache.stats())
+
+
+class EventBusStatsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(event_bus.stats())
@@ -5,12 +5,16 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
+
+Read endpoints of viewsets using AsyncViewSetMixin run natively on the event
+loop; every other view runs in a thread, as with Django's own handler.
 """
 
 import os
 
-from django.core.asgi import get_asgi_application
-
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "softdesk.settings")
 
+# DRF reads the settings on import.
+from softdesk.async_views import get_asgi_application  # noqa: E402
+
 application = get_asgi_application()
@@ -0,0 +1,211 @@
+import django
+from asgiref.sync import markcoroutinefunction, sync_to_async
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.core.handlers.asgi import ASGIHandler
+from django.http import Http404
+from django.utils.connection import ConnectionProxy
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.response import Response
+
+# Permissions that only look at request.user, already loaded: run inline.
+INLINE_PERMISSIONS = (AllowAny, IsAuthenticated, IsAdminUser)
+
+
+def is_in_process(cache):
+    if isinstance(cache, ConnectionProxy):
+        cache = cache._connections[cache._alias]
+    return isinstance(cache, (LocMemCache, DummyCache))
+
+
+async def cache_call(cache, method, *args, **kwargs):
+    # In-process caches answer without I/O; others go through their a*()
+    # methods, which Django runs in the sync thread unless the backend has
+    # native ones.
+    if is_in_process(cache):
+        return getattr(cache, method)(*args, **kwargs)
+    return await getattr(cache, f"a{method}")(*args, **kwargs)
+
+
+async def call(obj, method, *args, inline=False):
+    # Prefers obj.a<method>(), then falls back to the sync method run in the
+    # sync thread, or inline when it is known not to do I/O.
+    native = getattr(obj, f"a{method}", None)
+    if native is not None:
+        return await native(*args)
+    if inline:
+        return getattr(obj, method)(*args)
+    return await sync_to_async(getattr(obj, method))(*args)
+
+
+class AsyncViewSetMixin:
+    # Under ASGI, these actions run natively on the event loop when the viewset
+    # defines a<action>(); every other action runs the sync view in the sync
+    # thread, as Django would.
+    async_actions = ("list", "retrieve")
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+        async_actions = {
+            method: action
+            for method, action in actions.items()
+            if action in cls.async_actions and hasattr(cls, f"a{action}")
+        }
+        if "get" in async_actions:
+            async_actions.setdefault("head", async_actions["get"])
+        sync_view = sync_to_async(view)
+
+        async def async_view(request, *args, **kwargs):
+            if request.method.lower() not in async_actions:
+                return await sync_view(request, *args, **kwargs)
+            self = cls(**initkwargs)
+            self.action_map = {**actions, **async_actions}
+            for method, action in async_actions.items():
+                setattr(self, method, getattr(self, f"a{action}"))
+            self.request = request
+            self.args = args
+            self.kwargs = kwargs
+            return await self.adispatch(request, *args, **kwargs)
+
+        view.async_view = csrf_exempt(markcoroutinefunction(async_view))
+        return view
+
+    async def adispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+        try:
+            await self.ainitial(request, *args, **kwargs)
+            handler = getattr(self, request.method.lower())
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.prerender(self.response)
+
+    def prerender(self, response):
+        # Renders JSON on the event loop; the browsable API may query the
+        # database, so Django renders it in the sync thread instead.
+        if not isinstance(response, Response) or isinstance(
+            response.accepted_renderer, BrowsableAPIRenderer
+        ):
+            return response
+        response.render()
+
+        async def render():
+            return response
+
+        response.render = render
+        return response
+
+    async def ainitial(self, request, *args, **kwargs):
+        self.format_kwarg = self.get_format_suffix(**kwargs)
+        negotiated = self.perform_content_negotiation(request)
+        request.accepted_renderer, request.accepted_media_type = negotiated
+        version, scheme = self.determine_version(request, *args, **kwargs)
+        request.version, request.versioning_scheme = version, scheme
+        await self.aperform_authentication(request)
+        await self.acheck_permissions(request)
+        await self.acheck_throttles(request)
+
+    async def aperform_authentication(self, request):
+        for authenticator in request.authenticators:
+            try:
+                user_auth_tuple = await call(authenticator, "authenticate", request)
+            except exceptions.APIException:
+                request._not_authenticated()
+                raise
+            if user_auth_tuple is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = user_auth_tuple
+                return
+        request._not_authenticated()
+
+    async def acheck_permissions(self, request):
+        for permission in self.get_permissions():
+            inline = isinstance(permission, INLINE_PERMISSIONS)
+            if not await call(
+                permission, "has_permission", request, self, inline=inline
+            ):
+                self.permission_denied(
+                    request,
+                    message=getattr(permission, "message", None),
+                    code=getattr(permission, "code", None),
+                )
+
+    async def acheck_object_permissions(self, request, obj):
+        for permission in self.get_permissions():
+            inline = isinstance(permission, INLINE_PERMISSIONS)
+            if not await call(
+                permission, "has_object_permission", request, self, obj, inline=inline
+            ):
+                self.permission_denied(
+                    request,
+                    message=getattr(permission, "message", None),
+                    code=getattr(permission, "code", None),
+                )
+
+    async def acheck_throttles(self, request):
+        throttles = self.get_throttles()
+        if all(is_in_process(getattr(t, "cache", None)) for t in throttles):
+            self.check_throttles(request)
+        else:
+            await sync_to_async(self.check_throttles)(request)
+
+    async def apaginate_queryset(self, queryset):
+        if self.paginator is None:
+            return None
+        return await call(
+            self.paginator, "paginate_queryset", queryset, self.request, self
+        )
+
+    async def aget_object(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        filters = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        try:
+            obj = await queryset.aget(**filters)
+        except (ObjectDoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404
+        await self.acheck_object_permissions(self.request, obj)
+        return obj
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        serializer = self.get_serializer([obj async for obj in queryset], many=True)
+        return Response(serializer.data)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
+
+
+class AsyncViewResolverMixin:
+    # Resolves to the native async view of a route when it has one.
+    def resolve_request(self, request):
+        match = super().resolve_request(request)
+        async_view = getattr(match.func, "async_view", None)
+        if async_view is not None:
+            match.func = async_view
+        return match
+
+
+class AsyncViewASGIHandler(AsyncViewResolverMixin, ASGIHandler):
+    pass
+
+
+def get_asgi_application():
+    django.setup(set_prefix=False)
+    return AsyncViewASGIHandler()
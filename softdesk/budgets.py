@@ -0,0 +1,49 @@
+from collections import namedtuple
+from contextlib import contextmanager
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudget(namedtuple("QueryBudget", ["queries", "time_ms"])):
+    def __new__(cls, queries, time_ms=100):
+        return super().__new__(cls, queries, time_ms)
+
+
+class QueryBudgetTestMixin:
+    @contextmanager
+    def assertWithinQueryBudget(self, view, action):
+        budget = view.query_budget[action]
+        with CaptureQueriesContext(connection) as context:
+            yield context
+        queries = context.captured_queries
+        time_ms = sum(float(query["time"]) for query in queries) * 1000
+        details = "\n".join(
+            f"{i}. {query['sql']}" for i, query in enumerate(queries, start=1)
+        )
+        self.assertLessEqual(
+            len(queries),
+            budget.queries,
+            f"{view.__name__}.{action} ran {len(queries)} queries, "
+            f"budget is {budget.queries}:\n{details}",
+        )
+        self.assertLessEqual(
+            time_ms,
+            budget.time_ms,
+            f"{view.__name__}.{action} spent {time_ms:.1f} ms in SQL, "
+            f"budget is {budget.time_ms} ms:\n{details}",
+        )
+
+    def assertQueryCountConstant(self, func, grow):
+        func()
+        with CaptureQueriesContext(connection) as before:
+            func()
+        grow()
+        func()
+        with CaptureQueriesContext(connection) as after:
+            func()
+        self.assertEqual(
+            len(before.captured_queries),
+            len(after.captured_queries),
+            "Query count grew with the dataset (N+1):\n"
+            + "\n".join(query["sql"] for query in after.captured_queries),
+        )
@@ -0,0 +1,184 @@
+import hashlib
+import uuid
+from functools import cached_property
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import EmptyResultSet
+from django.db import connections, models, transaction
+from django.db.backends.signals import connection_created
+
+KEY_PREFIX = "orm-cache"
+MISSING = object()
+WRITES = ("INSERT", "UPDATE", "DELETE", "REPLACE")
+
+
+class OrmCache:
+    def __init__(self, models=(), timeout=300, cache="default"):
+        self.connected = False
+        self.configure(models)
+        self.timeout = timeout
+        self.cache_alias = cache
+        self.reset_stats()
+
+    def configure(self, models):
+        self.labels = frozenset(label.lower() for label in models)
+        self.__dict__.pop("tables", None)
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        self.invalidations = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "bypasses": self.bypasses,
+            "invalidations": self.invalidations,
+        }
+
+    def is_enabled(self, model):
+        return model._meta.label_lower in self.labels
+
+    @cached_property
+    def tables(self):
+        return frozenset(
+            model._meta.db_table
+            for model in apps.get_models()
+            if self.is_enabled(model)
+        )
+
+    @cached_property
+    def all_tables(self):
+        return frozenset(model._meta.db_table for model in apps.get_models())
+
+    def referenced_tables(self, using, sql):
+        quote = connections[using].ops.quote_name
+        return {table for table in self.all_tables if quote(table) in sql}
+
+    def get_or_compute(self, using, kind, sql, params, compute):
+        # Reads inside a transaction may see uncommitted rows: never share them.
+        if connections[using].in_atomic_block:
+            self.bypasses += 1
+            return compute()
+        tables = self.referenced_tables(using, sql)
+        if not tables or not tables <= self.tables:
+            self.bypasses += 1
+            return compute()
+        generations = self._generations(tables)
+        key = self._key(using, kind, sql, params, generations)
+        value = self.cache.get(key, MISSING)
+        if value is not MISSING:
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = compute()
+        self.cache.set(key, value, self.timeout)
+        return value
+
+    def invalidate(self, *tables):
+        self.cache.set_many(
+            {self._table_key(table): uuid.uuid4().hex for table in tables}, None
+        )
+        self.invalidations += 1
+
+    def invalidate_written(self, using, sql):
+        tables = self.referenced_tables(using, sql) & self.tables
+        if not tables:
+            return
+        # Again on commit: a read between the write and the commit may have
+        # cached the old rows under the new generation.
+        self.invalidate(*tables)
+        transaction.on_commit(lambda: self.invalidate(*tables), using=using)
+
+    def connect_signals(self):
+        # Writes are seen where they are executed, whatever issued them: any
+        # queryset or manager, raw SQL, or the fast deletes of a cascade.
+        if not self.connected:
+            self.connected = True
+            connection_created.connect(
+                self._on_connection, weak=False, dispatch_uid=KEY_PREFIX
+            )
+            for connection in connections.all(initialized_only=True):
+                self._on_connection(connection.vendor, connection)
+
+    def _on_connection(self, sender, connection, **kwargs):
+        if self._execute not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self._execute)
+
+    def _execute(self, execute, sql, params, many, context):
+        result = execute(sql, params, many, context)
+        if self.tables and sql.lstrip()[:7].upper().startswith(WRITES):
+            self.invalidate_written(context["connection"].alias, sql)
+        return result
+
+    def _table_key(self, table):
+        return f"{KEY_PREFIX}:table:{table}"
+
+    def _generations(self, tables):
+        keys = sorted(self._table_key(table) for table in tables)
+        found = self.cache.get_many(keys)
+        for key in keys:
+            if key not in found:
+                self.cache.add(key, uuid.uuid4().hex, None)
+                found[key] = self.cache.get(key)
+        return [found[key] for key in keys]
+
+    def _key(self, using, kind, sql, params, generations):
+        parts = [using, kind, sql, repr(params), *generations]
+        digest = hashlib.md5("\0".join(parts).encode(), usedforsecurity=False)
+        return f"{KEY_PREFIX}:result:{digest.hexdigest()}"
+
+
+class CachedQuerySet(models.QuerySet):
+    def _is_cacheable(self):
+        return orm_cache.is_enabled(self.model) and not self.query.select_for_update
+
+    def _cached(self, kind, query, compute):
+        try:
+            sql, params = query.get_compiler(self.db).as_sql()
+        except EmptyResultSet:
+            return compute()
+        return orm_cache.get_or_compute(self.db, kind, sql, params, compute)
+
+    def _fetch_all(self):
+        if self._result_cache is None and self._is_cacheable():
+            self._result_cache = self._cached(
+                self._iterable_class.__name__,
+                self.query,
+                lambda: list(self._iterable_class(self)),
+            )
+        super()._fetch_all()
+
+    def exists(self):
+        if self._result_cache is None and self._is_cacheable():
+            query = self.query.exists()
+            return self._cached(
+                "exists",
+                query,
+                lambda: query.get_compiler(self.db).has_results(),
+            )
+        return super().exists()
+
+
+CachedManager = models.Manager.from_queryset(CachedQuerySet)
+
+
+def orm_cache_from_settings():
+    options = getattr(settings, "ORM_CACHE", {})
+    return OrmCache(
+        models=options.get("MODELS", ()),
+        timeout=options.get("TIMEOUT", 300),
+        cache=options.get("CACHE", "default"),
+    )
+
+
+orm_cache = orm_cache_from_settings()
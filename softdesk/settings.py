@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
+import tempfile
 from pathlib import Path
 from datetime import timedelta
 
@@ -86,6 +87,21 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "shared": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": Path(tempfile.gettempdir()) / "softdesk-cache",
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -142,7 +158,7 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "authentication.backends.CachedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
     "DEFAULT_THROTTLE_CLASSES": [
@@ -154,6 +170,11 @@ REST_FRAMEWORK = {
     "PAGE_SIZE": 10,
 }
 
+# Largest ?page_size= a client may ask of the cursor and search pagination.
+PAGINATION = {
+    "MAX_PAGE_SIZE": 100,
+}
+
 AUTHENTICATION_BACKENDS = [
     "authentication.backends.EmailModelBackend",
 ]
@@ -161,3 +182,67 @@ AUTHENTICATION_BACKENDS = [
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(hours=1),
 }
+
+MEMBERSHIP_INDEX = {
+    "MAX_USERS": 10000,
+    "MAX_PROJECTS": 10000,
+    "CACHE": "shared",
+}
+
+# Read-through cache of ORM queries, invalidated per table on writes. Only
+# queries whose tables all belong to MODELS are cached. Worth enabling when a
+# database round trip costs more than a CACHE read, e.g. with
+# ["issues_tracking.Project", "issues_tracking.Contributor", "auth.User"];
+# with the local SQLite file it does not pay off.
+ORM_CACHE = {
+    "CACHE": "shared",
+    "TIMEOUT": 300,
+    "MODELS": [],
+}
+
+# Full-text search over issues and comments. "auto" uses the SQLite FTS5
+# index when the migration could create it, and otherwise an in-process index
+# of at most MAX_PROJECTS projects, rebuilt when a project's version changes.
+# Only the MAX_CANDIDATES newest matches are ranked, which bounds the cost of
+# words that appear in most issues.
+SEARCH = {
+    "BACKEND": "auto",
+    "MAX_PROJECTS": 1000,
+    "MAX_CANDIDATES": 10000,
+}
+
+# Cached list responses: an in-process LRU of MAX_ENTRIES in front of CACHE.
+# STALE_TTL > 0 serves expired or outdated entries for that many seconds while
+# another request recomputes them.
+RESPONSE_CACHE = {
+    "CACHE": "shared",
+    "MAX_ENTRIES": 1000,
+    "TTL": 300,
+    "STALE_TTL": 0,
+    "LOCK_TIMEOUT": 5,
+}
+
+# Live project events (/projects/<id>/events/, ASGI only). A subscriber that
+# falls MAX_PENDING events behind is sent "resync" and disconnected.
+EVENT_STREAM = {
+    "MAX_PENDING": 100,
+    "MAX_SUBSCRIBERS": 10000,
+}
+
+# Change log read by /sync/. Tombstones older than RETENTION_DAYS are dropped
+# by "manage.py compact_changes"; clients with older cursors sync from scratch.
+CHANGE_LOG = {
+    "RETENTION_DAYS": 30,
+}
+
+# List endpoints build their rows from values_list() with plans compiled from
+# the list serializers, instead of instantiating models and serializers.
+FAST_READ = {
+    "ENABLED": True,
+}
+
+# JSON list pages of at least MIN_ITEMS items are encoded row by row into a
+# chunked response, instead of being rendered whole first.
+STREAMING_JSON = {
+    "MIN_ITEMS": 100,
+}